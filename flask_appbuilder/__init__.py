@@ -1,21 +1,74 @@
 __author__ = "Daniel Vaz Gaspar"
 __version__ = "3.1.1"
 
-from .actions import action  # noqa: F401
-from .api import ModelRestApi  # noqa: F401
-from .base import AppBuilder  # noqa: F401
-from .baseviews import BaseView, expose  # noqa: F401
-from .charts.views import DirectByChartView, GroupByChartView  # noqa: F401
-from .models.group import aggregate_avg, aggregate_count, aggregate_sum  # noqa: F401
-from .models.sqla import Base, Model, SQLA  # noqa: F401
-from .security.decorators import has_access, permission_name  # noqa: F401
-from .views import (  # noqa: F401
-    CompactCRUDMixin,
-    IndexView,
-    MasterDetailView,
-    ModelView,
-    MultipleView,
-    PublicFormView,
-    RestCRUDView,
-    SimpleFormView,
-)  # noqa: F401
+from importlib import import_module
+import sys
+from typing import TYPE_CHECKING
+
+# Module __getattr__ (PEP 562) needs Python 3.7, import eagerly before it
+if TYPE_CHECKING or sys.version_info < (3, 7):
+    from .actions import action  # noqa: F401
+    from .api import ModelRestApi  # noqa: F401
+    from .base import AppBuilder  # noqa: F401
+    from .baseviews import BaseView, expose  # noqa: F401
+    from .charts.views import DirectByChartView, GroupByChartView  # noqa: F401
+    from .models.group import (  # noqa: F401
+        aggregate_avg,
+        aggregate_count,
+        aggregate_sum,
+    )
+    from .models.sqla import Base, Model, SQLA  # noqa: F401
+    from .security.decorators import has_access, permission_name  # noqa: F401
+    from .views import (  # noqa: F401
+        CompactCRUDMixin,
+        IndexView,
+        MasterDetailView,
+        ModelView,
+        MultipleView,
+        PublicFormView,
+        RestCRUDView,
+        SimpleFormView,
+    )  # noqa: F401
+
+# Public names and the modules they are imported from on first use,
+# so "import flask_appbuilder" (the CLI, worker spawn) stays light
+_lazy_imports = {
+    "action": ".actions",
+    "ModelRestApi": ".api",
+    "AppBuilder": ".base",
+    "BaseView": ".baseviews",
+    "expose": ".baseviews",
+    "DirectByChartView": ".charts.views",
+    "GroupByChartView": ".charts.views",
+    "aggregate_avg": ".models.group",
+    "aggregate_count": ".models.group",
+    "aggregate_sum": ".models.group",
+    "Base": ".models.sqla",
+    "Model": ".models.sqla",
+    "SQLA": ".models.sqla",
+    "has_access": ".security.decorators",
+    "permission_name": ".security.decorators",
+    "CompactCRUDMixin": ".views",
+    "IndexView": ".views",
+    "MasterDetailView": ".views",
+    "ModelView": ".views",
+    "MultipleView": ".views",
+    "PublicFormView": ".views",
+    "RestCRUDView": ".views",
+    "SimpleFormView": ".views",
+}
+
+__all__ = list(_lazy_imports)
+
+
+def __getattr__(name):
+    module_name = _lazy_imports.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -3,20 +3,15 @@ import json
 import logging
 import re
 import traceback
-from typing import Callable, Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set, TYPE_CHECKING
 import urllib.parse
 
-from apispec import APISpec, yaml_utils
-from apispec.exceptions import DuplicateComponentNameError
 from flask import Blueprint, current_app, jsonify, make_response, request, Response
 from flask_babel import lazy_gettext as _
-import jsonschema
 from marshmallow import Schema, ValidationError
-from marshmallow_sqlalchemy.fields import Related, RelatedList
 import prison
 from sqlalchemy.exc import IntegrityError
 from werkzeug.exceptions import BadRequest
-import yaml
 
 from .convert import Model2SchemaConverter
 from .schemas import get_info_schema, get_item_schema, get_list_schema
@@ -59,10 +54,28 @@ from ..const import (
 )
 from ..exceptions import FABException, InvalidOrderByColumnFABException
 from ..security.decorators import permission_name, protect
+from ..utils.base import (
+    get_view_attribute_names,
+    LazyViewAttribute,
+    RequestLocalAttribute,
+)
+
+if TYPE_CHECKING:
+    from apispec import APISpec
 
 log = logging.getLogger(__name__)
 
 
+def is_related_field(field) -> bool:
+    """
+        Checks if a marshmallow field is a marshmallow-sqlalchemy
+        related field, importing it only when needed
+    """
+    from marshmallow_sqlalchemy.fields import Related, RelatedList
+
+    return isinstance(field, (Related, RelatedList))
+
+
 def get_error_msg():
     """
         (inspired on Superset code)
@@ -147,6 +160,8 @@ def rison(schema=None):
                     else:
                         return self.response_400(message="Not a valid rison argument")
             if schema:
+                import jsonschema
+
                 try:
                     jsonschema.validate(instance=kwargs["rison"], schema=schema)
                 except jsonschema.ValidationError as e:
@@ -444,7 +459,7 @@ class BaseApi(object):
         if self.base_permissions is None:
             self.base_permissions = set()
             is_add_base_permissions = True
-        for attr_name in dir(self):
+        for attr_name in get_view_attribute_names(self):
             # If include_route_methods is not None white list
             if (
                 self.include_route_methods is not None
@@ -485,9 +500,9 @@ class BaseApi(object):
         self._register_urls()
         return self.blueprint
 
-    def add_api_spec(self, api_spec: APISpec) -> None:
+    def add_api_spec(self, api_spec: "APISpec") -> None:
         self.add_apispec_components(api_spec)
-        for attr_name in dir(self):
+        for attr_name in get_view_attribute_names(self):
             attr = getattr(self, attr_name)
             if hasattr(attr, "_urls"):
                 for url, methods in attr._urls:
@@ -512,7 +527,9 @@ class BaseApi(object):
                         )
                         api_spec._paths[path][operation]["tags"] = [openapi_spec_tag]
 
-    def add_apispec_components(self, api_spec: APISpec) -> None:
+    def add_apispec_components(self, api_spec: "APISpec") -> None:
+        from apispec.exceptions import DuplicateComponentNameError
+
         for k, v in self.responses.items():
             api_spec.components._responses[k] = v
         for k, v in self._apispec_parameter_schemas.items():
@@ -522,7 +539,7 @@ class BaseApi(object):
                 pass
 
     def _register_urls(self) -> None:
-        for attr_name in dir(self):
+        for attr_name in get_view_attribute_names(self):
             if (
                 self.include_route_methods is not None
                 and attr_name not in self.include_route_methods
@@ -565,6 +582,9 @@ class BaseApi(object):
         :param dict operations: A `dict` mapping HTTP methods to operation object. See
         :param list methods: A list of methods registered for this path
         """
+        from apispec import yaml_utils
+        import yaml
+
         for method in methods:
             try:
                 # Check if method openapi spec is overridden
@@ -793,10 +813,10 @@ class BaseModelApi(BaseApi):
     """
     _base_filters = None
     """ Internal base Filter from class Filters will always filter view """
-    _filters = None
+    _filters = RequestLocalAttribute()
     """
         Filters object will calculate all possible filter types
-        based on search_columns
+        based on search_columns, each request works on its own copy
     """
 
     def __init__(self, **kwargs):
@@ -984,22 +1004,22 @@ class ModelRestApi(BaseModelApi):
                     'gender': ('name', 'asc')
                 }
     """
-    list_model_schema: Optional[Schema] = None
+    list_model_schema: Optional[Schema] = LazyViewAttribute("_init_model_schemas")
     """
         Override to provide your own marshmallow Schema
         for JSON to SQLA dumps
     """
-    add_model_schema: Optional[Schema] = None
+    add_model_schema: Optional[Schema] = LazyViewAttribute("_init_model_schemas")
     """
         Override to provide your own marshmallow Schema
         for JSON to SQLA dumps
     """
-    edit_model_schema: Optional[Schema] = None
+    edit_model_schema: Optional[Schema] = LazyViewAttribute("_init_model_schemas")
     """
         Override to provide your own marshmallow Schema
         for JSON to SQLA dumps
     """
-    show_model_schema: Optional[Schema] = None
+    show_model_schema: Optional[Schema] = LazyViewAttribute("_init_model_schemas")
     """
         Override to provide your own marshmallow Schema
         for JSON to SQLA dumps
@@ -1022,10 +1042,6 @@ class ModelRestApi(BaseModelApi):
             self.datamodel, self.validators_columns
         )
 
-    def create_blueprint(self, appbuilder, *args, **kwargs):
-        self._init_model_schemas()
-        return super(ModelRestApi, self).create_blueprint(appbuilder, *args, **kwargs)
-
     @property
     def list_model_schema_name(self) -> str:
         return f"{self.__class__.__name__}.get_list"
@@ -1112,7 +1128,7 @@ class ModelRestApi(BaseModelApi):
         self.order_rel_fields = self.order_rel_fields or {}
         # Generate base props
         list_cols = self.datamodel.get_user_columns_list()
-        if not self.list_columns and self.list_model_schema:
+        if not self.list_columns and self.__class__.list_model_schema:
             list(self.list_model_schema._declared_fields.keys())
         else:
             self.list_columns = self.list_columns or [
@@ -1847,7 +1863,7 @@ class ModelRestApi(BaseModelApi):
         ret["label"] = _(self.label_columns.get(field.name, ""))
         ret["description"] = _(self.description_columns.get(field.name, ""))
         # Handles related fields
-        if isinstance(field, Related) or isinstance(field, RelatedList):
+        if is_related_field(field):
             ret["count"], ret["values"] = self._get_list_related_field(
                 field, filter_rel_field, page=page, page_size=page_size
             )
@@ -1903,7 +1919,7 @@ class ModelRestApi(BaseModelApi):
         :return: (int, list) total record count and list of dict with id and value
         """
         ret = list()
-        if isinstance(field, Related) or isinstance(field, RelatedList):
+        if is_related_field(field):
             datamodel = self.datamodel.get_related_interface(field.name)
             filters = datamodel.get_filters(datamodel.get_search_columns_list())
             page, page_size = self._sanitize_page_args(page, page_size)
@@ -4,9 +4,6 @@ from flask_appbuilder.models.sqla import Model
 from flask_appbuilder.models.sqla.interface import SQLAInterface
 from marshmallow import fields
 from marshmallow.fields import Field
-from marshmallow_enum import EnumField
-from marshmallow_sqlalchemy import field_for
-from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 
 class TreeNode:
@@ -96,6 +93,8 @@ class Model2SchemaConverter(BaseModel2SchemaConverter):
         :param class_mixin: a marshamallow Schema to mix
         :return: ModelSchema
         """
+        from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
+
         _model = model
         _parent_schema_name = parent_schema_name
         if columns:
@@ -129,6 +128,8 @@ class Model2SchemaConverter(BaseModel2SchemaConverter):
         column: TreeNode,
         enum_dump_by_name: bool = False,
     ):
+        from marshmallow_enum import EnumField
+
         required = not datamodel.is_nullable(column.data)
         enum_class = datamodel.list_columns[column.data].info.get(
             "enum_class", datamodel.list_columns[column.data].type
@@ -148,6 +149,8 @@ class Model2SchemaConverter(BaseModel2SchemaConverter):
         nested: bool = False,
         parent_schema_name: Optional[str] = None,
     ):
+        from marshmallow_sqlalchemy import field_for
+
         if nested:
             required = not datamodel.is_nullable(column.data)
             nested_model = datamodel.get_related_model(column.data)
@@ -199,6 +202,8 @@ class Model2SchemaConverter(BaseModel2SchemaConverter):
         :param enum_dump_by_name:
         :return: Schema.field
         """
+        from marshmallow_sqlalchemy import field_for
+
         # Handle relations
         if datamodel.is_relation(column.data):
             return self._column2relation(
@@ -1,6 +1,3 @@
-from apispec import APISpec
-from apispec.ext.marshmallow import MarshmallowPlugin
-from apispec.ext.marshmallow.common import resolve_schema_cls
 from flask import current_app
 from flask_appbuilder.api import BaseApi
 from flask_appbuilder.api import expose, protect, safe
@@ -10,6 +7,8 @@ from flask_appbuilder.security.decorators import has_access
 
 
 def resolver(schema):
+    from apispec.ext.marshmallow.common import resolve_schema_cls
+
     schema_cls = resolve_schema_cls(schema)
     name = schema_cls.__name__
     if name == "MetaSchema":
@@ -26,6 +25,10 @@ class OpenApi(BaseApi):
     route_base = "/api"
     allow_browser_login = True
 
+    def __init__(self):
+        super(OpenApi, self).__init__()
+        self._api_specs = {}
+
     @expose("/<version>/_openapi")
     @protect()
     @safe
@@ -53,19 +56,34 @@ class OpenApi(BaseApi):
             500:
               $ref: '#/components/responses/500'
         """
-        version_found = False
-        api_spec = self._create_api_spec(version)
-        for base_api in current_app.appbuilder.baseviews:
-            if isinstance(base_api, BaseApi) and base_api.version == version:
-                base_api.add_api_spec(api_spec)
-                version_found = True
-        if version_found:
-            return self.response(200, **api_spec.to_dict())
+        api_spec = self.get_api_spec(version)
+        if api_spec is not None:
+            return self.response(200, **api_spec)
         else:
             return self.response_404()
 
+    def get_api_spec(self, version):
+        """
+            Returns the OpenApi spec dict of all views on version, or None
+            if there are none. Specs are built once, until views are added
+        """
+        baseviews = current_app.appbuilder.baseviews
+        key = (version, len(baseviews))
+        if key not in self._api_specs:
+            version_found = False
+            api_spec = self._create_api_spec(version)
+            for base_api in baseviews:
+                if isinstance(base_api, BaseApi) and base_api.version == version:
+                    base_api.add_api_spec(api_spec)
+                    version_found = True
+            self._api_specs[key] = api_spec.to_dict() if version_found else None
+        return self._api_specs[key]
+
     @staticmethod
     def _create_api_spec(version):
+        from apispec import APISpec
+        from apispec.ext.marshmallow import MarshmallowPlugin
+
         return APISpec(
             title=current_app.appbuilder.app_name,
             version=version,
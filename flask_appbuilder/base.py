@@ -1,24 +1,43 @@
-from functools import reduce
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, reduce
+import gc
 import logging
-from typing import Dict
-
-from flask import Blueprint, current_app, url_for
+import os
+import threading
+from typing import Any, Callable, Dict, List, Set
+import weakref
+
+from flask import (
+    _request_ctx_stack,
+    Blueprint,
+    current_app,
+    g,
+    has_request_context,
+    url_for,
+)
+from jinja2 import FileSystemBytecodeCache, TemplateError
+from sqlalchemy.orm import configure_mappers, scoped_session
 
 from . import __version__
-from .api.manager import OpenApiManager
+from .api import BaseApi
+from .api.manager import OpenApi, OpenApiManager
 from .babel.manager import BabelManager
 from .const import (
     LOGMSG_ERR_FAB_ADD_PERMISSION_MENU,
     LOGMSG_ERR_FAB_ADD_PERMISSION_VIEW,
     LOGMSG_ERR_FAB_ADDON_IMPORT,
     LOGMSG_ERR_FAB_ADDON_PROCESS,
+    LOGMSG_ERR_FAB_COMPILE_TEMPLATE,
+    LOGMSG_ERR_FAB_WARMUP,
     LOGMSG_INF_FAB_ADD_VIEW,
     LOGMSG_INF_FAB_ADDON_ADDED,
     LOGMSG_WAR_FAB_VIEW_EXISTS,
 )
 from .filters import TemplateFilters
 from .menu import Menu, MenuApiManager
-from .views import IndexView, UtilView
+from .metrics import get_query_stats, QueryMetricsManager, QueryStats
+from .utils.base import init_lazy_attributes, init_overridden_attributes
+from .views import ImageUploadView, IndexView, UtilView
 
 log = logging.getLogger(__name__)
 
@@ -40,6 +59,16 @@ def dynamic_class_import(class_path):
         log.error(LOGMSG_ERR_FAB_ADDON_IMPORT.format(class_path, e))
 
 
+def _prefork_warmup(appbuilder_ref):
+    """
+        os.register_at_fork hook, holds the AppBuilder weakly
+        since hooks can't be unregistered
+    """
+    appbuilder = appbuilder_ref()
+    if appbuilder is not None:
+        appbuilder._prefork_warmup()
+
+
 class AppBuilder(object):
     """
 
@@ -86,6 +115,8 @@ class AppBuilder(object):
     bm = None
     # OpenAPI Manager Class
     openapi_manager = None
+    # Cache backend instance
+    cache = None
     # dict with addon name has key and intantiated class has value
     addon_managers = None
     # temporary list that hold addon_managers config key
@@ -133,6 +164,15 @@ class AppBuilder(object):
                 FAB_UPDATE_PERMS config key also
         """
         self.baseviews = []
+        self._views_by_class = {}
+        self._views_by_base_class = {}
+        self._views_by_name = {}
+        self._inner_view_waiters = {}
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._permissions_synced = False
+        self._warmed_up = False
+        self._warmup_pid = None
         self._addon_managers = []
         self.addon_managers = {}
         self.menu = menu
@@ -164,6 +204,18 @@ class AppBuilder(object):
         app.config.setdefault("FAB_BASE_TEMPLATE", self.base_template)
         app.config.setdefault("FAB_STATIC_FOLDER", self.static_folder)
         app.config.setdefault("FAB_STATIC_URL_PATH", self.static_url_path)
+        app.config.setdefault("FAB_CACHE_CLASS", "flask_appbuilder.cache.SimpleCache")
+        app.config.setdefault("FAB_CACHE_OPTIONS", {})
+        app.config.setdefault("FAB_MENU_CACHE_TIMEOUT", 0)
+        app.config.setdefault("FAB_UPDATE_PERMS_BULK", False)
+        app.config.setdefault("FAB_LAZY_VIEWS", False)
+        app.config.setdefault("FAB_RELATED_VIEWS_WORKERS", 0)
+        app.config.setdefault("FAB_RELATED_CHOICES_CACHE_TIMEOUT", 0)
+        app.config.setdefault("FAB_RELATED_AJAX_THRESHOLD", 0)
+        app.config.setdefault("FAB_SEARCH_FORM_CACHE_TIMEOUT", 0)
+        app.config.setdefault("FAB_WIDGET_CACHE_TIMEOUT", 0)
+        app.config.setdefault("FAB_TEMPLATE_BYTECODE_CACHE", None)
+        app.config.setdefault("FAB_PREFORK_WARMUP", False)
 
         self.app = app
 
@@ -199,10 +251,13 @@ class AppBuilder(object):
 
         self._addon_managers = app.config["ADDON_MANAGERS"]
         self.session = session
+        self.cache = self._init_cache(app)
+        self._init_template_bytecode_cache(app)
         self.sm = self.security_manager_class(self)
         self.bm = BabelManager(self)
         self.openapi_manager = OpenApiManager(self)
         self.menuapi_manager = MenuApiManager(self)
+        self.metrics_manager = QueryMetricsManager(self)
         self._add_global_static()
         self._add_global_filters()
         app.before_request(self.sm.before_request)
@@ -212,8 +267,32 @@ class AppBuilder(object):
             self._add_menu_permissions()
         else:
             self.post_init()
+        if self.update_perms and self.bulk_update_perms:
+            app.before_first_request(self._sync_permissions_on_first_request)
+        # os.register_at_fork needs Python 3.7
+        if app.config["FAB_PREFORK_WARMUP"] and hasattr(os, "register_at_fork"):
+            self._warmup_pid = os.getpid()
+            os.register_at_fork(before=partial(_prefork_warmup, weakref.ref(self)))
         self._init_extension(app)
 
+    def _init_cache(self, app):
+        _cache_class_name = app.config["FAB_CACHE_CLASS"]
+        if not _cache_class_name:
+            return None
+        cache_class = dynamic_class_import(_cache_class_name)
+        if cache_class is None:
+            return None
+        return cache_class(**app.config["FAB_CACHE_OPTIONS"])
+
+    def _init_template_bytecode_cache(self, app):
+        bytecode_cache = app.config["FAB_TEMPLATE_BYTECODE_CACHE"]
+        if not bytecode_cache:
+            return
+        if isinstance(bytecode_cache, str):
+            os.makedirs(bytecode_cache, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache)
+        app.jinja_env.bytecode_cache = bytecode_cache
+
     def _init_extension(self, app):
         app.appbuilder = self
         if not hasattr(app, "extensions"):
@@ -291,6 +370,142 @@ class AppBuilder(object):
         """
         return __version__
 
+    def _get_executor(self, max_workers: int) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max_workers, thread_name_prefix="fab"
+                    )
+        return self._executor
+
+    def map_concurrently(self, funcs: List[Callable[[], Any]]) -> List[Any]:
+        """
+            Calls all funcs and returns their results in the same order.
+            When FAB_RELATED_VIEWS_WORKERS is set and the session is scoped,
+            funcs run on a thread pool, each on its own copy of the request
+            context with a copy of flask.g. Each thread queries with its own
+            session and removes it when done, so funcs must return values
+            already loaded, rendered widgets for example. The threads SQL
+            statements stats are added to the request's.
+            Use it for independent reads only.
+
+            :param funcs: List of callables without arguments
+            :return: List with the results
+        """
+        max_workers = self.get_app.config["FAB_RELATED_VIEWS_WORKERS"]
+        if (
+            len(funcs) < 2
+            or not max_workers
+            or not isinstance(self.session, scoped_session)
+            or not has_request_context()
+        ):
+            return [func() for func in funcs]
+        request_ctx = _request_ctx_stack.top
+        session = self.session
+        # Set the session's CSRF token now, so threads don't race for it
+        csrf_token = request_ctx.app.jinja_env.globals.get("csrf_token")
+        if csrf_token:
+            csrf_token()
+        g_values = dict(g.__dict__)
+        stats = get_query_stats()
+
+        def run(func: Callable[[], Any]) -> Any:
+            ctx = request_ctx.copy()
+            # Flask-Login keeps the user on the request context
+            if hasattr(request_ctx, "user"):
+                ctx.user = request_ctx.user
+            with ctx:
+                g.__dict__.update(g_values)
+                if "_fab_request_locals" in g_values:
+                    g._fab_request_locals = dict(g_values["_fab_request_locals"])
+                if stats is not None:
+                    g._fab_query_stats = QueryStats()
+                try:
+                    return func(), get_query_stats()
+                finally:
+                    session.remove()
+
+        executor = self._get_executor(max_workers)
+        futures = [executor.submit(run, func) for func in funcs]
+        results = []
+        for future in futures:
+            result, thread_stats = future.result()
+            if stats is not None:
+                stats.merge(thread_stats)
+            results.append(result)
+        return results
+
+    def compile_templates(self) -> List[str]:
+        """
+            Loads all FAB and application templates into the Jinja
+            environment, compiling the ones not yet on
+            FAB_TEMPLATE_BYTECODE_CACHE. Call it before forking workers
+            so they share the compiled templates.
+
+            :return: The names of the templates loaded
+        """
+        jinja_env = self.get_app.jinja_env
+        names = []
+        for name in jinja_env.list_templates():
+            try:
+                jinja_env.get_template(name)
+            except (TemplateError, UnicodeDecodeError) as e:
+                log.error(LOGMSG_ERR_FAB_COMPILE_TEMPLATE.format(name, e))
+                continue
+            names.append(name)
+        return names
+
+    def warmup(self):
+        """
+            Builds now the state otherwise built on first use: SQLAlchemy
+            mappers, view forms and schemas, the permissions (synced when
+            FAB_UPDATE_PERMS_BULK is set), the menu index, the OpenAPI specs
+            and the templates. Then closes the database connections and
+            freezes all objects out of the garbage collector (gc.freeze).
+
+            Call it on the master process once all views are added, before
+            forking workers, so they share that memory copy-on-write and
+            serve their first requests at full speed, from gunicorn's
+            when_ready hook for example. FAB_PREFORK_WARMUP calls it
+            before the first fork of the process that made the AppBuilder.
+        """
+        app = self.get_app
+        with app.test_request_context():
+            configure_mappers()
+            for baseview in self.baseviews:
+                init_lazy_attributes(baseview)
+            self.menu.index
+            if self.update_perms and self.bulk_update_perms:
+                self.sync_permissions()
+            openapi = self.find_view(OpenApi)
+            if openapi is not None:
+                for version in {
+                    baseview.version
+                    for baseview in self.baseviews
+                    if isinstance(baseview, BaseApi)
+                }:
+                    openapi.get_api_spec(version)
+            self.compile_templates()
+            # Workers can't share the master's connections
+            if isinstance(self.session, scoped_session):
+                self.session.remove()
+                self.session.get_bind().dispose()
+        self._warmed_up = True
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+
+    def _prefork_warmup(self):
+        # Only on the process that made the AppBuilder, not on workers forking
+        if self._warmed_up or os.getpid() != self._warmup_pid:
+            return
+        try:
+            self.warmup()
+        except Exception as e:
+            log.exception(e)
+            log.error(LOGMSG_ERR_FAB_WARMUP.format(str(e)))
+
     def _add_global_filters(self):
         self.template_filters = TemplateFilters(self.get_app, self.sm)
 
@@ -312,10 +527,13 @@ class AppBuilder(object):
         self.indexview = self._check_and_init(self.indexview)
         self.add_view_no_menu(self.indexview)
         self.add_view_no_menu(UtilView())
+        if self.get_app.config.get("IMG_UPLOAD_VIEW"):
+            self.add_view_no_menu(ImageUploadView())
         self.bm.register_views()
         self.sm.register_views()
         self.openapi_manager.register_views()
         self.menuapi_manager.register_views()
+        self.metrics_manager.register_views()
 
     def _add_addon_views(self):
         """
@@ -415,8 +633,7 @@ class AppBuilder(object):
 
         if not self._view_exists(baseview):
             baseview.appbuilder = self
-            self.baseviews.append(baseview)
-            self._process_inner_views()
+            self._add_baseview(baseview)
             if self.app:
                 self.register_blueprint(baseview)
                 self._add_permission(baseview)
@@ -503,8 +720,7 @@ class AppBuilder(object):
 
         if not self._view_exists(baseview):
             baseview.appbuilder = self
-            self.baseviews.append(baseview)
-            self._process_inner_views()
+            self._add_baseview(baseview)
             if self.app:
                 self.register_blueprint(
                     baseview, endpoint=endpoint, static_folder=static_folder
@@ -576,13 +792,58 @@ class AppBuilder(object):
             locale=lang,
         )
 
+    @property
+    def bulk_update_perms(self) -> bool:
+        return self.get_app.config["FAB_UPDATE_PERMS_BULK"]
+
+    def get_permissions_state(self) -> Dict[str, Set[str]]:
+        """
+            Returns all permissions needed by the registered views and menus
+
+            :return: Dict with view menu names has keys and sets
+                of permission names has values
+        """
+        permissions = {}
+        for baseview in self.baseviews:
+            permissions.setdefault(baseview.class_permission_name, set()).update(
+                baseview.base_permissions
+            )
+        for name in self.menu.flat_names:
+            permissions.setdefault(name, set()).add("menu_access")
+        return permissions
+
+    def sync_permissions(self):
+        """
+            Adds all missing permissions from registered views and menus,
+            and grants them to the admin role, in a single transaction.
+            Used when FAB_UPDATE_PERMS_BULK is True, instead of syncing
+            each view when it's registered.
+            Does not remove any permission, use security_cleanup for that.
+        """
+        try:
+            self.sm.add_permissions_bulk(self.get_permissions_state())
+            self._permissions_synced = True
+        except Exception as e:
+            log.exception(e)
+            log.error(LOGMSG_ERR_FAB_ADD_PERMISSION_VIEW.format(str(e)))
+
+    def _sync_permissions_on_first_request(self):
+        # Already done by warmup before the worker was forked
+        if not self._permissions_synced:
+            self.sync_permissions()
+
     def add_permissions(self, update_perms=False):
         if self.update_perms or update_perms:
+            if self.bulk_update_perms:
+                self.sync_permissions()
+                return
             for baseview in self.baseviews:
                 self._add_permission(baseview, update_perms=update_perms)
             self._add_menu_permissions(update_perms=update_perms)
 
     def _add_permission(self, baseview, update_perms=False):
+        if self.bulk_update_perms and not update_perms:
+            return
         if self.update_perms or update_perms:
             try:
                 self.sm.add_permissions_view(
@@ -593,6 +854,8 @@ class AppBuilder(object):
                 log.error(LOGMSG_ERR_FAB_ADD_PERMISSION_VIEW.format(str(e)))
 
     def _add_permissions_menu(self, name, update_perms=False):
+        if self.bulk_update_perms and not update_perms:
+            return
         if self.update_perms or update_perms:
             try:
                 self.sm.add_permissions_menu(name)
@@ -615,19 +878,43 @@ class AppBuilder(object):
                 self, endpoint=endpoint, static_folder=static_folder
             )
         )
+        if not self.get_app.config.get("FAB_LAZY_VIEWS", False):
+            init_lazy_attributes(baseview)
+        init_overridden_attributes(baseview)
+
+    def find_view(self, view):
+        """
+            Finds a registered view by class or class name
+
+            :param view: A BaseView class, or a class name
+            :return: The registered view instance or None
+        """
+        if isinstance(view, str):
+            return self._views_by_name.get(view)
+        return self._views_by_class.get(view)
 
     def _view_exists(self, view):
-        for baseview in self.baseviews:
-            if baseview.__class__ == view.__class__:
-                return True
-        return False
-
-    def _process_inner_views(self):
-        for view in self.baseviews:
-            for inner_class in view.get_uninit_inner_views():
-                for v in self.baseviews:
-                    if (
-                        isinstance(v, inner_class)
-                        and v not in view.get_init_inner_views()
-                    ):
-                        view.get_init_inner_views().append(v)
+        return self.find_view(view.__class__) is not None
+
+    def _add_baseview(self, baseview):
+        """
+            Registers baseview on baseviews and on the indexes by class
+            and by class name, and resolves inner views (related views)
+            in both directions: views waiting for this view class,
+            and already registered views this view is waiting for
+        """
+        self.baseviews.append(baseview)
+        self._views_by_class[baseview.__class__] = baseview
+        self._views_by_name.setdefault(baseview.__class__.__name__, baseview)
+        mro = baseview.__class__.__mro__
+        for view_class in mro:
+            self._views_by_base_class.setdefault(view_class, []).append(baseview)
+        for view_class in mro:
+            for view in self._inner_view_waiters.get(view_class, []):
+                if baseview not in view.get_init_inner_views():
+                    view.get_init_inner_views().append(baseview)
+        for inner_class in baseview.get_uninit_inner_views():
+            for view in self._views_by_base_class.get(inner_class, []):
+                if view not in baseview.get_init_inner_views():
+                    baseview.get_init_inner_views().append(view)
+            self._inner_view_waiters.setdefault(inner_class, []).append(baseview)
@@ -1,4 +1,5 @@
 from datetime import date, datetime
+from functools import partial
 from inspect import isclass
 import json
 import logging
@@ -14,9 +15,11 @@ from flask import (
     session,
     url_for,
 )
+from flask_babel import get_locale
 
 from ._compat import as_unicode
 from .actions import ActionItem
+from .cache import get_cache, make_cache_key
 from .const import PERMISSION_PREFIX
 from .forms import GeneralModelConverter
 from .urltools import (
@@ -26,7 +29,19 @@ from .urltools import (
     get_page_size_args,
     Stack,
 )
-from .widgets import FormWidget, ListWidget, SearchWidget, ShowWidget
+from .utils.base import (
+    get_view_attribute_names,
+    LazyViewAttribute,
+    RequestLocalAttribute,
+)
+from .widgets import (
+    CachedWidget,
+    FormWidget,
+    ListWidget,
+    render_widget,
+    SearchWidget,
+    ShowWidget,
+)
 
 log = logging.getLogger(__name__)
 
@@ -176,7 +191,7 @@ class BaseView(object):
             self.base_permissions = set()
             is_add_base_permissions = True
 
-        for attr_name in dir(self):
+        for attr_name in get_view_attribute_names(self):
             # If include_route_methods is not None white list
             if (
                 self.include_route_methods is not None
@@ -198,7 +213,7 @@ class BaseView(object):
         if not self.extra_args:
             self.extra_args = dict()
         self._apis = dict()
-        for attr_name in dir(self):
+        for attr_name in get_view_attribute_names(self):
             if hasattr(getattr(self, attr_name), "_extra"):
                 _extra = getattr(getattr(self, attr_name), "_extra")
                 for key in _extra:
@@ -247,7 +262,7 @@ class BaseView(object):
         return self.blueprint
 
     def _register_urls(self):
-        for attr_name in dir(self):
+        for attr_name in get_view_attribute_names(self):
             if (
                 self.include_route_methods is not None
                 and attr_name not in self.include_route_methods
@@ -491,7 +506,7 @@ class BaseModelView(BaseView):
                 label_columns = {'name':'My Name Label Override'}
 
     """
-    search_form = None
+    search_form = LazyViewAttribute("_init_forms")
     """ To implement your own add WTF form for Search """
     base_filters = None
     """
@@ -521,12 +536,23 @@ class BaseModelView(BaseView):
 
     search_widget = SearchWidget
     """ Search widget you can override with your own """
+    widget_cache_timeout = None
+    """
+        Seconds the rendered list, show and search widgets are kept
+        on cache, defaults to FAB_WIDGET_CACHE_TIMEOUT, 0 disables it.
+        Widgets are cached per request path and args, data of the
+        view's model and its related models on the widget columns,
+        base filters, user roles and locale, only enable it if
+        nothing else changes what the widgets show
+    """
+    widget_cache = None
+    """ A BaseCache for the rendered widgets, defaults to the AppBuilder cache """
 
     _base_filters = None
     """ Internal base Filter from class Filters will always filter view """
-    _filters = None
+    _filters = RequestLocalAttribute()
     """ Filters object will calculate all possible filter types
-    based on search_columns """
+    based on search_columns, each request works on its own copy """
 
     def __init__(self, **kwargs):
         """
@@ -536,7 +562,6 @@ class BaseModelView(BaseView):
         if datamodel:
             self.datamodel = datamodel
         self._init_properties()
-        self._init_forms()
         self._init_titles()
         super(BaseModelView, self).__init__(**kwargs)
 
@@ -580,18 +605,131 @@ class BaseModelView(BaseView):
                 filter_rel_fields=self.search_form_query_rel_fields,
             )
 
-    def _get_search_widget(self, form=None, exclude_cols=None, widgets=None):
+    def _get_widget_cache_key(self, cache, name, columns, filters=None, args=()):
+        """
+            Widgets are cached per request, data version of the related
+            models, filters values, roles and locale. And per user, when
+            a filter value is computed on each request, like get_user
+
+            :param filters: The filters the widget data is queried with,
+                defaults to the base filters
+            :param args: Other arguments the widget data depends on
+        """
+        sm = self.appbuilder.sm
+        if filters is None:
+            filters = self._base_filters
+        models = {self.datamodel.model_name}
+        for col in columns:
+            col = col.split(".")[0]
+            if self.datamodel.is_relation(col):
+                models.add(self.datamodel.get_related_interface(col).model_name)
+        user_id = None
+        if filters.has_callable_values() and sm.current_user is not None:
+            user_id = sm.current_user.get_id()
+        return make_cache_key(
+            "widget",
+            self.endpoint,
+            name,
+            request.script_root,
+            request.path,
+            sorted(request.args.items(multi=True)),
+            [cache.get_version(model_name) for model_name in sorted(models)],
+            filters.get_filters_signature(),
+            args,
+            user_id,
+            cache.get_version(sm.role_model.__name__),
+            sm.get_user_roles_signature(),
+            str(get_locale()),
+        )
+
+    def _get_cached_widget(self, name, columns, factory, filters=None, args=()):
+        """
+            Returns the widget made by factory, or a CachedWidget
+            that only calls factory on cache misses when
+            widget caching is enabled
+
+            :param filters: The filters the widget data is queried with
+            :param args: Other arguments the widget data depends on
+        """
+        cache = get_cache()
+        timeout = self.widget_cache_timeout
+        if timeout is None:
+            timeout = current_app.config["FAB_WIDGET_CACHE_TIMEOUT"]
+        if cache is None or not timeout:
+            return factory()
+        key = self._get_widget_cache_key(cache, name, columns, filters, args)
+        return CachedWidget(factory, self.widget_cache or cache, key, timeout)
+
+    def _get_search_widget(
+        self, form=None, exclude_cols=None, widgets=None, search_form_fields=None
+    ):
         exclude_cols = exclude_cols or []
         widgets = widgets or {}
-        widgets["search"] = self.search_widget(
-            route_base=self.route_base,
-            form=form,
-            include_cols=self.search_columns,
-            exclude_cols=exclude_cols,
-            filters=self._filters,
+
+        def factory():
+            label_columns, form_fields = search_form_fields or (None, None)
+            return self.search_widget(
+                route_base=self.route_base,
+                form=form,
+                include_cols=self.search_columns,
+                exclude_cols=exclude_cols,
+                filters=self._filters,
+                label_columns=label_columns,
+                form_fields=form_fields,
+            )
+
+        widgets["search"] = self._get_cached_widget(
+            "search", self.search_columns, factory
         )
         return widgets
 
+    def _get_search_form_cache_key(self, cache):
+        """
+            Search form fields are cached per view, locale, data version
+            of the related models and values of their filters
+        """
+        versions = [
+            cache.get_version(self.datamodel.get_related_interface(col).model_name)
+            for col in self.search_columns
+            if self.datamodel.is_relation(col)
+        ]
+        rel_filters = []
+        for col, filters in sorted((self.search_form_query_rel_fields or {}).items()):
+            for col_name, flt, value in filters:
+                if callable(value):
+                    value = value()
+                rel_filters.append((col, col_name, flt.__name__, value))
+        return make_cache_key(
+            "search_form",
+            self.endpoint,
+            str(get_locale()),
+            versions,
+            rel_filters,
+        )
+
+    def _get_search_form_fields(self):
+        """
+            Returns the labels and rendered HTML of the search form fields,
+            kept on the AppBuilder cache for FAB_SEARCH_FORM_CACHE_TIMEOUT
+            seconds (0 disables it), so the form is not instantiated
+            and its related fields not queried on every request
+        """
+        cache = get_cache()
+        timeout = current_app.config["FAB_SEARCH_FORM_CACHE_TIMEOUT"]
+        if cache is None or not timeout:
+            return self._render_search_form_fields()
+        key = self._get_search_form_cache_key(cache)
+        search_form_fields = cache.get(key)
+        if search_form_fields is None:
+            search_form_fields = self._render_search_form_fields()
+            cache.set(key, search_form_fields, timeout=timeout)
+        return search_form_fields
+
+    def _render_search_form_fields(self):
+        return self.search_widget.render_form(
+            self.search_form.refresh(), self.search_columns
+        )
+
     def _label_columns_json(self):
         """
             Prepares dict with labels to be JSON serializable
@@ -774,9 +912,9 @@ class BaseCRUDView(BaseModelView):
 
     """
 
-    add_form = None
+    add_form = LazyViewAttribute("_init_forms")
     """ To implement your own, assign WTF form for Add """
-    edit_form = None
+    edit_form = LazyViewAttribute("_init_forms")
     """ To implement your own, assign WTF form for Edit """
 
     list_template = "appbuilder/general/model/list.html"
@@ -803,7 +941,7 @@ class BaseCRUDView(BaseModelView):
         super(BaseCRUDView, self).__init__(**kwargs)
         # collect and setup actions
         self.actions = {}
-        for attr_name in dir(self):
+        for attr_name in get_view_attribute_names(self):
             func = getattr(self, attr_name)
             if hasattr(func, "_action"):
                 action = ActionItem(*func._action, func=func)
@@ -833,6 +971,7 @@ class BaseCRUDView(BaseModelView):
                 self.validators_columns,
                 self.add_form_extra_fields,
                 self.add_form_query_rel_fields,
+                ajax_endpoint=self._get_exposed_endpoint("add_related_options"),
             )
         if not self.edit_form:
             self.edit_form = conv.create_form(
@@ -842,8 +981,25 @@ class BaseCRUDView(BaseModelView):
                 self.validators_columns,
                 self.edit_form_extra_fields,
                 self.edit_form_query_rel_fields,
+                ajax_endpoint=self._get_exposed_endpoint("edit_related_options"),
             )
 
+    def _get_exposed_endpoint(self, method_name):
+        """
+            Returns the relative endpoint for method_name,
+            or None if this view does not expose it
+        """
+        if not hasattr(getattr(self.__class__, method_name, None), "_urls"):
+            return None
+        if (
+            self.include_route_methods is not None
+            and method_name not in self.include_route_methods
+        ):
+            return None
+        if method_name in self.exclude_route_methods:
+            return None
+        return "." + method_name
+
     def _init_titles(self):
         """
             Init Titles if not defined
@@ -966,30 +1122,45 @@ class BaseCRUDView(BaseModelView):
         )
 
     def _get_related_views_widgets(
-        self, item, orders=None, pages=None, page_sizes=None, widgets=None, **args
+        self,
+        item,
+        orders=None,
+        pages=None,
+        page_sizes=None,
+        widgets=None,
+        widget_args=None,
+        **args
     ):
         """
+            :param widget_args:
+                The kwargs the template renders the widgets with,
+                they are rendered with them while fetched
             :return:
                 Returns a dict with 'related_views' key with a list of
                 Model View widgets
         """
         widgets = widgets or {}
-        widgets["related_views"] = []
+        related_view_widgets = []
         for view in self._related_views:
             if orders.get(view.__class__.__name__):
                 order_column, order_direction = orders.get(view.__class__.__name__)
             else:
                 order_column, order_direction = "", ""
-            widgets["related_views"].append(
-                self._get_related_view_widget(
-                    item,
-                    view,
-                    order_column,
-                    order_direction,
-                    page=pages.get(view.__class__.__name__),
-                    page_size=page_sizes.get(view.__class__.__name__),
-                )
+            get_widget = partial(
+                self._get_related_view_widget,
+                item,
+                view,
+                order_column,
+                order_direction,
+                page=pages.get(view.__class__.__name__),
+                page_size=page_sizes.get(view.__class__.__name__),
+            )
+            related_view_widgets.append(
+                partial(render_widget, get_widget, **(widget_args or {}))
             )
+        widgets["related_views"] = self.appbuilder.map_concurrently(
+            related_view_widgets
+        )
         return widgets
 
     def _get_view_widget(self, **kwargs):
@@ -1017,23 +1188,49 @@ class BaseCRUDView(BaseModelView):
         page_size = page_size or self.page_size
         if not order_column and self.base_order:
             order_column, order_direction = self.base_order
+        widgets["list"] = self._get_cached_widget(
+            "list",
+            self.list_columns,
+            partial(
+                self._make_list_widget,
+                filters,
+                actions,
+                order_column,
+                order_direction,
+                page,
+                page_size,
+            ),
+            filters=filters.get_joined_filters(self._base_filters),
+            args=(order_column, order_direction, page, page_size),
+        )
+        return widgets
+
+    def _make_list_widget(
+        self, filters, actions, order_column, order_direction, page, page_size
+    ):
         joined_filters = filters.get_joined_filters(self._base_filters)
+        kwargs = {}
+        if self.datamodel.supports_load_columns:
+            kwargs["load_columns"] = self.list_columns
         count, lst = self.datamodel.query(
             joined_filters,
             order_column,
             order_direction,
             page=page,
             page_size=page_size,
+            **kwargs
         )
         pks = self.datamodel.get_keys(lst)
 
         # serialize composite pks
         pks = [self._serialize_pk_if_composite(pk) for pk in pks]
+        # Read values now, the widget may render after the query session is gone
+        value_columns = list(self.datamodel.get_values(lst, self.list_columns))
 
-        widgets["list"] = self.list_widget(
+        return self.list_widget(
             label_columns=self.label_columns,
             include_columns=self.list_columns,
-            value_columns=self.datamodel.get_values(lst, self.list_columns),
+            value_columns=value_columns,
             order_columns=self.order_columns,
             formatters_columns=self.formatters_columns,
             page=page,
@@ -1044,7 +1241,6 @@ class BaseCRUDView(BaseModelView):
             filters=filters,
             modelview_name=self.__class__.__name__,
         )
-        return widgets
 
     def _get_show_widget(
         self, pk, item, widgets=None, actions=None, show_fieldsets=None
@@ -1052,16 +1248,20 @@ class BaseCRUDView(BaseModelView):
         widgets = widgets or {}
         actions = actions or self.actions
         show_fieldsets = show_fieldsets or self.show_fieldsets
-        widgets["show"] = self.show_widget(
-            pk=pk,
-            label_columns=self.label_columns,
-            include_columns=self.show_columns,
-            value_columns=self.datamodel.get_values_item(item, self.show_columns),
-            formatters_columns=self.formatters_columns,
-            actions=actions,
-            fieldsets=show_fieldsets,
-            modelview_name=self.__class__.__name__,
-        )
+
+        def factory():
+            return self.show_widget(
+                pk=pk,
+                label_columns=self.label_columns,
+                include_columns=self.show_columns,
+                value_columns=self.datamodel.get_values_item(item, self.show_columns),
+                formatters_columns=self.formatters_columns,
+                actions=actions,
+                fieldsets=show_fieldsets,
+                modelview_name=self.__class__.__name__,
+            )
+
+        widgets["show"] = self._get_cached_widget("show", self.show_columns, factory)
         return widgets
 
     def _get_add_widget(self, form, exclude_cols=None, widgets=None):
@@ -1126,9 +1326,10 @@ class BaseCRUDView(BaseModelView):
             page=page,
             page_size=page_size,
         )
-        form = self.search_form.refresh()
         self.update_redirect()
-        return self._get_search_widget(form=form, widgets=widgets)
+        return self._get_search_widget(
+            search_form_fields=self._get_search_form_fields(), widgets=widgets
+        )
 
     def _show(self, pk):
         """
@@ -1145,7 +1346,12 @@ class BaseCRUDView(BaseModelView):
         widgets = self._get_show_widget(pk, item)
         self.update_redirect()
         return self._get_related_views_widgets(
-            item, orders=orders, pages=pages, page_sizes=page_sizes, widgets=widgets
+            item,
+            orders=orders,
+            pages=pages,
+            page_sizes=page_sizes,
+            widgets=widgets,
+            widget_args={"pk": pk},
         )
 
     def _add(self):
@@ -0,0 +1,290 @@
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+import uuid
+
+from flask import current_app, has_app_context
+
+from .const import LOGMSG_WAR_FAB_CACHE_BACKEND
+
+log = logging.getLogger(__name__)
+
+VERSION_KEY_PREFIX = "fab:version:"
+
+
+def get_cache():
+    """
+        Returns the AppBuilder cache for the current app,
+        or None if there is no app context or no cache configured
+    """
+    if not has_app_context():
+        return None
+    appbuilder = current_app.extensions.get("appbuilder")
+    return getattr(appbuilder, "cache", None)
+
+
+def make_cache_key(*args) -> str:
+    """
+        Builds a cache key from any number of repr'able values
+    """
+    return hashlib.md5(repr(args).encode("utf-8")).hexdigest()
+
+
+class BaseCache(object):
+    """
+        Base class for all cache backends.
+        Sub class it to implement your own backend, and
+        set it with FAB_CACHE_CLASS config key.
+
+        Invalidation is made by namespace (normally a model name), every
+        namespace has a data version that should be part of the keys
+        built for that namespace, invalidating a namespace just sets
+        a new version.
+    """
+
+    def __init__(self, default_timeout: int = 300):
+        self.default_timeout = default_timeout
+
+    def _get_expire(self, timeout: Optional[int]) -> float:
+        if timeout is None:
+            timeout = self.default_timeout
+        if timeout <= 0:
+            return 0
+        return time.time() + timeout
+
+    def get(self, key: str) -> Any:
+        """
+            Returns the value for key or None if it does not exist or expired
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        """
+            Sets a value for key
+
+            :param timeout: seconds to live, 0 never expires,
+                None uses default_timeout
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def get_version(self, namespace: str) -> str:
+        """
+            Returns the current data version for namespace,
+            a missing (or evicted) version starts a new one
+        """
+        version = self.get(VERSION_KEY_PREFIX + namespace)
+        if version is None:
+            version = self.invalidate(namespace)
+        return version
+
+    def invalidate(self, namespace: str) -> str:
+        """
+            Invalidates all keys built with the namespace data version
+
+            :return: The new data version
+        """
+        version = uuid.uuid4().hex
+        self.set(VERSION_KEY_PREFIX + namespace, version, timeout=0)
+        return version
+
+
+class SimpleCache(BaseCache):
+    """
+        In process LRU cache, entries are not shared between workers
+    """
+
+    def __init__(self, threshold: int = 500, default_timeout: int = 300):
+        super(SimpleCache, self).__init__(default_timeout=default_timeout)
+        self.threshold = threshold
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            try:
+                expires, value = self._cache[key]
+            except KeyError:
+                return None
+            if expires and expires < time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        with self._lock:
+            self._cache[key] = (self._get_expire(timeout), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.threshold:
+                self._cache.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+class FileSystemCache(BaseCache):
+    """
+        Stores pickled entries on a directory, can be shared by
+        all workers on the same host
+    """
+
+    file_suffix = ".fabcache"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        threshold: int = 500,
+        default_timeout: int = 300,
+        mode: int = 0o600,
+    ):
+        super(FileSystemCache, self).__init__(default_timeout=default_timeout)
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "fab_cache")
+        self.threshold = threshold
+        self.mode = mode
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _get_filename(self, key: str) -> str:
+        return os.path.join(
+            self.cache_dir, hashlib.md5(key.encode("utf-8")).hexdigest()
+        ) + self.file_suffix
+
+    def _list_dir(self):
+        return [
+            os.path.join(self.cache_dir, filename)
+            for filename in os.listdir(self.cache_dir)
+            if filename.endswith(self.file_suffix)
+        ]
+
+    def _prune(self) -> None:
+        filenames = self._list_dir()
+        if len(filenames) <= self.threshold:
+            return
+        now = time.time()
+        entries = []
+        for filename in filenames:
+            try:
+                with open(filename, "rb") as f:
+                    expires = pickle.load(f)
+                if expires and expires < now:
+                    os.remove(filename)
+                else:
+                    entries.append((os.path.getmtime(filename), filename))
+            except (IOError, OSError, EOFError, pickle.PickleError):
+                continue
+        for _, filename in sorted(entries)[: max(0, len(entries) - self.threshold)]:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Any:
+        filename = self._get_filename(key)
+        try:
+            with open(filename, "rb") as f:
+                expires = pickle.load(f)
+                if not expires or expires >= time.time():
+                    return pickle.load(f)
+            os.remove(filename)
+        except (IOError, OSError, EOFError, pickle.PickleError):
+            pass
+        return None
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        self._prune()
+        filename = self._get_filename(key)
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(self._get_expire(timeout), f)
+                pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, filename)
+            os.chmod(filename, self.mode)
+        except (IOError, OSError) as e:
+            log.warning(LOGMSG_WAR_FAB_CACHE_BACKEND.format(str(e)))
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._get_filename(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        for filename in self._list_dir():
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+
+class RedisCache(BaseCache):
+    """
+        Uses a Redis server, or anything that talks the same API,
+        entries are shared by all workers and hosts.
+
+        :param client: An already instantiated redis compatible client,
+            if not given a redis.Redis client is created from url
+        :param url: The redis url to connect to
+        :param key_prefix: prefix for all keys set by this cache
+    """
+
+    def __init__(
+        self,
+        client=None,
+        url: str = "redis://localhost:6379/0",
+        key_prefix: str = "fab:",
+        default_timeout: int = 300,
+    ):
+        super(RedisCache, self).__init__(default_timeout=default_timeout)
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def get(self, key: str) -> Any:
+        value = self.client.get(self.key_prefix + key)
+        if value is None:
+            return None
+        try:
+            return pickle.loads(value)
+        except pickle.PickleError:
+            return None
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        if timeout is None:
+            timeout = self.default_timeout
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if timeout > 0:
+            self.client.set(self.key_prefix + key, value, ex=timeout)
+        else:
+            self.client.set(self.key_prefix + key, value)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.key_prefix + key)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.key_prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
@@ -1,10 +1,11 @@
 import logging
 
-from flask_babel import lazy_gettext
+from flask_babel import get_locale, lazy_gettext
 
 from .jsontools import dict_to_json
 from .widgets import ChartWidget, DirectChartWidget
 from ..baseviews import BaseModelView, expose
+from ..cache import make_cache_key
 from ..models.group import DirectProcessData, GroupByProcessData
 from ..security.decorators import has_access
 from ..urltools import get_filter_args
@@ -48,6 +49,14 @@ class BaseChartView(BaseModelView):
     group_bys = {}
     """ New for 0.6.4, on test, don't use yet """
 
+    chart_cache_timeout = 0
+    """
+        Seconds to cache the computed chart data on the AppBuilder cache
+        (configured with FAB_CACHE_CLASS), zero disables caching.
+        Cached data is invalidated when the view's model is changed
+        using its interface (add, edit, delete)
+    """
+
     def __init__(self, **kwargs):
         self._init_titles()
         super(BaseChartView, self).__init__(**kwargs)
@@ -55,6 +64,42 @@ class BaseChartView(BaseModelView):
     def _init_titles(self):
         self.title = self.chart_title
 
+    def get_chart_cache_key(self, filters, *args):
+        """
+            Returns the cache key for the chart data. Override it if
+            your chart data depends on other request state, for example
+            a custom filter that reads the current user.
+
+            :param filters: The joined filters (base filters included)
+            :param args: The chart arguments, definition, order etc
+        """
+        return make_cache_key(
+            self.endpoint,
+            self.appbuilder.cache.get_version(self.datamodel.model_name),
+            str(get_locale()),
+            filters.get_filters_signature(),
+            args,
+        )
+
+    def get_chart_data(self, filters, compute, *args):
+        """
+            Returns the chart data from cache, or calls compute
+            and caches its result for chart_cache_timeout seconds
+
+            :param filters: The joined filters (base filters included)
+            :param compute: function that returns the chart data
+            :param args: The chart arguments, definition, order etc
+        """
+        cache = self.appbuilder.cache
+        if not self.chart_cache_timeout or cache is None:
+            return compute()
+        key = self.get_chart_cache_key(filters, *args)
+        data = cache.get(key)
+        if data is None:
+            data = compute()
+            cache.set(key, data, timeout=self.chart_cache_timeout)
+        return data
+
     def _get_chart_widget(self, filters=None, widgets=None, **args):
         raise NotImplementedError
 
@@ -168,16 +213,26 @@ class GroupByChartView(BaseChartView):
         if not self.datamodel.get_order_columns_list([order_column]):
             order_column = ""
             order_direction = ""
-        count, lst = self.datamodel.query(
-            filters=joined_filters,
-            order_column=order_column,
-            order_direction=order_direction,
-        )
         if not definition:
             definition = self.definitions[0]
-        group = self.get_group_by_class(definition)
-        value_columns = group.to_json(
-            group.apply(lst, sort=order_column == ""), self.label_columns
+
+        def compute():
+            count, lst = self.datamodel.query(
+                filters=joined_filters,
+                order_column=order_column,
+                order_direction=order_direction,
+            )
+            group = self.get_group_by_class(definition)
+            return group.to_json(
+                group.apply(lst, sort=order_column == ""), self.label_columns
+            )
+
+        value_columns = self.get_chart_data(
+            joined_filters,
+            compute,
+            self.definitions.index(definition),
+            order_column,
+            order_direction,
         )
         widgets["chart"] = self.chart_widget(
             route_base=self.route_base,
@@ -196,7 +251,6 @@ class GroupByChartView(BaseChartView):
     @has_access
     def chart(self, group_by=0):
         group_by = int(group_by)
-        form = self.search_form.refresh()
         get_filter_args(self._filters)
         widgets = self._get_chart_widget(
             filters=self._filters,
@@ -204,7 +258,9 @@ class GroupByChartView(BaseChartView):
             order_column=self.definitions[group_by]["group"],
             order_direction="asc",
         )
-        widgets = self._get_search_widget(form=form, widgets=widgets)
+        widgets = self._get_search_widget(
+            search_form_fields=self._get_search_form_fields(), widgets=widgets
+        )
         self.update_redirect()
         return self.render_template(
             self.chart_template,
@@ -298,8 +354,12 @@ class BaseSimpleGroupByChartView(BaseChartView):  # pragma: no cover
         widgets = widgets or dict()
         group_by = group_by or self.group_by_columns[0]
         joined_filters = filters.get_joined_filters(self._base_filters)
-        value_columns = self.datamodel.query_simple_group(
-            group_by, filters=joined_filters
+        value_columns = self.get_chart_data(
+            joined_filters,
+            lambda: self.datamodel.query_simple_group(
+                group_by, filters=joined_filters
+            ),
+            group_by,
         )
 
         widgets["chart"] = self.chart_widget(
@@ -352,14 +412,20 @@ class BaseSimpleDirectChartView(BaseChartView):  # pragma: no cover
         height = height or self.height
         widgets = widgets or dict()
         joined_filters = filters.get_joined_filters(self._base_filters)
-        count, lst = self.datamodel.query(
-            filters=joined_filters,
-            order_column=order_column,
-            order_direction=order_direction,
-        )
-        value_columns = self.datamodel.get_values(lst, list(direct))
-        value_columns = dict_to_json(
-            direct[0], direct[1:], self.label_columns, value_columns
+
+        def compute():
+            count, lst = self.datamodel.query(
+                filters=joined_filters,
+                order_column=order_column,
+                order_direction=order_direction,
+            )
+            value_columns = self.datamodel.get_values(lst, list(direct))
+            return dict_to_json(
+                direct[0], direct[1:], self.label_columns, value_columns
+            )
+
+        value_columns = self.get_chart_data(
+            joined_filters, compute, direct, order_column, order_direction
         )
 
         widgets["chart"] = self.chart_widget(
@@ -388,13 +454,14 @@ class ChartView(BaseSimpleGroupByChartView):  # pragma: no cover
     @expose("/chart/")
     @has_access
     def chart(self, group_by=""):
-        form = self.search_form.refresh()
         get_filter_args(self._filters)
 
         group_by = group_by or self.group_by_columns[0]
 
         widgets = self._get_chart_widget(filters=self._filters, group_by=group_by)
-        widgets = self._get_search_widget(form=form, widgets=widgets)
+        widgets = self._get_search_widget(
+            search_form_fields=self._get_search_form_fields(), widgets=widgets
+        )
         return self.render_template(
             self.chart_template,
             route_base=self.route_base,
@@ -438,14 +505,17 @@ class TimeChartView(BaseSimpleGroupByChartView):  # pragma: no cover
         group_by = group_by or self.group_by_columns[0]
         joined_filters = filters.get_joined_filters(self._base_filters)
 
-        if period == "month" or not period:
-            value_columns = self.datamodel.query_month_group(
-                group_by, filters=joined_filters
-            )
-        elif period == "year":
-            value_columns = self.datamodel.query_year_group(
-                group_by, filters=joined_filters
-            )
+        def compute():
+            if period == "month" or not period:
+                return self.datamodel.query_month_group(
+                    group_by, filters=joined_filters
+                )
+            elif period == "year":
+                return self.datamodel.query_year_group(
+                    group_by, filters=joined_filters
+                )
+
+        value_columns = self.get_chart_data(joined_filters, compute, group_by, period)
 
         widgets["chart"] = self.chart_widget(
             route_base=self.route_base,
@@ -463,7 +533,6 @@ class TimeChartView(BaseSimpleGroupByChartView):  # pragma: no cover
     @expose("/chart/")
     @has_access
     def chart(self, group_by="", period=""):
-        form = self.search_form.refresh()
         get_filter_args(self._filters)
 
         group_by = group_by or self.group_by_columns[0]
@@ -472,7 +541,9 @@ class TimeChartView(BaseSimpleGroupByChartView):  # pragma: no cover
             filters=self._filters, group_by=group_by, period=period, height=self.height
         )
 
-        widgets = self._get_search_widget(form=form, widgets=widgets)
+        widgets = self._get_search_widget(
+            search_form_fields=self._get_search_form_fields(), widgets=widgets
+        )
         return self.render_template(
             self.chart_template,
             route_base=self.route_base,
@@ -509,7 +580,6 @@ class DirectChartView(BaseSimpleDirectChartView):  # pragma: no cover
     @expose("/chart/")
     @has_access
     def chart(self, group_by=""):
-        form = self.search_form.refresh()
         get_filter_args(self._filters)
 
         direct_key = group_by or list(self.direct_columns.keys())[0]
@@ -527,7 +597,9 @@ class DirectChartView(BaseSimpleDirectChartView):  # pragma: no cover
             order_direction=order_direction,
             direct=direct,
         )
-        widgets = self._get_search_widget(form=form, widgets=widgets)
+        widgets = self._get_search_widget(
+            search_form_fields=self._get_search_form_fields(), widgets=widgets
+        )
         return self.render_template(
             self.chart_template,
             route_base=self.route_base,
@@ -8,6 +8,7 @@ import click
 from flask import current_app
 from flask.cli import with_appcontext
 
+from . import __version__
 from .const import AUTH_DB, AUTH_LDAP, AUTH_OAUTH, AUTH_OID, AUTH_REMOTE_USER
 
 
@@ -147,20 +148,37 @@ def create_db():
 
 
 @fab.command("version")
-@with_appcontext
 def version():
     """
         Flask-AppBuilder package version
     """
+    # Doesn't load the app, nor the rest of the package
     click.echo(
         click.style(
-            "F.A.B Version: {0}.".format(current_app.appbuilder.version),
+            "F.A.B Version: {0}.".format(__version__),
             bg="blue",
             fg="white",
         )
     )
 
 
+@fab.command("compile-templates")
+@with_appcontext
+def compile_templates():
+    """
+        Compiles all templates into FAB_TEMPLATE_BYTECODE_CACHE.
+    """
+    if not current_app.config["FAB_TEMPLATE_BYTECODE_CACHE"]:
+        click.echo(
+            click.style(
+                "FAB_TEMPLATE_BYTECODE_CACHE is not set, templates were only checked",
+                fg="yellow",
+            )
+        )
+    names = current_app.appbuilder.compile_templates()
+    click.echo(click.style(f"Compiled {len(names)} templates", fg="green"))
+
+
 @fab.command("security-cleanup")
 @with_appcontext
 def security_cleanup():
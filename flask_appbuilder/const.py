@@ -45,6 +45,13 @@ LOGMSG_ERR_SEC_ADD_PERMROLE = "Add Permission to Role Error: {0}"
 """ Error adding permission to role, format with err message """
 LOGMSG_ERR_SEC_DEL_PERMROLE = "Remove Permission to Role Error: {0}"
 """ Error deleting permission to role, format with err message """
+LOGMSG_ERR_SEC_CONVERGE = "Security converge Error: {0}"
+""" Error applying security converge state transitions, format with err message """
+LOGMSG_ERR_SEC_CLEANUP = "Security cleanup Error: {0}"
+""" Error deleting unused view menus, format with err message """
+LOGMSG_INF_SEC_CONVERGE = (
+    "Security converge added {0} and removed {1} permissions on roles"
+)
 LOGMSG_ERR_SEC_ADD_REGISTER_USER = "Add Register User Error: {0}"
 """ Error adding registered user, format with err message """
 LOGMSG_ERR_SEC_DEL_REGISTER_USER = "Remove Register User Error: {0}"
@@ -125,6 +132,24 @@ LOGMSG_WAR_DBI_DEL_INTEGRITY = "Delete record integrity error: {0}"
 
 LOGMSG_INF_FAB_ADD_VIEW = "Registering class {0} on menu {1}"
 """ Inform that view class was added, format with class name, name"""
+LOGMSG_WAR_FAB_CACHE_BACKEND = "Cache backend error: {0}"
+""" Cache backend failed to store a value, format with err message """
+LOGMSG_ERR_FAB_CACHE_INVALIDATE = "Error invalidating {0} cached data: {1}"
+""" Cache backend failed to invalidate, format with model name and err message """
+LOGMSG_ERR_FAB_PROCESS_IMAGE = "Error processing image {0}: {1}"
+""" Background image resize failed, format with file path and err message """
+LOGMSG_ERR_FAB_DELETE_FILE = "Error deleting file {0}: {1}"
+""" Uploaded file deletion failed, format with file name and err message """
+LOGMSG_INF_FAB_KEEP_FILES = "Keeping content addressed files {0}, they may be shared"
+""" Content addressed files kept on delete, format with file names """
+LOGMSG_ERR_FAB_COMPILE_TEMPLATE = "Error compiling template {0}: {1}"
+""" Template failed to load or compile, format with template name and err """
+LOGMSG_ERR_FAB_WARMUP = "Error on pre fork warmup: {0}"
+""" AppBuilder warmup failed, format with err message """
+LOGMSG_WAR_FAB_QUERY_BUDGET = (
+    "Endpoint {0} issued {1} SQL statements, query budget is {2}"
+)
+""" Request exceeded FAB_QUERY_BUDGET, format with endpoint, count, budget """
 
 
 FLAMSG_ERR_SEC_ACCESS_DENIED = lazy_gettext("Access is Denied")
@@ -26,3 +26,9 @@ class InterfaceQueryWithoutSession(FABException):
     """You need to setup a session on the interface to perform queries"""
 
     pass
+
+
+class QueryBudgetExceededFABException(FABException):
+    """Request issued more SQL statements than FAB_QUERY_BUDGET"""
+
+    pass
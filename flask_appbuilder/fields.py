@@ -79,6 +79,17 @@ class AJAXSelectField(Field):
 class QuerySelectField(SelectFieldBase):
     """
         Based on WTForms QuerySelectField
+
+        :param query_func: function that returns the related objects
+        :param get_pk_func: function that returns the pk of a related object
+        :param choices_func: optional function that returns (pk, label)
+            tuples, used to render the options without loading the
+            related objects
+        :param count_func: optional function that returns the
+            number of choices
+        :param query_pks_func: optional function that returns the related
+            objects for a list of pks, used to validate submitted values
+            without loading all the choices
     """
 
     widget = widgets.Select()
@@ -92,11 +103,17 @@ class QuerySelectField(SelectFieldBase):
         get_label=None,
         allow_blank=False,
         blank_text="",
+        choices_func=None,
+        count_func=None,
+        query_pks_func=None,
         **kwargs
     ):
         super(QuerySelectField, self).__init__(label, validators, **kwargs)
         self.query_func = query_func
         self.get_pk_func = get_pk_func
+        self.choices_func = choices_func
+        self.count_func = count_func
+        self.query_pks_func = query_pks_func
 
         if get_label is None:
             self.get_label = lambda x: x
@@ -108,13 +125,14 @@ class QuerySelectField(SelectFieldBase):
         self.allow_blank = allow_blank
         self.blank_text = blank_text
         self._object_list = None
+        self._object_dict = None
+        self._pk_objects = {}
 
     def _get_data(self):
         if self._formdata is not None:
-            for pk, obj in self._get_object_list():
-                if pk == self._formdata:
-                    self._set_data(obj)
-                    break
+            obj = self._get_objects_by_pk([self._formdata]).get(self._formdata)
+            if obj is not None:
+                self._set_data(obj)
         return self._data
 
     def _set_data(self, data):
@@ -131,10 +149,43 @@ class QuerySelectField(SelectFieldBase):
             )
         return self._object_list
 
+    def _get_object_dict(self):
+        if self._object_dict is None:
+            self._object_dict = dict(self._get_object_list())
+        return self._object_dict
+
+    def _get_objects_by_pk(self, pks):
+        """
+            Returns a pk -> object dict for the pks that are valid choices,
+            if the choices were not loaded only these objects are queried
+        """
+        if self._object_list is None and self.query_pks_func is not None:
+            object_dict = self._pk_objects
+            missing = [pk for pk in pks if pk not in object_dict]
+            if missing:
+                for obj in self.query_pks_func(missing):
+                    object_dict[text_type(self.get_pk_func(obj))] = obj
+        else:
+            object_dict = self._get_object_dict()
+        return {pk: object_dict[pk] for pk in pks if pk in object_dict}
+
+    def count_choices(self):
+        if self.count_func is not None:
+            return self.count_func()
+        if self.choices_func is not None:
+            return len(self.choices_func())
+        return len(self._get_object_list())
+
     def iter_choices(self):
         if self.allow_blank:
             yield ("__None", self.blank_text, self.data is None)
 
+        if self.choices_func is not None:
+            data = self.data
+            data_pk = None if data is None else text_type(self.get_pk_func(data))
+            for pk, label in self.choices_func():
+                yield (pk, label, pk == data_pk)
+            return
         for pk, obj in self._get_object_list():
             yield (pk, self.get_label(obj), obj == self.data)
 
@@ -149,10 +200,8 @@ class QuerySelectField(SelectFieldBase):
     def pre_validate(self, form):
         data = self.data
         if data is not None:
-            for pk, obj in self._get_object_list():
-                if data == obj:
-                    break
-            else:
+            pk = text_type(self.get_pk_func(data))
+            if pk not in self._get_objects_by_pk([pk]):
                 raise ValidationError(self.gettext("Not a valid choice"))
         elif self._formdata or not self.allow_blank:
             raise ValidationError(self.gettext("Not a valid choice"))
@@ -186,16 +235,10 @@ class QuerySelectMultipleField(QuerySelectField):
     def _get_data(self):
         formdata = self._formdata
         if formdata is not None:
-            data = []
-            for pk, obj in self._get_object_list():
-                if not formdata:
-                    break
-                elif pk in formdata:
-                    formdata.remove(pk)
-                    data.append(obj)
-            if formdata:
+            objects = self._get_objects_by_pk(formdata)
+            if len(objects) < len(formdata):
                 self._invalid_formdata = True
-            self._set_data(data)
+            self._set_data(list(objects.values()))
         return self._data
 
     def _set_data(self, data):
@@ -205,22 +248,32 @@ class QuerySelectMultipleField(QuerySelectField):
     data = property(_get_data, _set_data)
 
     def iter_choices(self):
+        if self.choices_func is not None:
+            data_pks = set(
+                text_type(self.get_pk_func(obj)) for obj in self.data or []
+            )
+            for pk, label in self.choices_func():
+                yield (pk, label, pk in data_pks)
+            return
+        data_pks = set(text_type(self.get_pk_func(obj)) for obj in self.data or [])
         for pk, obj in self._get_object_list():
-            yield (pk, self.get_label(obj), obj in self.data)
+            yield (pk, self.get_label(obj), pk in data_pks)
 
     def process_formdata(self, valuelist):
-        self._formdata = set(valuelist)
+        # Unique pks, keeping the submitted order
+        self._formdata = list(dict.fromkeys(valuelist))
 
     def pre_validate(self, form):
+        # Reading data resolves the submitted pks
+        data = self.data
         if self._invalid_formdata:
             raise ValidationError(self.gettext("Not a valid choice"))
-        elif self.data:
-            obj_list = list(x[1] for x in self._get_object_list())
+        elif data:
             if not isinstance(self.data, list):
                 self.data = [self.data]
-            for v in self.data:
-                if v not in obj_list:
-                    raise ValidationError(self.gettext("Not a valid choice"))
+            pks = set(text_type(self.get_pk_func(v)) for v in self.data)
+            if len(self._get_objects_by_pk(pks)) < len(pks):
+                raise ValidationError(self.gettext("Not a valid choice"))
 
 
 class EnumField(SelectField):
@@ -1,5 +1,9 @@
+import json
+
+from flask import current_app, url_for
 from flask_babel import lazy_gettext as _
 from wtforms import widgets
+from wtforms.compat import text_type
 from wtforms.widgets import html_params, HTMLString
 
 
@@ -137,6 +141,81 @@ class Select2SlaveAJAXWidget(object):
         )
 
 
+class Select2AJAXPagedWidget(object):
+    """
+        Select2 for QuerySelectField and QuerySelectMultipleField that
+        searches and pages the options on the server, only the
+        selected objects are rendered.
+
+        :param endpoint: The endpoint that returns the options pages,
+            it's called with col_name=<FIELD NAME>, so relative
+            endpoints like '.add_related_options' resolve on the current view
+        :param multiple: Allow selecting many options
+        :param page_size: Number of options fetched for each page
+    """
+
+    data_template = "<input %(text)s />"
+
+    def __init__(
+        self, endpoint, multiple=False, page_size=50, extra_classes=None, style=None
+    ):
+        self.endpoint = endpoint
+        self.multiple = multiple
+        self.page_size = page_size
+        self.extra_classes = extra_classes
+        self.style = style or u"width:250px"
+
+    def __call__(self, field, **kwargs):
+        kwargs.setdefault("id", field.id)
+        kwargs.setdefault("name", field.name)
+        kwargs.setdefault("endpoint", url_for(self.endpoint, col_name=field.name))
+        kwargs.setdefault("page_size", self.page_size)
+        kwargs.setdefault("style", self.style)
+        input_classes = "input-group my_select2_ajax_paged"
+        if self.extra_classes:
+            input_classes = input_classes + " " + self.extra_classes
+        kwargs.setdefault("class", input_classes)
+        if self.multiple:
+            kwargs["multiple"] = True
+        if "name_" in kwargs:
+            field.name = kwargs["name_"]
+        data = field.data
+        if data is None:
+            data = []
+        elif not self.multiple:
+            data = [data]
+        selection = [
+            {
+                "id": text_type(field.get_pk_func(obj)),
+                "text": text_type(field.get_label(obj)),
+            }
+            for obj in data
+        ]
+        kwargs["data_selection"] = json.dumps(selection)
+        value = ",".join(item["id"] for item in selection)
+        return HTMLString(
+            self.data_template
+            % {"text": html_params(type="hidden", value=value, **kwargs)}
+        )
+
+
+class Select2AutoAJAXWidget(object):
+    """
+        Renders widget, or ajax_widget when the field has more choices
+        than the FAB_RELATED_AJAX_THRESHOLD config key (0 never switches)
+    """
+
+    def __init__(self, widget, ajax_widget):
+        self.widget = widget
+        self.ajax_widget = ajax_widget
+
+    def __call__(self, field, **kwargs):
+        threshold = current_app.config["FAB_RELATED_AJAX_THRESHOLD"]
+        if threshold and field.count_choices() > threshold:
+            return self.ajax_widget(field, **kwargs)
+        return self.widget(field, **kwargs)
+
+
 class Select2Widget(widgets.Select):
     extra_classes = None
 
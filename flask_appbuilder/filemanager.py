@@ -1,14 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import hashlib
 import logging
 import os
 import os.path as op
 import re
+import shutil
+import tempfile
+import threading
 import uuid
 
 from flask.globals import _request_ctx_stack
+from flask_babel import gettext
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 from wtforms import ValidationError
 
+from .const import (
+    LOGMSG_ERR_FAB_DELETE_FILE,
+    LOGMSG_ERR_FAB_PROCESS_IMAGE,
+    LOGMSG_INF_FAB_KEEP_FILES,
+)
+from .storage import DEFAULT_BUFFER_SIZE, LocalStorage
+
 try:
     from flask import _app_ctx_stack
 except ImportError:
@@ -18,14 +32,63 @@ app_stack = _app_ctx_stack or _request_ctx_stack
 
 log = logging.getLogger(__name__)
 
-try:
-    from PIL import Image, ImageOps
-except ImportError:
-    Image = None
-    ImageOps = None
+# Encoded images bigger than this are spooled to disk
+IMAGE_SPOOL_SIZE = 1024 * 1024
+
+
+class UploadStream(object):
+    """
+        Wraps an upload stream, hashing what is read from it and
+        raising ValidationError once more than max_size bytes are read
+    """
+
+    def __init__(self, stream, hash_name="sha256", max_size=None):
+        self.stream = stream
+        self.checksum = hashlib.new(hash_name)
+        self.max_size = max_size
+        self.size = 0
+
+    def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.size += len(chunk)
+        if self.max_size and self.size > self.max_size:
+            raise ValidationError(gettext("File is too large"))
+        self.checksum.update(chunk)
+        return chunk
+
+    def hexdigest(self):
+        return self.checksum.hexdigest()
 
 
 class FileManager(object):
+    """
+        File Manager will manage your files referenced on SQLAlchemy Model
+        will save files on UPLOAD_FOLDER as <uuid>_sep_<filename>
+
+        Files are kept on a storage backend, by default a LocalStorage on
+        UPLOAD_FOLDER, uploads are hashed and size checked while they are
+        copied to it.
+
+        :param storage: A BaseStorage, defaults to FILE_STORAGE config key
+            or a LocalStorage on base_path
+        :param max_file_size: Max upload size in bytes, defaults to
+            FILE_MAX_SIZE config key, None or 0 has no limit
+        :param buffer_size: Copy chunk size, defaults to
+            FILE_UPLOAD_BUFFER_SIZE config key
+        :param content_addressed: Name files <checksum>_sep_<filename>,
+            so identical uploads are saved once, defaults to
+            FILE_CONTENT_ADDRESSED config key
+        :param hash_name: hashlib algorithm used for the checksum
+        :param accel_redirect_url: Internal proxy location of base_path,
+            send_file answers with an X-Accel-Redirect to it instead of
+            the file contents, defaults to FILE_ACCEL_REDIRECT_URL config key
+        :param async_delete: Delete files on delete_executor instead of
+            on request, defaults to FILE_ASYNC_DELETE config key
+        :param delete_executor: Any object with a concurrent.futures like
+            submit(fn, *args) method, defaults to a thread shared
+            by all managers
+    """
+
     def __init__(
         self,
         base_path=None,
@@ -33,15 +96,38 @@ class FileManager(object):
         namegen=None,
         allowed_extensions=None,
         permission=0o755,
+        max_file_size=None,
+        buffer_size=None,
+        content_addressed=None,
+        hash_name="sha256",
+        accel_redirect_url=None,
+        storage=None,
+        async_delete=None,
+        delete_executor=None,
         **kwargs
     ):
 
         ctx = app_stack.top
 
-        if "UPLOAD_FOLDER" in ctx.app.config and not base_path:
-            base_path = ctx.app.config["UPLOAD_FOLDER"]
-        if not base_path:
-            raise Exception("Config key UPLOAD_FOLDER is mandatory")
+        self.max_file_size = max_file_size or ctx.app.config.get("FILE_MAX_SIZE")
+        self.buffer_size = buffer_size or ctx.app.config.get(
+            "FILE_UPLOAD_BUFFER_SIZE", DEFAULT_BUFFER_SIZE
+        )
+        if storage is None and not base_path:
+            storage = ctx.app.config.get("FILE_STORAGE")
+        if storage is None:
+            if "UPLOAD_FOLDER" in ctx.app.config and not base_path:
+                base_path = ctx.app.config["UPLOAD_FOLDER"]
+            if not base_path:
+                raise Exception("Config key UPLOAD_FOLDER is mandatory")
+            storage = LocalStorage(
+                base_path,
+                permission=permission,
+                buffer_size=self.buffer_size,
+                accel_redirect_url=accel_redirect_url
+                or ctx.app.config.get("FILE_ACCEL_REDIRECT_URL"),
+            )
+        self.storage = storage
 
         self.base_path = base_path
         self.relative_path = relative_path
@@ -51,6 +137,15 @@ class FileManager(object):
         else:
             self.allowed_extensions = allowed_extensions
         self.permission = permission
+        if content_addressed is None:
+            content_addressed = ctx.app.config.get("FILE_CONTENT_ADDRESSED", False)
+        self.content_addressed = content_addressed
+        self.hash_name = hash_name
+        if async_delete is None:
+            async_delete = ctx.app.config.get("FILE_ASYNC_DELETE", False)
+        if async_delete and delete_executor is None:
+            delete_executor = get_executor("deletes", 1)
+        self.delete_executor = delete_executor
         self._should_delete = False
 
     def is_file_allowed(self, filename):
@@ -69,24 +164,114 @@ class FileManager(object):
             raise ValueError("FileUploadField field requires base_path to be set.")
         return op.join(self.base_path, filename)
 
+    def is_file_size_allowed(self, data):
+        """
+            Checks the size of a FileStorage,
+            without reading it if its stream is seekable
+        """
+        if not self.max_file_size:
+            return True
+        stream = data.stream
+        try:
+            position = stream.tell()
+            stream.seek(0, os.SEEK_END)
+            size = stream.tell() - position
+            stream.seek(position)
+        except (AttributeError, IOError, OSError):
+            # Checked while saving
+            return True
+        return size <= self.max_file_size
+
+    def get_upload_stream(self, stream):
+        return UploadStream(stream, self.hash_name, self.max_file_size)
+
+    def get_stored_names(self, filename):
+        """
+            Names saved on the storage for filename
+        """
+        return [filename]
+
     def delete_file(self, filename):
-        path = self.get_path(filename)
-        if op.exists(path):
-            os.remove(path)
+        self.delete_files([filename])
+
+    def delete_files(self, filenames, get_referenced=None):
+        """
+            Deletes filenames from the storage in one batch,
+            on delete_executor when set. Storage errors are logged,
+            the rows using the files are already gone
+
+            :param get_referenced: Content addressed files may be used by
+                other rows, they are only deleted when get_referenced is
+                given, a callable that returns the filenames still in use
+        """
+        if self.content_addressed:
+            if get_referenced is None:
+                log.info(LOGMSG_INF_FAB_KEEP_FILES.format(filenames))
+                return
+            referenced = set(get_referenced(filenames))
+            filenames = [
+                filename for filename in filenames if filename not in referenced
+            ]
+        names = [
+            name for filename in filenames for name in self.get_stored_names(filename)
+        ]
+        if not names:
+            return
+        if self.delete_executor:
+            self.delete_executor.submit(delete_files, self.storage, names)
+        else:
+            delete_files(self.storage, names)
 
     def save_file(self, data, filename):
         filename_ = secure_filename(filename)
-        path = self.get_path(filename_)
-        if not op.exists(op.dirname(path)):
-            os.makedirs(os.path.dirname(path), self.permission)
-        data.save(path)
+        stream = self.get_upload_stream(data.stream)
+        if not self.content_addressed:
+            self.storage.save(filename_, stream)
+            return filename_
+        # The name depends on the contents, save it under a temporary name first
+        tmp_name = temp_name(filename_)
+        self.storage.save(tmp_name, stream)
+        filename_ = "%s_sep_%s" % (
+            stream.hexdigest(),
+            secure_filename(data.filename or ""),
+        )
+        if self.storage.exists(filename_):
+            self.storage.delete(tmp_name)
+        else:
+            self.storage.rename(tmp_name, filename_)
         return filename_
 
+    def send_file(self, filename, as_attachment=False, attachment_filename=None):
+        """
+            Response for a download of filename, see the storage's send_file
+        """
+        return self.storage.send_file(
+            filename,
+            as_attachment=as_attachment,
+            attachment_filename=attachment_filename,
+        )
+
 
 class ImageManager(FileManager):
     """
         Image Manager will manage your image files referenced on SQLAlchemy Model
         will save files on IMG_UPLOAD_FOLDER as <uuid>_sep_<filename>
+
+        With IMG_BACKGROUND_PROCESSING the upload is saved as is and resizing
+        and thumbnail generation run on executor, get_url returns
+        IMG_PLACEHOLDER_URL (if set) until the image is ready. Pending
+        images are tracked in memory, so only the process that saved
+        the upload returns the placeholder.
+
+        :param storage: A BaseStorage, defaults to IMG_STORAGE config key
+            or a LocalStorage on base_path
+        :param background: Resize images off request, defaults to
+            IMG_BACKGROUND_PROCESSING config key
+        :param executor: Any object with a concurrent.futures like
+            submit(fn, *args) method, defaults to a thread pool with
+            IMG_PROCESS_WORKERS threads shared by all ImageManagers
+        :param accel_redirect_url: Internal proxy location of base_path,
+            defaults to IMG_ACCEL_REDIRECT_URL config key
     """
 
     keep_image_formats = ("PNG",)
@@ -101,62 +286,94 @@ class ImageManager(FileManager):
         thumbgen=None,
         thumbnail_size=None,
         permission=0o755,
+        background=None,
+        executor=None,
+        accel_redirect_url=None,
+        storage=None,
         **kwargs
     ):
 
         # Check if PIL is installed
-        if Image is None:
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
             raise Exception("PIL library was not found")
 
         ctx = app_stack.top
-        if "IMG_SIZE" in ctx.app.config and not max_size:
-            self.max_size = ctx.app.config["IMG_SIZE"]
-
-        if "IMG_UPLOAD_URL" in ctx.app.config and not relative_path:
-            relative_path = ctx.app.config["IMG_UPLOAD_URL"]
-        if not relative_path:
-            raise Exception("Config key IMG_UPLOAD_URL is mandatory")
-
-        if "IMG_UPLOAD_FOLDER" in ctx.app.config and not base_path:
-            base_path = ctx.app.config["IMG_UPLOAD_FOLDER"]
-        if not base_path:
-            raise Exception("Config key IMG_UPLOAD_FOLDER is mandatory")
+        self.max_size = max_size or ctx.app.config.get("IMG_SIZE")
+
+        if storage is None and not base_path:
+            storage = ctx.app.config.get("IMG_STORAGE")
+        if storage is None:
+            if "IMG_UPLOAD_URL" in ctx.app.config and not relative_path:
+                relative_path = ctx.app.config["IMG_UPLOAD_URL"]
+            if not relative_path:
+                raise Exception("Config key IMG_UPLOAD_URL is mandatory")
+
+            if "IMG_UPLOAD_FOLDER" in ctx.app.config and not base_path:
+                base_path = ctx.app.config["IMG_UPLOAD_FOLDER"]
+            if not base_path:
+                raise Exception("Config key IMG_UPLOAD_FOLDER is mandatory")
+            storage = LocalStorage(
+                base_path,
+                permission=permission,
+                buffer_size=kwargs.get("buffer_size")
+                or ctx.app.config.get("FILE_UPLOAD_BUFFER_SIZE", DEFAULT_BUFFER_SIZE),
+                accel_redirect_url=accel_redirect_url
+                or ctx.app.config.get("IMG_ACCEL_REDIRECT_URL"),
+            )
 
         self.thumbnail_fn = thumbgen or thumbgen_filename
         self.thumbnail_size = thumbnail_size
         self.image = None
 
+        if background is None:
+            background = ctx.app.config.get("IMG_BACKGROUND_PROCESSING", False)
+        self.background = background
+        self.placeholder_url = ctx.app.config.get("IMG_PLACEHOLDER_URL")
+        if background and executor is None:
+            executor = get_image_executor(ctx.app.config.get("IMG_PROCESS_WORKERS", 2))
+        self.executor = executor
+
         if not allowed_extensions:
             allowed_extensions = ("gif", "jpg", "jpeg", "png", "tiff")
 
         super(ImageManager, self).__init__(
             base_path=base_path,
-            relative_path=relative_path,
+            relative_path=relative_path or "",
             namegen=namegen,
             allowed_extensions=allowed_extensions,
             permission=permission,
+            storage=storage,
             **kwargs
         )
+        # Images are converted when saved, so they are never content addressed
+        self.content_addressed = False
+
+    def _is_pending(self, filename):
+        return self.background and self.placeholder_url and filename in _pending_images
 
     def get_url(self, filename):
         if isinstance(filename, FileStorage):
             return filename.filename
-        return self.relative_path + filename
+        if self._is_pending(filename):
+            return self.placeholder_url
+        return self.storage.url(filename) or self.relative_path + filename
 
     def get_url_thumbnail(self, filename):
         if isinstance(filename, FileStorage):
             return filename.filename
-        return self.relative_path + thumbgen_filename(filename)
+        thumbnail = thumbgen_filename(filename)
+        if self._is_pending(thumbnail):
+            return self.placeholder_url
+        return self.storage.url(thumbnail) or self.relative_path + thumbnail
 
     # Deletion
-    def delete_file(self, filename):
-        super(ImageManager, self).delete_file(filename)
-        self.delete_thumbnail(filename)
+    def get_stored_names(self, filename):
+        return [filename, self.thumbnail_fn(filename)]
 
     def delete_thumbnail(self, filename):
-        path = self.get_path(self.thumbnail_fn(filename))
-        if op.exists(path):
-            os.remove(path)
+        self.storage.delete(self.thumbnail_fn(filename))
 
     # Saving
     def save_file(self, data, filename, size=None, thumbnail_size=None):
@@ -170,37 +387,75 @@ class ImageManager(FileManager):
         max_size = size or self.max_size
         thumbnail_size = thumbnail_size or self.thumbnail_size
         if data and isinstance(data, FileStorage):
+            from PIL import Image
+
             try:
                 self.image = Image.open(data)
             except Exception as e:
                 raise ValidationError("Invalid image: %s" % e)
 
-        path = self.get_path(filename)
-        # If Path does not exist, create it
-        if not op.exists(op.dirname(path)):
-            os.makedirs(os.path.dirname(path), self.permission)
-
         # Figure out format
         filename, format = self.get_save_format(filename, self.image)
-        if self.image and (self.image.format != format or max_size):
+        if self.background:
+            return self.save_file_background(
+                data, filename, format, max_size, thumbnail_size
+            )
+        is_converted = self.image and (self.image.format != format or max_size)
+        if is_converted:
+            draft_image(self.image, max_size, thumbnail_size)
             if max_size:
                 image = self.resize(self.image, max_size)
             else:
                 image = self.image
-            self.save_image(image, self.get_path(filename), format)
+            self.save_image(image, filename, format)
         else:
+            draft_image(self.image, thumbnail_size)
             data.seek(0)
-            data.save(path)
+            self.storage.save(filename, self.get_upload_stream(data.stream))
         self.save_thumbnail(data, filename, format, thumbnail_size)
 
         return filename
 
+    def save_file_background(self, data, filename, format, size, thumbnail_size):
+        """
+            Saves the upload and submits the resize and
+            thumbnail jobs to the executor
+        """
+        thumbnail_name = None
+        if thumbnail_size:
+            thumbnail_name = self.thumbnail_fn(filename)
+        data.seek(0)
+        if self.image.format != format or size:
+            original_name = temp_name(filename)
+        else:
+            original_name = filename
+        self.storage.save(original_name, self.get_upload_stream(data.stream))
+        if original_name != filename or thumbnail_name:
+            with _pending_images_lock:
+                _pending_images.update(
+                    name for name in (filename, thumbnail_name) if name
+                )
+            self.executor.submit(
+                process_image,
+                self.storage,
+                original_name,
+                filename,
+                format,
+                size,
+                thumbnail_name,
+                thumbnail_size,
+            )
+        self.image = None
+        return filename
+
     def save_thumbnail(self, data, filename, format, thumbnail_size=None):
         thumbnail_size = thumbnail_size or self.thumbnail_size
         if self.image and thumbnail_size:
-            path = self.get_path(self.thumbnail_fn(filename))
-
-            self.save_image(self.resize(self.image, thumbnail_size), path, format)
+            self.save_image(
+                self.resize(self.image, thumbnail_size),
+                self.thumbnail_fn(filename),
+                format,
+            )
 
     def resize(self, image, size):
         """
@@ -209,23 +464,11 @@ class ImageManager(FileManager):
             :param image: The image object
             :param size: size is PIL tuple (width, heigth, force) ex: (200,100,True)
         """
-        (width, height, force) = size
-
-        if image.size[0] > width or image.size[1] > height:
-            if force:
-                return ImageOps.fit(self.image, (width, height), Image.ANTIALIAS)
-            else:
-                thumb = self.image.copy()
-                thumb.thumbnail((width, height), Image.ANTIALIAS)
-                return thumb
+        return resize_image(image, size)
 
-        return image
-
-    def save_image(self, image, path, format="JPEG"):
-        if image.mode not in ("RGB", "RGBA"):
-            image = image.convert("RGBA")
-        with open(path, "wb") as fp:
-            image.save(fp, format)
+    def save_image(self, image, filename, format="JPEG"):
+        with encode_image(image, format) as fp:
+            self.storage.save(filename, fp)
 
     def get_save_format(self, filename, image):
         if image.format not in self.keep_image_formats:
@@ -235,6 +478,183 @@ class ImageManager(FileManager):
         return filename, image.format
 
 
+_executors = {}
+_executors_lock = threading.Lock()
+
+# Names saved by this process whose background processing has not finished
+_pending_images = set()
+_pending_images_lock = threading.Lock()
+
+
+def get_executor(name, max_workers):
+    """
+        Returns the thread pool named name shared by all managers
+    """
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="fab-" + name
+            )
+        return _executors[name]
+
+
+def get_image_executor(max_workers):
+    """
+        Returns the thread pool shared by all background ImageManagers
+    """
+    return get_executor("images", max_workers)
+
+
+def temp_name(filename):
+    return "%s.%s.tmp" % (filename, uuid.uuid4().hex)
+
+
+def delete_files(storage, names):
+    """
+        Deletes names from storage logging errors, runs
+        off request for FileManagers with async_delete
+    """
+    try:
+        storage.delete_many(names)
+    except Exception as e:
+        log.error(LOGMSG_ERR_FAB_DELETE_FILE.format(", ".join(names), str(e)))
+
+
+def draft_image(image, *sizes):
+    """
+        Makes JPEG images decode at the smallest scale that still
+        covers all sizes, only works before the image is loaded
+    """
+    sizes = [size for size in sizes if size]
+    if not sizes or image is None:
+        return
+    width = max(size[0] for size in sizes)
+    height = max(size[1] for size in sizes)
+    try:
+        image.draft(image.mode, (width, height))
+    except (AttributeError, ValueError, OSError):
+        pass
+
+
+def resize_image(image, size, in_place=False):
+    """
+        Resizes the image
+
+        :param image: The image object
+        :param size: size is PIL tuple (width, heigth, force) ex: (200,100,True)
+        :param in_place: Shrink image itself instead of a copy when not forced
+    """
+    from PIL import Image, ImageOps
+
+    (width, height, force) = size
+
+    if image.size[0] > width or image.size[1] > height:
+        if force:
+            return ImageOps.fit(image, (width, height), Image.LANCZOS)
+        thumb = image if in_place else image.copy()
+        thumb.thumbnail((width, height), Image.LANCZOS)
+        return thumb
+
+    return image
+
+
+def encode_image(image, format="JPEG"):
+    """
+        Returns a file with image saved as format, rewound to its start
+    """
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    if format == "JPEG" and image.mode == "RGBA":
+        image = image.convert("RGB")
+    fp = tempfile.SpooledTemporaryFile(max_size=IMAGE_SPOOL_SIZE)
+    try:
+        image.save(fp, format)
+    except BaseException:
+        fp.close()
+        raise
+    fp.seek(0)
+    return fp
+
+
+def open_image(storage, name, *sizes):
+    """
+        Loads name from storage, JPEGs are decoded at
+        the smallest scale that still covers sizes
+    """
+    from PIL import Image
+
+    with closing(storage.open(name)) as stream, tempfile.SpooledTemporaryFile(
+        max_size=IMAGE_SPOOL_SIZE
+    ) as buffer:
+        if not getattr(stream, "seekable", lambda: False)():
+            shutil.copyfileobj(stream, buffer)
+            buffer.seek(0)
+            stream = buffer
+        image = Image.open(stream)
+        draft_image(image, *sizes)
+        image.load()
+    return image
+
+
+def process_image(
+    storage,
+    original_name,
+    name,
+    format,
+    size=None,
+    thumbnail_name=None,
+    thumbnail_size=None,
+):
+    """
+        Resizes and converts an uploaded image saved as original_name
+        into name, and saves its thumbnail. Runs off request
+        for background ImageManagers
+    """
+    try:
+        _process_image(
+            storage,
+            original_name,
+            name,
+            format,
+            size,
+            thumbnail_name,
+            thumbnail_size,
+        )
+    finally:
+        with _pending_images_lock:
+            _pending_images.discard(name)
+            _pending_images.discard(thumbnail_name)
+
+
+def _process_image(
+    storage, original_name, name, format, size, thumbnail_name, thumbnail_size
+):
+    saved = original_name == name
+    try:
+        if not saved:
+            image = open_image(storage, original_name, size, thumbnail_size)
+            if size:
+                image = resize_image(image, size, in_place=True)
+            with encode_image(image, format) as fp:
+                storage.save(name, fp)
+            saved = True
+        else:
+            image = open_image(storage, original_name, thumbnail_size)
+        if thumbnail_name:
+            thumbnail = resize_image(image, thumbnail_size, in_place=True)
+            with encode_image(thumbnail, format) as fp:
+                storage.save(thumbnail_name, fp)
+    except Exception as e:
+        log.error(LOGMSG_ERR_FAB_PROCESS_IMAGE.format(original_name, str(e)))
+    if original_name == name:
+        return
+    if saved:
+        storage.delete(original_name)
+    else:
+        # Keep the upload as is rather than losing the only copy
+        storage.rename(original_name, name)
+
+
 def uuid_namegen(file_data):
     return str(uuid.uuid1()) + "_sep_" + file_data.filename
 
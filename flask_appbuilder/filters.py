@@ -133,13 +133,11 @@ class TemplateFilters(object):
 
     @app_template_filter("is_menu_visible")
     def is_menu_visible(self, item):
-        return self.security_manager.has_access("menu_access", item.name)
+        return item.name in current_app.appbuilder.menu.get_user_menu_access()
 
     @staticmethod
     def find_views_by_name(view_name):
-        for view in current_app.appbuilder.baseviews:
-            if view.__class__.__name__ == view_name:
-                return view
+        return current_app.appbuilder.find_view(view_name)
 
     @app_template_filter("is_item_visible")
     def is_item_visible(self, permission: str, item: str) -> bool:
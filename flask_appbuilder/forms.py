@@ -1,5 +1,7 @@
 import logging
 
+from flask import current_app
+from flask_babel import get_locale
 from flask_wtf import FlaskForm
 from wtforms import (
     BooleanField,
@@ -12,17 +14,23 @@ from wtforms import (
     TextAreaField,
 )
 from wtforms import validators
+from wtforms.compat import text_type
 
+from .cache import get_cache, make_cache_key
 from .fields import EnumField, QuerySelectField, QuerySelectMultipleField
 from .fieldwidgets import (
     BS3TextAreaFieldWidget,
     BS3TextFieldWidget,
     DatePickerWidget,
     DateTimePickerWidget,
+    Select2AJAXPagedWidget,
+    Select2AutoAJAXWidget,
     Select2ManyWidget,
     Select2Widget,
 )
 from .models.mongoengine.fields import MongoFileField, MongoImageField
+from .models.sqla.filters import FilterInFunction
+from .models.sqla.interface import SQLAInterface
 from .upload import (
     BS3FileUploadFieldWidget,
     BS3ImageUploadFieldWidget,
@@ -107,6 +115,101 @@ class FieldConverter(object):
         log.error("Column %s Type not supported" % self.colname)
 
 
+class RelatedChoices(object):
+    """
+        Provides the options for a related field, (pk, label) tuples
+        and their count are kept on the AppBuilder cache for
+        FAB_RELATED_CHOICES_CACHE_TIMEOUT seconds (0 disables it) for
+        each related model and filters. Writes made through the related
+        model interface invalidate them.
+
+        :param datamodel: The related model interface
+        :param filters: Optional filters for the related model
+    """
+
+    def __init__(self, datamodel, filters=None):
+        self.datamodel = datamodel
+        self.filters = filters
+
+    def query(self):
+        return self.datamodel.query(self.filters)[1]
+
+    def query_pks(self, pks):
+        """
+            Returns the related objects with pks, with a single IN query
+            on SQLAlchemy models. Values that are not valid for the pk
+            column are left out, so they fail validation
+        """
+        datamodel = self.datamodel
+        if not isinstance(datamodel, SQLAInterface) or datamodel.is_pk_composite():
+            return self.query()
+        pks = self._coerce_pks(pks)
+        if not pks:
+            return []
+        if self.filters:
+            filters = self.filters.copy()
+        else:
+            filters = datamodel.get_filters()
+        filters.add_filter(datamodel.get_pk_name(), FilterInFunction, lambda: pks)
+        query = datamodel.session.query(datamodel.obj)
+        return datamodel.apply_filters(query, filters).all()
+
+    def _coerce_pks(self, pks):
+        pk_column = self.datamodel.list_columns[self.datamodel.get_pk_name()]
+        try:
+            python_type = pk_column.type.python_type
+        except NotImplementedError:
+            return list(pks)
+        if python_type is not int:
+            return list(pks)
+        result = []
+        for pk in pks:
+            try:
+                result.append(int(pk))
+            except (TypeError, ValueError):
+                continue
+        return result
+
+    def get_cache_key(self, cache, name):
+        return make_cache_key(
+            self.__class__.__name__,
+            name,
+            self.datamodel.obj.__name__,
+            cache.get_version(self.datamodel.model_name),
+            str(get_locale()),
+            self.filters.get_filters_signature() if self.filters else [],
+        )
+
+    def _get_cached(self, name, compute):
+        cache = get_cache()
+        if cache is None:
+            return compute()
+        timeout = current_app.config["FAB_RELATED_CHOICES_CACHE_TIMEOUT"]
+        if not timeout:
+            return compute()
+        key = self.get_cache_key(cache, name)
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.set(key, value, timeout=timeout)
+        return value
+
+    def _get_choices(self):
+        return [
+            (text_type(self.datamodel.get_pk_value(item)), text_type(item))
+            for item in self.query()
+        ]
+
+    def _get_count(self):
+        return self.datamodel.query(self.filters, page=0, page_size=1)[0]
+
+    def get_choices(self):
+        return self._get_cached("choices", self._get_choices)
+
+    def get_count(self):
+        return self._get_cached("count", self._get_count)
+
+
 class GeneralModelConverter(object):
     """
         Returns a form from a model only one public exposed
@@ -128,15 +231,17 @@ class GeneralModelConverter(object):
     def _get_label(col_name, label_columns):
         return label_columns.get(col_name, "")
 
+    def _get_related_choices(self, col_name, filter_rel_fields):
+        datamodel = self.datamodel.get_related_interface(col_name)
+        filters = None
+        if filter_rel_fields and col_name in filter_rel_fields:
+            filters = datamodel.get_filters().add_filter_list(
+                filter_rel_fields[col_name]
+            )
+        return RelatedChoices(datamodel, filters)
+
     def _get_related_query_func(self, col_name, filter_rel_fields):
-        if filter_rel_fields:
-            if col_name in filter_rel_fields:
-                datamodel = self.datamodel.get_related_interface(col_name)
-                filters = datamodel.get_filters().add_filter_list(
-                    filter_rel_fields[col_name]
-                )
-                return lambda: datamodel.query(filters)[1]
-        return lambda: self.datamodel.get_related_interface(col_name).query()[1]
+        return self._get_related_choices(col_name, filter_rel_fields).query
 
     def _get_related_pk_func(self, col_name):
         return lambda obj: self.datamodel.get_related_interface(col_name).get_pk_value(
@@ -151,13 +256,14 @@ class GeneralModelConverter(object):
         lst_validators,
         filter_rel_fields,
         form_props,
+        ajax_endpoint=None,
     ):
         """
             Creates a WTForm field for many to one related fields,
             will use a Select box based on a query. Will only
             work with SQLAlchemy interface.
         """
-        query_func = self._get_related_query_func(col_name, filter_rel_fields)
+        choices = self._get_related_choices(col_name, filter_rel_fields)
         get_pk_func = self._get_related_pk_func(col_name)
         extra_classes = None
         allow_blank = True
@@ -166,14 +272,23 @@ class GeneralModelConverter(object):
             allow_blank = False
         else:
             lst_validators.append(validators.Optional())
+        widget = Select2Widget(extra_classes=extra_classes)
+        if ajax_endpoint:
+            widget = Select2AutoAJAXWidget(
+                widget,
+                Select2AJAXPagedWidget(ajax_endpoint, extra_classes=extra_classes),
+            )
         form_props[col_name] = QuerySelectField(
             label,
             description=description,
-            query_func=query_func,
+            query_func=choices.query,
             get_pk_func=get_pk_func,
             allow_blank=allow_blank,
             validators=lst_validators,
-            widget=Select2Widget(extra_classes=extra_classes),
+            widget=widget,
+            choices_func=choices.get_choices,
+            count_func=choices.get_count,
+            query_pks_func=choices.query_pks,
         )
         return form_props
 
@@ -185,18 +300,27 @@ class GeneralModelConverter(object):
         lst_validators,
         filter_rel_fields,
         form_props,
+        ajax_endpoint=None,
     ):
-        query_func = self._get_related_query_func(col_name, filter_rel_fields)
+        choices = self._get_related_choices(col_name, filter_rel_fields)
         get_pk_func = self._get_related_pk_func(col_name)
         allow_blank = True
+        widget = Select2ManyWidget()
+        if ajax_endpoint:
+            widget = Select2AutoAJAXWidget(
+                widget, Select2AJAXPagedWidget(ajax_endpoint, multiple=True)
+            )
         form_props[col_name] = QuerySelectMultipleField(
             label,
             description=description,
-            query_func=query_func,
+            query_func=choices.query,
             get_pk_func=get_pk_func,
             allow_blank=allow_blank,
             validators=lst_validators,
-            widget=Select2ManyWidget(),
+            widget=widget,
+            choices_func=choices.get_choices,
+            count_func=choices.get_count,
+            query_pks_func=choices.query_pks,
         )
         return form_props
 
@@ -234,6 +358,7 @@ class GeneralModelConverter(object):
         lst_validators,
         filter_rel_fields,
         form_props,
+        ajax_endpoint=None,
     ):
         if self.datamodel.is_relation(col_name):
             if self.datamodel.is_relation_many_to_one(
@@ -246,6 +371,7 @@ class GeneralModelConverter(object):
                     lst_validators,
                     filter_rel_fields,
                     form_props,
+                    ajax_endpoint=ajax_endpoint,
                 )
             elif self.datamodel.is_relation_many_to_many(
                 col_name
@@ -257,6 +383,7 @@ class GeneralModelConverter(object):
                     lst_validators,
                     filter_rel_fields,
                     form_props,
+                    ajax_endpoint=ajax_endpoint,
                 )
             else:
                 log.warning("Relation {0} not supported".format(col_name))
@@ -273,6 +400,7 @@ class GeneralModelConverter(object):
         validators_columns=None,
         extra_fields=None,
         filter_rel_fields=None,
+        ajax_endpoint=None,
     ):
         """
             Converts a model to a form given
@@ -297,6 +425,10 @@ class GeneralModelConverter(object):
 
             :param filter_rel_fields:
                 A filter to be applied on relationships
+            :param ajax_endpoint:
+                Endpoint that pages the related fields options, when given
+                related fields switch to a server side paged Select2
+                above FAB_RELATED_AJAX_THRESHOLD options
         """
         label_columns = label_columns or {}
         inc_columns = inc_columns or []
@@ -315,6 +447,7 @@ class GeneralModelConverter(object):
                     self._get_validators(col_name, validators_columns),
                     filter_rel_fields,
                     form_props,
+                    ajax_endpoint=ajax_endpoint,
                 )
         return type("DynamicForm", (DynamicForm,), form_props)
 
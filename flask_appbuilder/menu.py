@@ -1,10 +1,11 @@
-from typing import List
+from typing import Dict, List, Set
 
-from flask import current_app, url_for
-from flask_babel import gettext as __
+from flask import current_app, g, has_request_context, request, url_for
+from flask_babel import get_locale, gettext as __
 
 from .api import BaseApi, expose
 from .basemanager import BaseManager
+from .cache import get_cache, make_cache_key
 from .security.decorators import permission_name, protect
 
 
@@ -39,6 +40,8 @@ class Menu(object):
         if reverse:
             extra_classes = extra_classes + "navbar-inverse"
         self.extra_classes = extra_classes
+        self._index = None
+        self._version = 0
 
     @property
     def reverse(self):
@@ -47,23 +50,61 @@ class Menu(object):
     def get_list(self):
         return self.menu
 
+    def _item_added(self, item: MenuItem) -> None:
+        if self._index is not None and item.name != "-":
+            self._index.setdefault(item.name, item)
+        self._version += 1
+
     def get_flat_name_list(self, menu: "Menu" = None, result: List = None) -> List:
         menu = menu or self.menu
-        result = result or []
+        result = [] if result is None else result
         for item in menu:
             result.append(item.name)
             if item.childs:
-                result.extend(self.get_flat_name_list(menu=item.childs, result=result))
+                self.get_flat_name_list(menu=item.childs, result=result)
         return result
 
-    def get_data(self, menu=None):
-        menu = menu or self.menu
-        ret_list = []
+    @property
+    def index(self) -> Dict[str, MenuItem]:
+        """
+            All menu items on the tree by name (first found on a depth
+            first walk), built once and rebuilt only when the menu changes
+        """
+        if self._index is None:
+            index = {}
+            stack = list(reversed(self.menu))
+            while stack:
+                item = stack.pop()
+                if item.name != "-":
+                    index.setdefault(item.name, item)
+                stack.extend(reversed(item.childs))
+            self._index = index
+        return self._index
 
-        allowed_menus = current_app.appbuilder.sm.get_user_menu_access(
-            self.get_flat_name_list()
-        )
+    @property
+    def flat_names(self) -> List[str]:
+        """
+            Unique menu item names on the whole tree
+        """
+        return list(self.index)
+
+    def get_user_menu_access(self) -> Set[str]:
+        """
+            Returns the menu names the current user has access to,
+            resolved with a single permission lookup per request
+        """
+        if not has_request_context():
+            return current_app.appbuilder.sm.get_user_menu_access(self.flat_names)
+        allowed_menus = g.get("_fab_menu_access")
+        if allowed_menus is None:
+            allowed_menus = current_app.appbuilder.sm.get_user_menu_access(
+                self.flat_names
+            )
+            g._fab_menu_access = allowed_menus
+        return allowed_menus
 
+    def _get_data(self, menu, allowed_menus):
+        ret_list = []
         for i, item in enumerate(menu):
             if item.name == "-" and not i == len(menu) - 1:
                 ret_list.append("-")
@@ -75,7 +116,7 @@ class Menu(object):
                         "name": item.name,
                         "icon": item.icon,
                         "label": __(str(item.label)),
-                        "childs": self.get_data(menu=item.childs),
+                        "childs": self._get_data(item.childs, allowed_menus),
                     }
                 )
             else:
@@ -89,6 +130,34 @@ class Menu(object):
                 )
         return ret_list
 
+    def get_cache_key(self, cache) -> str:
+        """
+            Menu data is cached per role set and locale
+        """
+        sm = current_app.appbuilder.sm
+        return make_cache_key(
+            self.__class__.__name__,
+            self._version,
+            cache.get_version(sm.role_model.__name__),
+            sm.get_user_roles_signature(),
+            str(get_locale()),
+            request.script_root,
+        )
+
+    def get_data(self, menu=None):
+        if menu is not None:
+            return self._get_data(menu, self.get_user_menu_access())
+        cache = get_cache()
+        timeout = current_app.config["FAB_MENU_CACHE_TIMEOUT"]
+        if cache is None or not timeout or not has_request_context():
+            return self._get_data(self.menu, self.get_user_menu_access())
+        key = self.get_cache_key(cache)
+        data = cache.get(key)
+        if data is None:
+            data = self._get_data(self.menu, self.get_user_menu_access())
+            cache.set(key, data, timeout=timeout)
+        return data
+
     def find(self, name, menu=None):
         """
             Finds a menu item by name and returns it.
@@ -96,7 +165,8 @@ class Menu(object):
             :param name:
                 The menu item name.
         """
-        menu = menu or self.menu
+        if menu is None:
+            return self.index.get(name)
         for i in menu:
             if i.name == name:
                 return i
@@ -108,12 +178,12 @@ class Menu(object):
 
     def add_category(self, category, icon="", label="", parent_category=""):
         label = label or category
+        menu_item = MenuItem(name=category, icon=icon, label=label)
         if parent_category == "":
-            self.menu.append(MenuItem(name=category, icon=icon, label=label))
+            self.menu.append(menu_item)
         else:
-            self.find(category).childs.append(
-                MenuItem(name=category, icon=icon, label=label)
-            )
+            self.find(parent_category).childs.append(menu_item)
+        self._item_added(menu_item)
 
     def add_link(
         self,
@@ -128,32 +198,26 @@ class Menu(object):
     ):
         label = label or name
         category_label = category_label or category
+        new_menu_item = MenuItem(
+            name=name, href=href, icon=icon, label=label, baseview=baseview
+        )
         if category == "":
-            self.menu.append(
-                MenuItem(
-                    name=name, href=href, icon=icon, label=label, baseview=baseview
-                )
-            )
+            self.menu.append(new_menu_item)
         else:
             menu_item = self.find(category)
-            if menu_item:
-                new_menu_item = MenuItem(
-                    name=name, href=href, icon=icon, label=label, baseview=baseview
-                )
-                menu_item.childs.append(new_menu_item)
-            else:
+            if not menu_item:
                 self.add_category(
                     category=category, icon=category_icon, label=category_label
                 )
-                new_menu_item = MenuItem(
-                    name=name, href=href, icon=icon, label=label, baseview=baseview
-                )
-                self.find(category).childs.append(new_menu_item)
+                menu_item = self.find(category)
+            menu_item.childs.append(new_menu_item)
+        self._item_added(new_menu_item)
 
     def add_separator(self, category=""):
         menu_item = self.find(category)
         if menu_item:
             menu_item.childs.append(MenuItem("-"))
+            self._version += 1
         else:
             raise Exception(
                 "Menu separator does not have correct category {}".format(category)
@@ -0,0 +1,230 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .api import BaseApi, expose
+from .basemanager import BaseManager
+from .const import LOGMSG_WAR_FAB_QUERY_BUDGET
+from .exceptions import QueryBudgetExceededFABException
+from .security.decorators import permission_name, protect
+
+log = logging.getLogger(__name__)
+
+
+class QueryStats(object):
+    """
+        SQL statements stats collected for one request, rows_affected
+        counts the rows changed by INSERT, UPDATE and DELETE statements
+    """
+
+    __slots__ = ("count", "time", "rows_affected", "budget", "raise_on_budget")
+
+    def __init__(self, budget: Optional[int] = None, raise_on_budget: bool = False):
+        self.count = 0
+        self.time = 0.0
+        self.rows_affected = 0
+        self.budget = budget
+        self.raise_on_budget = raise_on_budget
+
+    @property
+    def is_over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def merge(self, other: "QueryStats") -> None:
+        """
+            Adds the stats collected by other, on another thread
+        """
+        self.count += other.count
+        self.time += other.time
+        self.rows_affected += other.rows_affected
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "time": self.time,
+            "rows_affected": self.rows_affected,
+        }
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """
+        Returns the SQL statements stats for the current request,
+        or None if they are not being collected (FAB_QUERY_METRICS)
+    """
+    if not has_request_context():
+        return None
+    return getattr(g, "_fab_query_stats", None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = get_query_stats()
+    if stats is None:
+        return
+    stats.count += 1
+    if stats.raise_on_budget and stats.is_over_budget:
+        raise QueryBudgetExceededFABException(
+            LOGMSG_WAR_FAB_QUERY_BUDGET.format(
+                request.endpoint, stats.count, stats.budget
+            )
+        )
+    if context is not None:
+        context._fab_query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = get_query_stats()
+    if stats is None:
+        return
+    start_time = getattr(context, "_fab_query_start_time", None)
+    if start_time is not None:
+        stats.time += time.perf_counter() - start_time
+    # rowcount is -1 or driver specific for SELECT statements
+    if context is not None and (
+        context.isinsert or context.isupdate or context.isdelete
+    ):
+        stats.rows_affected += max(cursor.rowcount, 0)
+
+
+class QueryMetricsApi(BaseApi):
+    route_base = "/fab"
+    allow_browser_login = True
+    openapi_spec_tag = "Metrics"
+
+    @expose("/metrics", methods=["GET"])
+    @protect()
+    @permission_name("get")
+    def metrics(self):
+        """Get SQL statements metrics per endpoint
+        ---
+        get:
+          description: >-
+            Get the number of requests, SQL statements, statements time
+            and rows affected per endpoint, collected by this worker process
+          responses:
+            200:
+              description: Metrics per endpoint
+              content:
+                application/json:
+                  schema:
+                    type: object
+                    properties:
+                      result:
+                        type: object
+                        additionalProperties:
+                          type: object
+                          properties:
+                            requests:
+                              type: integer
+                            queries:
+                              type: integer
+                            max_queries:
+                              type: integer
+                            time:
+                              type: number
+                            rows_affected:
+                              type: integer
+            401:
+              $ref: '#/components/responses/401'
+        """
+        return self.response(
+            200, result=current_app.appbuilder.metrics_manager.get_metrics()
+        )
+
+
+class QueryMetricsManager(BaseManager):
+    """
+        Counts SQL statements, their time and rows affected, for each request
+        and for each endpoint, when FAB_QUERY_METRICS is True
+    """
+
+    def __init__(self, appbuilder):
+        super(QueryMetricsManager, self).__init__(appbuilder)
+        app = self.appbuilder.get_app
+        app.config.setdefault("FAB_QUERY_METRICS", False)
+        app.config.setdefault("FAB_QUERY_METRICS_HEADER", False)
+        app.config.setdefault("FAB_QUERY_BUDGET", None)
+        app.config.setdefault("FAB_QUERY_BUDGET_RAISE", False)
+        self.endpoint_metrics = {}
+        self._lock = threading.Lock()
+        if self.enabled:
+            for name, listener in (
+                ("before_cursor_execute", _before_cursor_execute),
+                ("after_cursor_execute", _after_cursor_execute),
+            ):
+                if not event.contains(Engine, name, listener):
+                    event.listen(Engine, name, listener)
+            app.before_request(self.before_request)
+            app.after_request(self.after_request)
+
+    @property
+    def enabled(self) -> bool:
+        return self.appbuilder.get_app.config["FAB_QUERY_METRICS"]
+
+    @property
+    def query_budget(self) -> Optional[int]:
+        return self.appbuilder.get_app.config["FAB_QUERY_BUDGET"]
+
+    def register_views(self):
+        if self.enabled:
+            self.appbuilder.add_api(QueryMetricsApi)
+
+    def before_request(self):
+        g._fab_query_stats = QueryStats(
+            budget=self.query_budget,
+            raise_on_budget=self.appbuilder.get_app.config["FAB_QUERY_BUDGET_RAISE"],
+        )
+
+    def after_request(self, response):
+        stats = get_query_stats()
+        if stats is None:
+            return response
+        endpoint = request.endpoint
+        if endpoint:
+            self.add_endpoint_stats(endpoint, stats)
+        if stats.is_over_budget:
+            log.warning(
+                LOGMSG_WAR_FAB_QUERY_BUDGET.format(endpoint, stats.count, stats.budget)
+            )
+        app = self.appbuilder.get_app
+        if app.debug or app.config["FAB_QUERY_METRICS_HEADER"]:
+            response.headers["X-FAB-Query-Count"] = str(stats.count)
+            response.headers["X-FAB-Query-Time"] = "{:.6f}".format(stats.time)
+            response.headers["X-FAB-Query-Rows-Affected"] = str(stats.rows_affected)
+        return response
+
+    def add_endpoint_stats(self, endpoint: str, stats: QueryStats) -> None:
+        with self._lock:
+            metrics = self.endpoint_metrics.setdefault(
+                endpoint,
+                {
+                    "requests": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "time": 0.0,
+                    "rows_affected": 0,
+                },
+            )
+            metrics["requests"] += 1
+            metrics["queries"] += stats.count
+            metrics["max_queries"] = max(metrics["max_queries"], stats.count)
+            metrics["time"] += stats.time
+            metrics["rows_affected"] += stats.rows_affected
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """
+            Returns a copy of the metrics collected for each endpoint
+        """
+        with self._lock:
+            return {
+                endpoint: dict(metrics)
+                for endpoint, metrics in self.endpoint_metrics.items()
+            }
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self.endpoint_metrics = {}
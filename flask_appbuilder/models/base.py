@@ -1,11 +1,15 @@
 import datetime
 from functools import reduce
+from inspect import isroutine
 import logging
-from typing import Any, Type
+from operator import attrgetter, methodcaller
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Type
 
 from flask_babel import lazy_gettext
 
 from .filters import BaseFilterConverter, Filters
+from ..cache import get_cache
+from ..const import LOGMSG_ERR_FAB_CACHE_INVALIDATE
 
 try:
     import enum
@@ -26,6 +30,9 @@ class BaseInterface(object):
     filter_converter_class = Type[BaseFilterConverter]
     """ when sub classing override with your own custom filter converter """
 
+    supports_load_columns = False
+    """ set to True if query accepts load_columns to eager load relations """
+
     """ Messages to display on CRUD Events """
     add_row_message = lazy_gettext("Added Row")
     edit_row_message = lazy_gettext("Changed Row")
@@ -46,6 +53,7 @@ class BaseInterface(object):
 
     def __init__(self, obj: Type[Any]):
         self.obj = obj
+        self._column_getters = {}
 
     def _get_attr(self, col_name):
         if not hasattr(self.obj, col_name):
@@ -91,8 +99,75 @@ class BaseInterface(object):
             search_filters=search_filters,
         )
 
+    def _get_attr_value_getter(self, col: str) -> Callable[[Any], Any]:
+        """
+            Returns a function with the same result has _get_attr_value
+            for col, resolving if col is a dotted path, a method
+            or an attribute only once using the model class
+        """
+        if not hasattr(self.obj, col):
+            if "." not in col:
+                return lambda item: self._get_attr_value(item, col)
+            # it's an inner obj attr
+            getter = attrgetter(col)
+
+            def get_inner_value(item):
+                try:
+                    return getter(item)
+                except Exception:
+                    return ""
+
+            return get_inner_value
+        if isroutine(getattr(self.obj, col)):
+            # its a function
+            return methodcaller(col)
+        # its an attribute
+        getter = attrgetter(col)
+        if not _has_enum:
+            return getter
+
+        def get_value(item):
+            value = getter(item)
+            # if value is an Enum instance than list and show widgets should display
+            # its .value rather than its .name:
+            if isinstance(value, enum.Enum):
+                return value.value
+            return value
+
+        return get_value
+
+    def get_column_getters(self, list_columns: List[str]) -> List[Tuple[str, Callable]]:
+        """
+            Returns a list of tuples (col_name, getter) for list_columns.
+            Getters are compiled once and kept for each list_columns.
+
+            :param list_columns:
+                The list of columns to include
+        """
+        key = tuple(list_columns)
+        getters = self._column_getters.get(key)
+        if getters is None:
+            getters = [(col, self._get_attr_value_getter(col)) for col in key]
+            self._column_getters[key] = getters
+        return getters
+
+    def get_row_extractor(self, list_columns: List[str]) -> Callable[[Any], Dict]:
+        """
+            Returns a function that extracts a dict
+            {'col_name':'col_value',....} from an item
+
+            :param list_columns:
+                The list of columns to include
+        """
+        getters = self.get_column_getters(list_columns)
+
+        def extractor(item):
+            return {col: getter(item) for col, getter in getters}
+
+        return extractor
+
     def get_values_item(self, item, show_columns):
-        return [self._get_attr_value(item, col) for col in show_columns]
+        return [getter(item) for _, getter in self.get_column_getters(show_columns)]
 
     def _get_values(self, lst, list_columns):
         """
@@ -104,13 +179,7 @@ class BaseInterface(object):
             :param list_columns:
                 The list of columns to include
         """
-        retlst = []
-        for item in lst:
-            retdict = {}
-            for col in list_columns:
-                retdict[col] = self._get_attr_value(item, col)
-            retlst.append(retdict)
-        return retlst
+        return list(self.get_values(lst, list_columns))
 
     def get_values(self, lst, list_columns):
         """
@@ -122,28 +191,28 @@ class BaseInterface(object):
             :param list_columns:
                 The list of columns to include
         """
+        extractor = self.get_row_extractor(list_columns)
         for item in lst:
-            retdict = {}
-            for col in list_columns:
-                retdict[col] = self._get_attr_value(item, col)
-            yield retdict
+            yield extractor(item)
 
-    def get_values_json(self, lst, list_columns):
+    def iter_values_json(self, lst, list_columns) -> Iterator[Dict]:
         """
-            Converts list of objects from query to JSON
+            Yields a JSON serializable dict for each object from query,
+            use it to stream large results
         """
-        result = []
         for item in self.get_values(lst, list_columns):
-            for key, value in list(item.items()):
-                if isinstance(value, datetime.datetime) or isinstance(
-                    value, datetime.date
-                ):
-                    value = value.isoformat()
-                    item[key] = value
-                if isinstance(value, list):
+            for key, value in item.items():
+                if isinstance(value, (datetime.datetime, datetime.date)):
+                    item[key] = value.isoformat()
+                elif isinstance(value, list):
                     item[key] = [str(v) for v in value]
-            result.append(item)
-        return result
+            yield item
+
+    def get_values_json(self, lst, list_columns):
+        """
+            Converts list of objects from query to JSON
+        """
+        return list(self.iter_values_json(lst, list_columns))
 
     """
         Returns the models class name
@@ -154,6 +223,20 @@ class BaseInterface(object):
     def model_name(self):
         return self.obj.__class__.__name__
 
+    def invalidate_cache(self) -> None:
+        """
+            Invalidates all cached data built from this model,
+            call it after changing the model's data. Cache backend
+            errors are logged, the change is already committed
+        """
+        cache = get_cache()
+        if cache is None:
+            return
+        try:
+            cache.invalidate(self.model_name)
+        except Exception as e:
+            log.exception(LOGMSG_ERR_FAB_CACHE_INVALIDATE.format(self.model_name, e))
+
     """
         Next methods must be overridden
     """
@@ -299,6 +382,13 @@ class BaseInterface(object):
         else:
             return getattr(item, pk_name)
 
+    def get_signature_value(self, value):
+        """
+            Returns value as used on cache keys, model instances
+            should be identified by their primary key, not their repr
+        """
+        return value
+
     def get(self, pk, filter=None):
         """
             return the record from key, you can optionally pass filters
@@ -241,18 +241,27 @@ class Filters(object):
         """
             Creates a new filters class with active filters joined
         """
-        ret_filters = Filters(self.filter_converter, self.datamodel)
+        ret_filters = self.clone()
         ret_filters.filters = self.filters + filters.filters
         ret_filters.values = self.values + filters.values
         return ret_filters
 
+    def clone(self) -> "Filters":
+        """
+            Returns a copy of this object without active filters, the
+            search and available filters are shared, so it's cheap to make
+        """
+        ret_filters = copy.copy(self)
+        ret_filters.clear_filters()
+        return ret_filters
+
     def copy(self):
         """
             Returns a copy of this object
 
             :return: A copy of self
         """
-        retfilters = Filters(self.filter_converter, self.datamodel)
+        retfilters = self.clone()
         retfilters.filters = copy.copy(self.filters)
         retfilters.values = copy.copy(self.values)
         return retfilters
@@ -273,6 +282,27 @@ class Filters(object):
         """
         return [(flt, value) for flt, value in zip(self.filters, self.values)]
 
+    def get_filters_signature(self) -> List[Tuple[str, str, Any]]:
+        """
+            Returns the filter class, column and value of every filter,
+            calling callable values, used to key data cached per filters.
+            Model instances are identified by their primary key
+        """
+        signature = []
+        for flt, value in self.get_filters_values():
+            if callable(value):
+                value = value()
+            value = self.datamodel.get_signature_value(value)
+            signature.append((flt.__class__.__name__, flt.column_name, value))
+        return signature
+
+    def has_callable_values(self) -> bool:
+        """
+            Returns True if any filter value is computed on each
+            request, from the current user for example
+        """
+        return any(callable(value) for value in self.values)
+
     def get_filter_value(self, column_name: str) -> Any:
         """
             Returns the filtered value for a certain column
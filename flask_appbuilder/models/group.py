@@ -3,14 +3,19 @@ from __future__ import unicode_literals
 import calendar
 import datetime
 from functools import reduce
+from importlib.util import find_spec
 from itertools import groupby
 import logging
+from operator import attrgetter
 
 from flask_appbuilder._compat import as_unicode
 from flask_babel import lazy_gettext as _
 
 from .. import const as c
 
+# NumPy is only imported by the first aggregation that uses it
+_has_numpy = find_spec("numpy") is not None
+
 log = logging.getLogger(__name__)
 
 
@@ -351,3 +356,137 @@ class GroupByProcessData(BaseProcessData):
                 result_item.append(aggr_by_col[0](items, aggr_by_col[1]))
             result.append(result_item)
         return result
+
+
+class ColumnarGroupByProcessData(GroupByProcessData):
+    """
+        Groups by data by chosen columns (property group_bys_cols) like
+        GroupByProcessData, but without sorting the objects first.
+
+        Each needed column is extracted once into a column list, rows are
+        hash grouped in a single pass and the builtin aggregations
+        (aggregate_count, aggregate_sum, aggregate_avg) are computed per
+        column, vectorized with NumPy when it's installed. Custom
+        aggregation functions still receive the list of grouped objects.
+
+        Use it on your chart view::
+
+            class CountryGroupByChartView(GroupByChartView):
+                datamodel = SQLAInterface(CountryStats)
+                ProcessClass = ColumnarGroupByProcessData
+
+        :data: A list of objects
+        :sort: boolean, if true the groups are sorted by the group columns,
+            otherwise they keep the order they first appear on data
+        :return: A List of lists with group column and aggregation
+    """
+
+    use_numpy = True
+    """ Use NumPy for the builtin aggregations if it's installed """
+
+    def compile_getter(self, attr, sample):
+        """
+            Returns a getter for attr that behaves like resolve_attr,
+            deciding only once (using a sample object)
+            if attr is a method that must be called.
+        """
+        getter = attrgetter(attr)
+        if "." not in attr and callable(getter(sample)):
+
+            def g(obj):
+                return getter(obj)()
+
+            return g
+        return getter
+
+    def get_group_keys(self, data):
+        getters = [self.compile_getter(col, data[0]) for col in self.group_bys_cols]
+        if len(getters) == 1:
+            return [getters[0](item) for item in data]
+        return [tuple(getter(item) for getter in getters) for item in data]
+
+    def factorize(self, keys):
+        """
+            Maps each key to the index of its group, in a single pass.
+
+            :return: A tuple with the list of unique keys
+                and a list with the group index of each key
+        """
+        index = {}
+        codes = [index.setdefault(key, len(index)) for key in keys]
+        return list(index), codes
+
+    def _aggregate_numpy(self, aggr_func, values, codes, n_groups):
+        import numpy
+
+        counts = numpy.bincount(codes, minlength=n_groups)
+        if aggr_func is aggregate_count:
+            return counts.tolist()
+        values = numpy.asarray(values)
+        if values.dtype.kind not in "iuf":
+            return None
+        sums = numpy.zeros(n_groups, dtype=values.dtype)
+        numpy.add.at(sums, codes, values)
+        if aggr_func is aggregate_sum:
+            return sums.tolist()
+        return (sums / counts).tolist()
+
+    def _aggregate_python(self, aggr_func, values, codes, n_groups):
+        counts = [0] * n_groups
+        for code in codes:
+            counts[code] += 1
+        if aggr_func is aggregate_count:
+            return counts
+        sums = [0] * n_groups
+        for code, value in zip(codes, values):
+            sums[code] += value
+        if aggr_func is aggregate_sum:
+            return sums
+        return [_sum / count for _sum, count in zip(sums, counts)]
+
+    def aggregate(self, aggr_func, col, data, codes, n_groups):
+        """
+            Aggregates column col for every group.
+
+            :return: A list with the aggregated value for each group
+        """
+        if aggr_func in (aggregate_count, aggregate_sum, aggregate_avg):
+            values = None
+            if aggr_func is not aggregate_count:
+                getter = self.compile_getter(col, data[0])
+                values = [getter(item) for item in data]
+            if _has_numpy and self.use_numpy:
+                import numpy
+
+                codes_array = numpy.asarray(codes)
+                result = self._aggregate_numpy(
+                    aggr_func, values, codes_array, n_groups
+                )
+                if result is not None:
+                    return result
+            return self._aggregate_python(aggr_func, values, codes, n_groups)
+        groups = [[] for _ in range(n_groups)]
+        for code, item in zip(codes, data):
+            groups[code].append(item)
+        return [aggr_func(items, col) for items in groups]
+
+    def apply(self, data, sort=True):
+        data = list(data)
+        if not data:
+            return []
+        keys, codes = self.factorize(self.get_group_keys(data))
+        n_groups = len(keys)
+        columns = [
+            self.aggregate(aggr_func, col, data, codes, n_groups)
+            for aggr_func, col in self.aggr_by_cols
+        ]
+        order = range(n_groups)
+        if sort:
+            order = sorted(order, key=keys.__getitem__)
+        result = []
+        for i in order:
+            result_item = [self.format_columns(keys[i])]
+            for column in columns:
+                result_item.append(column[i])
+            result.append(result_item)
+        return result
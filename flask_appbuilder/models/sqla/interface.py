@@ -10,6 +10,7 @@ from sqlalchemy.orm import aliased, ColumnProperty, contains_eager, Load
 from sqlalchemy.orm.descriptor_props import SynonymProperty
 from sqlalchemy.orm.query import Query
 from sqlalchemy.orm.session import Session as SessionBase
+from sqlalchemy.orm.state import InstanceState
 from sqlalchemy.orm.util import AliasedClass
 from sqlalchemy.sql.elements import BinaryExpression
 from sqlalchemy.sql.sqltypes import TypeEngine
@@ -52,6 +53,7 @@ class SQLAInterface(BaseInterface):
     """
 
     filter_converter_class = filters.SQLAFilterConverter
+    supports_load_columns = True
 
     def __init__(self, obj: Type[Model], session: Optional[SessionBase] = None) -> None:
         _include_filters(self)
@@ -188,7 +190,11 @@ class SQLAInterface(BaseInterface):
         return query
 
     def _apply_normal_col_select_option(self, query: Query, column: str) -> Query:
-        if not self.is_relation(column) and not self.is_property_or_function(column):
+        if self.is_relation(column):
+            # load_only defers the relation FK, eager load it so reading
+            # it doesn't load the FK and then the related row on each row
+            return self.apply_load_options(query, [column])
+        if not self.is_property_or_function(column):
             return query.options(Load(self.obj).load_only(column))
         return query
 
@@ -278,6 +284,44 @@ class SQLAInterface(BaseInterface):
                 query = self._apply_normal_col_select_option(query, column)
         return query
 
+    def apply_load_options(
+        self, query: Query, load_columns: Optional[List[str]] = None
+    ) -> Query:
+        """
+        Eager loads the relations used by load_columns, so reading them
+        from the results does not issue one query per row. Many to one
+        and one to one relations are joined, collections are loaded
+        with one extra SELECT ... IN query. Dotted columns load every
+        relation on their path
+
+        :param query: SQLAlchemy Query
+        :param load_columns: Columns that will be read from the results,
+        supports dotted notation
+        :return: The query with the loader options
+        """
+        if not load_columns:
+            return query
+        loaders = {}
+        for column in load_columns:
+            model = self.obj
+            path = ()
+            loader = Load(self.obj)
+            for name in column.split("."):
+                relation = sa.inspect(model).relationships.get(name)
+                if relation is None:
+                    break
+                path += (name,)
+                if relation.uselist:
+                    loader = loader.selectinload(name)
+                else:
+                    loader = loader.joinedload(name)
+                model = relation.mapper.class_
+            if path:
+                loaders[path] = loader
+        if loaders:
+            query = query.options(*loaders.values())
+        return query
+
     def get_inner_filters(self, filters: Optional[Filters]) -> Filters:
         """
         Inner filters are non dotted columns and
@@ -405,6 +449,7 @@ class SQLAInterface(BaseInterface):
         page: Optional[int] = None,
         page_size: Optional[int] = None,
         select_columns: Optional[List[str]] = None,
+        load_columns: Optional[List[str]] = None,
     ) -> Tuple[int, List[Model]]:
         """
         Returns the results for a model query, applies filters, sorting and pagination
@@ -416,6 +461,9 @@ class SQLAInterface(BaseInterface):
         :param page_size: the current page size
         :param select_columns: A List of columns to be specifically selected
         on the query. Supports dotted notation.
+        :param load_columns: A List of columns that will be read from the
+        results, their relations are eager loaded. Supports dotted notation,
+        ignored when select_columns is given.
         :return: A tuple with the query count (non paginated) and the results
         """
         if not self.session:
@@ -432,6 +480,8 @@ class SQLAInterface(BaseInterface):
             page_size,
             select_columns,
         )
+        if not select_columns:
+            query = self.apply_load_options(query, load_columns)
         query_results = query.all()
 
         result = list()
@@ -647,8 +697,6 @@ class SQLAInterface(BaseInterface):
         try:
             self.session.add(item)
             self.session.commit()
-            self.message = (as_unicode(self.add_row_message), "success")
-            return True
         except IntegrityError as e:
             self.message = (as_unicode(self.add_integrity_error_message), "warning")
             log.warning(LOGMSG_WAR_DBI_ADD_INTEGRITY.format(str(e)))
@@ -666,13 +714,14 @@ class SQLAInterface(BaseInterface):
             if raise_exception:
                 raise e
             return False
+        self.invalidate_cache()
+        self.message = (as_unicode(self.add_row_message), "success")
+        return True
 
     def edit(self, item: Model, raise_exception: bool = False) -> bool:
         try:
             self.session.merge(item)
             self.session.commit()
-            self.message = (as_unicode(self.edit_row_message), "success")
-            return True
         except IntegrityError as e:
             self.message = (as_unicode(self.edit_integrity_error_message), "warning")
             log.warning(LOGMSG_WAR_DBI_EDIT_INTEGRITY.format(str(e)))
@@ -690,14 +739,15 @@ class SQLAInterface(BaseInterface):
             if raise_exception:
                 raise e
             return False
+        self.invalidate_cache()
+        self.message = (as_unicode(self.edit_row_message), "success")
+        return True
 
     def delete(self, item: Model, raise_exception: bool = False) -> bool:
         try:
-            self._delete_files(item)
+            files = self._get_files([item])
             self.session.delete(item)
             self.session.commit()
-            self.message = (as_unicode(self.delete_row_message), "success")
-            return True
         except IntegrityError as e:
             self.message = (as_unicode(self.delete_integrity_error_message), "warning")
             log.warning(LOGMSG_WAR_DBI_DEL_INTEGRITY.format(str(e)))
@@ -715,15 +765,17 @@ class SQLAInterface(BaseInterface):
             if raise_exception:
                 raise e
             return False
+        self.invalidate_cache()
+        self._delete_files(files)
+        self.message = (as_unicode(self.delete_row_message), "success")
+        return True
 
     def delete_all(self, items: List[Model]) -> bool:
         try:
+            files = self._get_files(items)
             for item in items:
-                self._delete_files(item)
                 self.session.delete(item)
             self.session.commit()
-            self.message = (as_unicode(self.delete_row_message), "success")
-            return True
         except IntegrityError as e:
             self.message = (as_unicode(self.delete_integrity_error_message), "warning")
             log.warning(LOGMSG_WAR_DBI_DEL_INTEGRITY.format(str(e)))
@@ -737,6 +789,10 @@ class SQLAInterface(BaseInterface):
             log.exception(LOGMSG_ERR_DBI_DEL_GENERIC.format(str(e)))
             self.session.rollback()
             return False
+        self.invalidate_cache()
+        self._delete_files(files)
+        self.message = (as_unicode(self.delete_row_message), "success")
+        return True
 
     """
     -----------------------
@@ -754,17 +810,52 @@ class SQLAInterface(BaseInterface):
             if self.is_image(file_col):
                 im.save_file(this_request.files[file_col], getattr(item, file_col))
 
-    def _delete_files(self, item: Model):
-        for file_col in self.get_file_column_list():
-            if self.is_file(file_col):
-                if getattr(item, file_col):
-                    fm = FileManager()
-                    fm.delete_file(getattr(item, file_col))
-        for file_col in self.get_image_column_list():
-            if self.is_image(file_col):
-                if getattr(item, file_col):
-                    im = ImageManager()
-                    im.delete_file(getattr(item, file_col))
+    def _get_files(self, items: List[Model]) -> Tuple[List[str], List[str]]:
+        """
+            Returns the file and image names of items,
+            read before the items are deleted
+        """
+        files = [
+            getattr(item, col)
+            for item in items
+            for col in self.get_file_column_list()
+            if getattr(item, col)
+        ]
+        images = [
+            getattr(item, col)
+            for item in items
+            for col in self.get_image_column_list()
+            if getattr(item, col)
+        ]
+        return files, images
+
+    def _get_referenced_files(self, file_names: List[str]) -> List[str]:
+        """
+            Returns the file_names still used by a file column of any
+            table on the model's metadata, with one IN query per column
+        """
+        referenced = []
+        for table in self.obj.metadata.tables.values():
+            for column in table.columns:
+                if isinstance(column.type, FileColumn):
+                    referenced.extend(
+                        name
+                        for name, in self.session.execute(
+                            sa.select([column]).where(column.in_(file_names))
+                        )
+                    )
+        return referenced
+
+    def _delete_files(self, files: Tuple[List[str], List[str]]):
+        """
+            Deletes the files returned by _get_files once their rows
+            are gone, in one batch per manager
+        """
+        file_names, image_names = files
+        if file_names:
+            FileManager().delete_files(file_names, self._get_referenced_files)
+        if image_names:
+            ImageManager().delete_files(image_names)
 
     """
     ------------------------------
@@ -956,6 +1047,21 @@ class SQLAInterface(BaseInterface):
             return getattr(model_, pk_name)
         return None
 
+    def get_signature_value(self, value: Any) -> Any:
+        """
+        Identifies model instances by their class and primary key,
+        lists and tuples by their items signatures.
+        """
+        if isinstance(value, (list, tuple)):
+            return [self.get_signature_value(item) for item in value]
+        state = sa.inspect(value, raiseerr=False)
+        if isinstance(state, InstanceState):
+            return (
+                value.__class__.__name__,
+                tuple(state.mapper.primary_key_from_instance(value)),
+            )
+        return value
+
     def _get_pk_name(self, model: Type[Model]) -> Optional[Union[List[str], str]]:
         pk = [pk.name for pk in model.__mapper__.primary_key]
         if pk:
@@ -3,14 +3,13 @@ import datetime
 import json
 import logging
 import re
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 
 from flask import g, session, url_for
 from flask_babel import lazy_gettext as _
 from flask_jwt_extended import current_user as current_user_jwt
 from flask_jwt_extended import JWTManager
 from flask_login import current_user, LoginManager
-from flask_openid import OpenID
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from .api import SecurityApi
@@ -87,6 +86,17 @@ class AbstractSecurityManager(BaseManager):
         """
         raise NotImplementedError
 
+    def add_permissions_bulk(self, permissions):
+        """
+            Adds all missing permissions on view menus to the backend
+            and to the admin role, does not remove any permission
+
+            :param permissions:
+                Dict with view menu names has keys and sets
+                of permission names has values
+        """
+        raise NotImplementedError
+
     def register_views(self):
         """
             Generic function to create the security views
@@ -252,6 +262,8 @@ class BaseSecurityManager(AbstractSecurityManager):
             app.config.setdefault("AUTH_LDAP_EMAIL_FIELD", "mail")
 
         if self.auth_type == AUTH_OID:
+            from flask_openid import OpenID
+
             self.oid = OpenID(app)
         if self.auth_type == AUTH_OAUTH:
             from authlib.integrations.flask_client import OAuth
@@ -1197,6 +1209,24 @@ class BaseSecurityManager(AbstractSecurityManager):
         else:
             return self.is_item_public(permission_name, view_name)
 
+    def get_user_roles_signature(self) -> Tuple[str, ...]:
+        """
+            Returns the sorted role names of the current user, or the public
+            role name, used to key data cached per set of roles
+        """
+        user = self.current_user
+        if user is None:
+            return (self.auth_role_public,)
+        return tuple(sorted(role.name for role in user.roles))
+
+    def invalidate_role_cache(self) -> None:
+        """
+            Invalidates data cached per set of roles, like the menu,
+            call it when role permissions change
+        """
+        if self.appbuilder.cache is not None:
+            self.appbuilder.cache.invalidate(self.role_model.__name__)
+
     def get_user_menu_access(self, menu_names: List[str] = None) -> Set[str]:
         if current_user.is_authenticated:
             return self._get_user_permission_view_menus(
@@ -1274,6 +1304,28 @@ class BaseSecurityManager(AbstractSecurityManager):
             role_admin = self.find_role(self.auth_role_admin)
             self.add_permission_role(role_admin, pv)
 
+    def add_permissions_bulk(self, permissions):
+        """
+            Adds all missing permissions on view menus to the backend
+            and to the admin role, does not remove any permission.
+            Backends should override it with a set based implementation
+
+            :param permissions:
+                Dict with view menu names has keys and sets
+                of permission names has values
+        """
+        role_admin = None
+        if self.auth_role_admin not in self.builtin_roles:
+            role_admin = self.find_role(self.auth_role_admin)
+        for view_menu_name, permission_names in permissions.items():
+            self.add_view_menu(view_menu_name)
+            for permission_name in permission_names:
+                pv = self.find_permission_view_menu(permission_name, view_menu_name)
+                if not pv:
+                    pv = self.add_permission_view_menu(permission_name, view_menu_name)
+                if role_admin:
+                    self.add_permission_role(role_admin, pv)
+
     def security_cleanup(self, baseviews, menus):
         """
             Will cleanup all unused permissions from the database
@@ -1281,27 +1333,38 @@ class BaseSecurityManager(AbstractSecurityManager):
             :param baseviews: A list of BaseViews class
             :param menus: Menu class
         """
-        viewsmenus = self.get_all_view_menu()
-        roles = self.get_all_roles()
-        for viewmenu in viewsmenus:
-            found = False
-            for baseview in baseviews:
-                if viewmenu.name == baseview.class_permission_name:
-                    found = True
-                    break
-            if menus.find(viewmenu.name):
-                found = True
-            if not found:
-                permissions = self.find_permissions_view_menu(viewmenu)
-                for permission in permissions:
-                    for role in roles:
-                        self.del_permission_role(role, permission)
-                    self.del_permission_view_menu(
-                        permission.permission.name, viewmenu.name
-                    )
-                self.del_view_menu(viewmenu.name)
+        used_view_menus = {baseview.class_permission_name for baseview in baseviews}
+        used_view_menus.update(menus.flat_names)
+        self.del_view_menus_cascade(
+            {
+                view_menu.name
+                for view_menu in self.get_all_view_menu()
+                if view_menu.name not in used_view_menus
+            }
+        )
         self.security_converge(baseviews, menus)
 
+    def del_view_menus_cascade(self, view_menu_names: Set[str]) -> None:
+        """
+            Deletes view menus, their permissions on view menus and
+            the association of those to all roles.
+            Backends should override it with a set based implementation
+
+            :param view_menu_names: Set with the view menu names to delete
+        """
+        roles = self.get_all_roles()
+        for view_menu_name in view_menu_names:
+            view_menu = self.find_view_menu(view_menu_name)
+            if not view_menu:
+                continue
+            for permission in self.find_permissions_view_menu(view_menu):
+                for role in roles:
+                    self.del_permission_role(role, permission)
+                self.del_permission_view_menu(
+                    permission.permission.name, view_menu.name
+                )
+            self.del_view_menu(view_menu.name)
+
     @staticmethod
     def _get_new_old_permissions(baseview) -> Dict:
         ret = dict()
@@ -1442,6 +1505,18 @@ class BaseSecurityManager(AbstractSecurityManager):
             log.info("No state transitions found")
             return dict()
         log.debug(f"State transitions: {state_transitions}")
+        self.apply_state_transitions(state_transitions)
+        return state_transitions
+
+    def apply_state_transitions(self, state_transitions: Dict) -> None:
+        """
+            Applies the state transitions computed by
+            `create_state_transitions` to all roles, then deletes
+            the old permissions on views, views and permissions.
+            Backends should override it with a set based implementation
+
+        :param state_transitions: Dict with state transitions
+        """
         roles = self.get_all_roles()
         for role in roles:
             permissions = list(role.permissions)
@@ -1466,7 +1541,6 @@ class BaseSecurityManager(AbstractSecurityManager):
             self.del_view_menu(view_name)
         for permission_name in state_transitions["del_perms"]:
             self.del_permission(permission_name)
-        return state_transitions
 
     """
      ---------------------------
@@ -379,6 +379,7 @@ class SecurityManager(BaseSecurityManager):
                 log.info(
                     c.LOGMSG_INF_SEC_ADD_PERMROLE.format(str(perm_view), role.name)
                 )
+                self.invalidate_role_cache()
             except Exception as e:
                 log.error(c.LOGMSG_ERR_SEC_ADD_PERMROLE.format(str(e)))
 
@@ -398,5 +399,6 @@ class SecurityManager(BaseSecurityManager):
                 log.info(
                     c.LOGMSG_INF_SEC_DEL_PERMROLE.format(str(perm_view), role.name)
                 )
+                self.invalidate_role_cache()
             except Exception as e:
                 log.error(c.LOGMSG_ERR_SEC_DEL_PERMROLE.format(str(e)))
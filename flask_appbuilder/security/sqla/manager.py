@@ -1,9 +1,10 @@
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 import uuid
 
 from sqlalchemy import and_, func, literal
 from sqlalchemy.engine.reflection import Inspector
+from sqlalchemy.orm import contains_eager, joinedload
 from sqlalchemy.orm.exc import MultipleResultsFound
 from werkzeug.security import generate_password_hash
 
@@ -489,6 +490,7 @@ class SecurityManager(BaseSecurityManager):
             .join(self.role_model)
             .join(self.permission_model)
             .join(self.viewmenu_model)
+            .options(contains_eager(self.permissionview_model.view_menu))
             .filter(
                 self.permission_model.name == permission_name,
                 self.role_model.id.in_(role_ids),
@@ -706,6 +708,224 @@ class SecurityManager(BaseSecurityManager):
             log.error(c.LOGMSG_ERR_SEC_DEL_PERMVIEW.format(str(e)))
             self.get_session.rollback()
 
+    def _get_permission_views_by_name(self) -> Dict[Tuple[str, str], PermissionView]:
+        return {
+            (pv.view_menu.name, pv.permission.name): pv
+            for pv in self.get_session.query(self.permissionview_model).options(
+                joinedload(self.permissionview_model.view_menu),
+                joinedload(self.permissionview_model.permission),
+            )
+            if pv.view_menu and pv.permission
+        }
+
+    def add_permissions_bulk(self, permissions):
+        """
+            Adds all missing permissions on view menus to the backend
+            and to the admin role, does not remove any permission.
+            Diffs against the existing state with a fixed number of
+            queries and applies all changes on a single commit
+
+            :param permissions:
+                Dict with view menu names has keys and sets
+                of permission names has values
+        """
+        session = self.get_session
+        try:
+            view_menus = {
+                view_menu.name: view_menu
+                for view_menu in session.query(self.viewmenu_model)
+            }
+            perms = {perm.name: perm for perm in session.query(self.permission_model)}
+            pvs = self._get_permission_views_by_name()
+            role_admin = None
+            if self.auth_role_admin not in self.builtin_roles:
+                role_admin = self.find_role(self.auth_role_admin)
+            admin_pvs = set(role_admin.permissions) if role_admin else set()
+
+            changed = False
+            for view_menu_name, permission_names in permissions.items():
+                view_menu = view_menus.get(view_menu_name)
+                if view_menu is None:
+                    view_menu = self.viewmenu_model(name=view_menu_name)
+                    view_menus[view_menu_name] = view_menu
+                    session.add(view_menu)
+                    changed = True
+                for permission_name in permission_names:
+                    pv = pvs.get((view_menu_name, permission_name))
+                    if pv is None:
+                        perm = perms.get(permission_name)
+                        if perm is None:
+                            perm = self.permission_model(name=permission_name)
+                            perms[permission_name] = perm
+                            session.add(perm)
+                        pv = self.permissionview_model(
+                            view_menu=view_menu, permission=perm
+                        )
+                        pvs[(view_menu_name, permission_name)] = pv
+                        session.add(pv)
+                        changed = True
+                        log.info(c.LOGMSG_INF_SEC_ADD_PERMVIEW.format(str(pv)))
+                    if role_admin and pv not in admin_pvs:
+                        role_admin.permissions.append(pv)
+                        admin_pvs.add(pv)
+                        changed = True
+            if changed:
+                session.commit()
+                self.invalidate_role_cache()
+        except Exception as e:
+            log.error(c.LOGMSG_ERR_SEC_ADD_PERMVIEW.format(str(e)))
+            session.rollback()
+
+    def apply_state_transitions(self, state_transitions: Dict) -> None:
+        """
+            Applies the state transitions computed by
+            `create_state_transitions` with a fixed number of queries,
+            role associations are inserted and deleted in bulk and all
+            changes are made on a single commit
+
+        :param state_transitions: Dict with state transitions
+        """
+        session = self.get_session
+        try:
+            view_menus = {
+                view_menu.name: view_menu
+                for view_menu in session.query(self.viewmenu_model)
+            }
+            perms = {perm.name: perm for perm in session.query(self.permission_model)}
+            pvs = self._get_permission_views_by_name()
+            pv_role_ids: Dict[int, Set[int]] = {}
+            for role_id, pv_id in session.query(
+                assoc_permissionview_role.c.role_id,
+                assoc_permissionview_role.c.permission_view_id,
+            ):
+                pv_role_ids.setdefault(pv_id, set()).add(role_id)
+
+            # Create the new permissions on views that are granted to some role
+            new_role_pvs = []
+            for old_pv_name, new_pv_names in state_transitions["add"].items():
+                old_pv = pvs.get(old_pv_name)
+                role_ids = pv_role_ids.get(old_pv.id) if old_pv else None
+                if not role_ids:
+                    continue
+                for view_menu_name, permission_name in new_pv_names:
+                    pv = pvs.get((view_menu_name, permission_name))
+                    if pv is None:
+                        view_menu = view_menus.get(view_menu_name)
+                        if view_menu is None:
+                            view_menu = self.viewmenu_model(name=view_menu_name)
+                            view_menus[view_menu_name] = view_menu
+                        perm = perms.get(permission_name)
+                        if perm is None:
+                            perm = self.permission_model(name=permission_name)
+                            perms[permission_name] = perm
+                        pv = self.permissionview_model(
+                            view_menu=view_menu, permission=perm
+                        )
+                        pvs[(view_menu_name, permission_name)] = pv
+                        session.add(pv)
+                        log.info(c.LOGMSG_INF_SEC_ADD_PERMVIEW.format(str(pv)))
+                    new_role_pvs.append((pv, role_ids))
+            session.flush()
+
+            inserts = {}
+            for pv, role_ids in new_role_pvs:
+                for role_id in role_ids - pv_role_ids.get(pv.id, set()):
+                    inserts[(pv.id, role_id)] = {
+                        "permission_view_id": pv.id,
+                        "role_id": role_id,
+                    }
+            if inserts:
+                session.execute(
+                    assoc_permissionview_role.insert(), list(inserts.values())
+                )
+
+            # Remove the old permissions on views from all roles, then delete them
+            del_pv_ids = [
+                pvs.pop(pv_name).id
+                for pv_name in state_transitions["del_role_pvm"]
+                if pv_name in pvs
+            ]
+            deleted = 0
+            if del_pv_ids:
+                deleted = session.execute(
+                    assoc_permissionview_role.delete().where(
+                        assoc_permissionview_role.c.permission_view_id.in_(del_pv_ids)
+                    )
+                ).rowcount
+                session.query(self.permissionview_model).filter(
+                    self.permissionview_model.id.in_(del_pv_ids)
+                ).delete(synchronize_session=False)
+                for pv_name in state_transitions["del_role_pvm"]:
+                    log.info(c.LOGMSG_INF_SEC_DEL_PERMVIEW.format(*reversed(pv_name)))
+
+            # Views and permissions still referenced by a permission on view stay
+            used_view_menus = {view_menu_name for view_menu_name, _ in pvs}
+            used_perms = {permission_name for _, permission_name in pvs}
+            del_view_menu_ids = [
+                view_menus[name].id
+                for name in state_transitions["del_views"]
+                if name in view_menus and name not in used_view_menus
+            ]
+            del_perm_ids = [
+                perms[name].id
+                for name in state_transitions["del_perms"]
+                if name in perms and name not in used_perms
+            ]
+            if del_view_menu_ids:
+                session.query(self.viewmenu_model).filter(
+                    self.viewmenu_model.id.in_(del_view_menu_ids)
+                ).delete(synchronize_session=False)
+            if del_perm_ids:
+                session.query(self.permission_model).filter(
+                    self.permission_model.id.in_(del_perm_ids)
+                ).delete(synchronize_session=False)
+            session.commit()
+            log.info(c.LOGMSG_INF_SEC_CONVERGE.format(len(inserts), deleted))
+            self.invalidate_role_cache()
+        except Exception as e:
+            log.error(c.LOGMSG_ERR_SEC_CONVERGE.format(str(e)))
+            session.rollback()
+
+    def del_view_menus_cascade(self, view_menu_names: Set[str]) -> None:
+        """
+            Deletes view menus, their permissions on view menus and
+            the association of those to all roles, in bulk and on
+            a single commit
+
+            :param view_menu_names: Set with the view menu names to delete
+        """
+        if not view_menu_names:
+            return
+        session = self.get_session
+        try:
+            view_menu_ids = [
+                view_menu_id
+                for view_menu_id, in session.query(self.viewmenu_model.id).filter(
+                    self.viewmenu_model.name.in_(view_menu_names)
+                )
+            ]
+            pv_ids = session.query(self.permissionview_model.id).filter(
+                self.permissionview_model.view_menu_id.in_(view_menu_ids)
+            )
+            session.execute(
+                assoc_permissionview_role.delete().where(
+                    assoc_permissionview_role.c.permission_view_id.in_(
+                        pv_ids.subquery()
+                    )
+                )
+            )
+            session.query(self.permissionview_model).filter(
+                self.permissionview_model.view_menu_id.in_(view_menu_ids)
+            ).delete(synchronize_session=False)
+            session.query(self.viewmenu_model).filter(
+                self.viewmenu_model.id.in_(view_menu_ids)
+            ).delete(synchronize_session=False)
+            session.commit()
+            self.invalidate_role_cache()
+        except Exception as e:
+            log.error(c.LOGMSG_ERR_SEC_CLEANUP.format(str(e)))
+            session.rollback()
+
     def exist_permission_on_views(self, lst, item):
         for i in lst:
             if i.permission and i.permission.name == item:
@@ -735,6 +955,7 @@ class SecurityManager(BaseSecurityManager):
                 log.info(
                     c.LOGMSG_INF_SEC_ADD_PERMROLE.format(str(perm_view), role.name)
                 )
+                self.invalidate_role_cache()
             except Exception as e:
                 log.error(c.LOGMSG_ERR_SEC_ADD_PERMROLE.format(str(e)))
                 self.get_session.rollback()
@@ -756,6 +977,7 @@ class SecurityManager(BaseSecurityManager):
                 log.info(
                     c.LOGMSG_INF_SEC_DEL_PERMROLE.format(str(perm_view), role.name)
                 )
+                self.invalidate_role_cache()
             except Exception as e:
                 log.error(c.LOGMSG_ERR_SEC_DEL_PERMROLE.format(str(e)))
                 self.get_session.rollback()
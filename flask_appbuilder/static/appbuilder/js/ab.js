@@ -42,6 +42,48 @@ function loadSelectData() {
 }
 
 
+//----------------------------------------------------------
+// select2 that searches and pages options on the server
+//----------------------------------------------------------
+function loadSelectDataPaged() {
+    $(".my_select2_ajax_paged").each(function( index ) {
+        var elem = $(this);
+        var multiple = elem.attr('multiple') !== undefined;
+        var pageSize = parseInt(elem.attr('page_size'));
+        elem.select2({
+            placeholder: "Select",
+            allowClear: true,
+            multiple: multiple,
+            ajax: {
+                url: elem.attr('endpoint'),
+                dataType: 'json',
+                quietMillis: 250,
+                data: function (term, page) {
+                    return {q: term, page: page - 1, psize: pageSize};
+                },
+                results: function (data, page) {
+                    return data;
+                }
+            },
+            initSelection: function (element, callback) {
+                var selection = element.data('selection') || [];
+                callback(multiple ? selection : selection[0]);
+            }
+        });
+        if (multiple) {
+            // Submit one value for each selected option
+            elem.closest('form').on('submit', function() {
+                var name = elem.attr('name');
+                $.each(elem.select2('val'), function(i, value) {
+                    $('<input type="hidden">').attr('name', name).val(value).insertAfter(elem);
+                });
+                elem.prop('disabled', true);
+            });
+        }
+    });
+}
+
+
 //---------------------------------------
 // Setup date time modal views, select2
 //---------------------------------------
@@ -54,6 +96,7 @@ $(function() {
     $(".my_select2.readonly").select2("readonly", true);
     loadSelectData();
     loadSelectDataSlave();
+    loadSelectDataPaged();
     $("a").tooltip({container:'.row', 'placement': 'bottom'});
 });
 
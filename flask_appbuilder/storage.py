@@ -0,0 +1,297 @@
+import logging
+import os
+import os.path as op
+import tempfile
+
+from flask import current_app, redirect, send_file, send_from_directory
+from werkzeug.urls import url_quote
+
+from .const import LOGMSG_ERR_FAB_DELETE_FILE
+
+log = logging.getLogger(__name__)
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+    ClientError = None
+
+# Temporary files are created with 0600, saved files get the usual mode
+_umask = os.umask(0)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+# Headers kept when the proxy serves the file with X-Accel-Redirect
+ACCEL_REDIRECT_HEADERS = ("Content-Disposition", "Cache-Control", "Expires")
+
+
+def content_disposition(attachment_filename):
+    return "attachment; filename*=UTF-8''%s" % url_quote(
+        attachment_filename, safe=b""
+    )
+
+
+class BaseStorage(object):
+    """
+        Storage backend used by FileManager and ImageManager
+        to keep uploaded files, names are relative to its root.
+        Implement save, open, delete, exists and rename, and url
+        if clients can fetch files directly from the storage.
+    """
+
+    def save(self, name, stream):
+        """
+            Saves everything read from stream as name,
+            name only exists once the whole stream is saved
+        """
+        raise NotImplementedError
+
+    def open(self, name):
+        """
+            Returns a binary file like object to read name from
+        """
+        raise NotImplementedError
+
+    def delete(self, name):
+        """
+            Deletes name, missing names are ignored
+        """
+        raise NotImplementedError
+
+    def delete_many(self, names):
+        """
+            Deletes a batch of names
+        """
+        for name in names:
+            self.delete(name)
+
+    def exists(self, name):
+        raise NotImplementedError
+
+    def rename(self, name, new_name):
+        raise NotImplementedError
+
+    def url(self, name, attachment_filename=None):
+        """
+            Returns an URL clients can fetch name from without going
+            through the application, None if the application serves it
+
+            :param attachment_filename: Have the client save the file
+                with this name instead of displaying it
+        """
+        return None
+
+    def send_file(self, name, as_attachment=False, attachment_filename=None):
+        """
+            Response for a request of name, redirects to url when
+            the storage has one, streams the file otherwise
+        """
+        url = self.url(name, attachment_filename if as_attachment else None)
+        if url:
+            return redirect(url)
+        return send_file(
+            self.open(name),
+            as_attachment=as_attachment,
+            attachment_filename=attachment_filename or op.basename(name),
+            add_etags=False,
+        )
+
+
+class LocalStorage(BaseStorage):
+    """
+        Keeps files on a local (or mounted) folder.
+
+        Files are copied in chunks of buffer_size bytes into a temporary
+        file on the target folder and then renamed to their final name,
+        so a failed upload never leaves a partial file behind.
+
+        :param base_path: The folder files are saved on
+        :param permission: Mode of the folders created on base_path
+        :param buffer_size: Copy chunk size
+        :param accel_redirect_url: Internal proxy location of base_path,
+            send_file answers with an X-Accel-Redirect to it instead of
+            the file contents
+    """
+
+    def __init__(
+        self,
+        base_path,
+        permission=0o755,
+        buffer_size=DEFAULT_BUFFER_SIZE,
+        accel_redirect_url=None,
+    ):
+        self.base_path = base_path
+        self.permission = permission
+        self.buffer_size = buffer_size
+        self.accel_redirect_url = accel_redirect_url
+
+    def get_path(self, name):
+        return op.join(self.base_path, name)
+
+    def save(self, name, stream):
+        path = self.get_path(name)
+        dirname = op.dirname(path)
+        if not op.exists(dirname):
+            os.makedirs(dirname, self.permission)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=dirname)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = stream.read(self.buffer_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            os.chmod(tmp_path, FILE_MODE)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def open(self, name):
+        return open(self.get_path(name), "rb")
+
+    def delete(self, name):
+        path = self.get_path(name)
+        if op.exists(path):
+            os.remove(path)
+
+    def exists(self, name):
+        return op.exists(self.get_path(name))
+
+    def rename(self, name, new_name):
+        os.replace(self.get_path(name), self.get_path(new_name))
+
+    def send_file(self, name, as_attachment=False, attachment_filename=None):
+        """
+            Sends name from base_path, answering Range, If-Range and
+            conditional requests with ETag and Last-Modified from the file
+            stat. With USE_X_SENDFILE the WSGI server sends the file, with
+            accel_redirect_url the proxy does
+        """
+        response = send_from_directory(
+            self.base_path,
+            name,
+            as_attachment=as_attachment,
+            attachment_filename=attachment_filename,
+            conditional=True,
+        )
+        if not self.accel_redirect_url or response.status_code == 304:
+            return response
+        response.close()
+        # The proxy answers ranges and validators from the file itself
+        accel_response = current_app.response_class(mimetype=response.mimetype)
+        for header in ACCEL_REDIRECT_HEADERS:
+            if header in response.headers:
+                accel_response.headers[header] = response.headers[header]
+        accel_response.headers["X-Accel-Redirect"] = self.accel_redirect_url + url_quote(
+            name
+        )
+        return accel_response
+
+
+class S3Storage(BaseStorage):
+    """
+        Keeps files on an S3 compatible object store (AWS S3, MinIO, Ceph...),
+        clients download them from presigned URLs, so the application
+        never proxies their bytes. Needs boto3::
+
+            FILE_STORAGE = S3Storage(
+                "uploads", prefix="files/", endpoint_url="http://minio:9000"
+            )
+
+        :param bucket: The bucket name
+        :param prefix: Prepended to names to get the object keys
+        :param client: A boto3 S3 client, defaults to
+            boto3.client("s3", **client_kwargs)
+        :param public_url: Base URL of a public bucket or CDN,
+            url returns it instead of presigned URLs
+        :param expires_in: Seconds presigned URLs are valid for
+        :param delete_batch_size: Max keys per DeleteObjects request
+    """
+
+    def __init__(
+        self,
+        bucket,
+        prefix="",
+        client=None,
+        public_url=None,
+        expires_in=3600,
+        delete_batch_size=1000,
+        **client_kwargs
+    ):
+        if client is None:
+            if boto3 is None:
+                raise Exception("boto3 library was not found")
+            client = boto3.client("s3", **client_kwargs)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_url = public_url
+        self.expires_in = expires_in
+        self.delete_batch_size = delete_batch_size
+
+    def get_key(self, name):
+        return self.prefix + name
+
+    def save(self, name, stream):
+        # Multipart uploads are only visible once completed
+        self.client.upload_fileobj(stream, self.bucket, self.get_key(name))
+
+    def open(self, name):
+        return self.client.get_object(Bucket=self.bucket, Key=self.get_key(name))[
+            "Body"
+        ]
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket, Key=self.get_key(name))
+
+    def delete_many(self, names):
+        names = list(names)
+        for i in range(0, len(names), self.delete_batch_size):
+            response = self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={
+                    "Objects": [
+                        {"Key": self.get_key(name)}
+                        for name in names[i : i + self.delete_batch_size]
+                    ],
+                    "Quiet": True,
+                },
+            )
+            for error in response.get("Errors", []):
+                log.error(
+                    LOGMSG_ERR_FAB_DELETE_FILE.format(error["Key"], error["Message"])
+                )
+
+    def exists(self, name):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.get_key(name))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def rename(self, name, new_name):
+        self.client.copy_object(
+            Bucket=self.bucket,
+            Key=self.get_key(new_name),
+            CopySource={"Bucket": self.bucket, "Key": self.get_key(name)},
+        )
+        self.delete(name)
+
+    def url(self, name, attachment_filename=None):
+        key = self.get_key(name)
+        if self.public_url and not attachment_filename:
+            return self.public_url + url_quote(key)
+        params = {"Bucket": self.bucket, "Key": key}
+        if attachment_filename:
+            params["ResponseContentDisposition"] = content_disposition(
+                attachment_filename
+            )
+        return self.client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=self.expires_in
+        )
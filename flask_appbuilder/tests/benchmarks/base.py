@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+import datetime
+import os
+
+from flask import g
+from flask_appbuilder.api import ModelRestApi
+from flask_appbuilder.charts.views import GroupByChartView
+from flask_appbuilder.metrics import get_query_stats, QueryStats
+from flask_appbuilder.models.group import aggregate_count
+from flask_appbuilder.models.sqla.interface import SQLAInterface
+from flask_appbuilder.views import ModelView
+from flask_login import login_user
+
+from ..sqla.models import Model1, Model2, ModelMMChild, ModelMMParent
+
+BENCH_SIZE = int(os.environ.get("FAB_BENCH_SIZE", 1000))
+BENCH_MM_CHILDREN = 10
+BENCH_GROUPS = 20
+USERNAME_DB_ROLE = "benchdbrole"
+PASSWORD_DB_ROLE = "benchdbrole"
+
+
+class Model1Api(ModelRestApi):
+    datamodel = SQLAInterface(Model1)
+
+
+class Model2Api(ModelRestApi):
+    datamodel = SQLAInterface(Model2)
+
+
+class ModelMMParentApi(ModelRestApi):
+    datamodel = SQLAInterface(ModelMMParent)
+
+
+class Model2View(ModelView):
+    datamodel = SQLAInterface(Model2)
+
+
+class Model2ChartView(GroupByChartView):
+    datamodel = SQLAInterface(Model2)
+    definitions = [
+        {"group": "group", "series": [(aggregate_count, "field_integer")]}
+    ]
+
+
+def insert_bench_data(session, count):
+    """
+        Bulk inserts count Model1, Model2 and ModelMMParent rows, Model2
+        rows relate to the first BENCH_GROUPS Model1 rows and
+        all parents have the same BENCH_MM_CHILDREN children
+    """
+    model1_collection = [
+        Model1(
+            field_string=f"bench{i}",
+            field_integer=i,
+            field_float=float(i),
+            field_date=datetime.date(2000 + i % 20, i % 12 + 1, i % 28 + 1),
+        )
+        for i in range(count)
+    ]
+    session.add_all(model1_collection)
+    session.add_all(
+        Model2(
+            field_string=f"bench{i}",
+            field_integer=i,
+            field_float=float(i),
+            field_date=datetime.date(2000 + i % 20, i % 12 + 1, i % 28 + 1),
+            group=model1_collection[i % BENCH_GROUPS],
+        )
+        for i in range(count)
+    )
+    children = [
+        ModelMMChild(field_string=f"bench{i}", field_integer=i)
+        for i in range(BENCH_MM_CHILDREN)
+    ]
+    session.add_all(
+        ModelMMParent(field_string=f"bench{i}", children=children)
+        for i in range(count)
+    )
+    session.commit()
+
+
+@contextmanager
+def user_request_context(app, username):
+    """
+        Request context with username logged in
+    """
+    with app.test_request_context():
+        user = app.appbuilder.sm.find_user(username=username)
+        login_user(user)
+        g.user = user
+        yield user
+
+
+def count_queries(func, *args, **kwargs):
+    """
+        Calls func once inside the current request context
+        and returns the number of SQL statements it issued
+    """
+    g._fab_query_stats = QueryStats()
+    try:
+        func(*args, **kwargs)
+        return get_query_stats().count
+    finally:
+        del g._fab_query_stats
+
+
+def response_query_count(response):
+    return int(response.headers["X-FAB-Query-Count"])
@@ -0,0 +1,56 @@
+"""
+    ModelRestApi hot paths, query counts must not grow with data size
+"""
+from .base import BENCH_SIZE, response_query_count
+
+MAX_PAGE_SIZE = 100
+
+QUERY_COUNT_GET_ITEM_MANY_TO_MANY = 7
+QUERY_COUNT_GET_ITEM_RELATED = 8
+QUERY_COUNT_GET_LIST = 7
+QUERY_COUNT_GET_LIST_SELECT_COLUMNS = 7
+QUERY_COUNT_INFO = 14
+QUERY_COUNT_OPENAPI = 7
+
+
+def test_get_list(benchmark, api_get):
+    rv = benchmark(api_get, f"/api/v1/model2api/?q=(page_size:{MAX_PAGE_SIZE})")
+    assert len(rv.json["result"]) == min(MAX_PAGE_SIZE, BENCH_SIZE)
+    assert response_query_count(rv) <= QUERY_COUNT_GET_LIST
+    # Same count for one row, no query per row
+    rv_one = api_get("/api/v1/model2api/?q=(page_size:1)")
+    assert response_query_count(rv_one) == response_query_count(rv)
+
+
+def test_get_list_select_columns(benchmark, api_get):
+    rv = benchmark(
+        api_get,
+        "/api/v1/model2api/?q=(columns:!(field_string,field_integer),"
+        f"page_size:{MAX_PAGE_SIZE})",
+    )
+    assert len(rv.json["result"]) == min(MAX_PAGE_SIZE, BENCH_SIZE)
+    assert response_query_count(rv) <= QUERY_COUNT_GET_LIST_SELECT_COLUMNS
+
+
+def test_get_item_related(benchmark, api_get):
+    rv = benchmark(api_get, "/api/v1/model2api/1")
+    assert rv.json["result"]["group"]
+    assert response_query_count(rv) <= QUERY_COUNT_GET_ITEM_RELATED
+
+
+def test_get_item_many_to_many(benchmark, api_get):
+    rv = benchmark(api_get, "/api/v1/modelmmparentapi/1")
+    assert rv.json["result"]["children"]
+    assert response_query_count(rv) <= QUERY_COUNT_GET_ITEM_MANY_TO_MANY
+
+
+def test_info(benchmark, api_get):
+    rv = benchmark(api_get, "/api/v1/model2api/_info")
+    assert rv.json["add_columns"]
+    assert response_query_count(rv) <= QUERY_COUNT_INFO
+
+
+def test_openapi_spec(benchmark, api_get):
+    rv = benchmark(api_get, "/api/v1/_openapi")
+    assert "/model2api/" in rv.json["paths"]
+    assert response_query_count(rv) <= QUERY_COUNT_OPENAPI
@@ -0,0 +1,33 @@
+"""
+    Authorization and menu hot paths
+"""
+from flask_appbuilder.const import PERMISSION_PREFIX
+
+from .base import count_queries, user_request_context, USERNAME_DB_ROLE
+from ..const import USERNAME_ADMIN, USERNAME_READONLY
+
+QUERY_COUNT_HAS_ACCESS_BUILTIN_ROLE = 1
+QUERY_COUNT_HAS_ACCESS_DB_ROLE = 2
+QUERY_COUNT_MENU = 2
+
+
+def test_has_access_builtin_role(benchmark, app, appbuilder):
+    has_access = appbuilder.sm.has_access
+    with user_request_context(app, USERNAME_READONLY):
+        queries = count_queries(has_access, PERMISSION_PREFIX + "get", "Model2Api")
+        assert queries <= QUERY_COUNT_HAS_ACCESS_BUILTIN_ROLE
+        assert benchmark(has_access, PERMISSION_PREFIX + "get", "Model2Api")
+
+
+def test_has_access_db_role(benchmark, app, appbuilder):
+    has_access = appbuilder.sm.has_access
+    with user_request_context(app, USERNAME_DB_ROLE):
+        queries = count_queries(has_access, PERMISSION_PREFIX + "get", "Model2Api")
+        assert queries <= QUERY_COUNT_HAS_ACCESS_DB_ROLE
+        assert benchmark(has_access, PERMISSION_PREFIX + "get", "Model2Api")
+
+
+def test_menu_data(benchmark, app, appbuilder):
+    with user_request_context(app, USERNAME_ADMIN):
+        assert count_queries(appbuilder.menu.get_data) <= QUERY_COUNT_MENU
+        assert benchmark(appbuilder.menu.get_data)
@@ -0,0 +1,62 @@
+"""
+    Chart aggregation and form construction hot paths
+"""
+from flask_appbuilder.fieldwidgets import Select2Widget
+from flask_appbuilder.forms import GeneralModelConverter
+from flask_appbuilder.models.group import ColumnarGroupByProcessData
+import pytest
+
+from .base import (
+    BENCH_SIZE,
+    count_queries,
+    Model2ChartView,
+    Model2View,
+    user_request_context,
+)
+from ..const import USERNAME_ADMIN
+
+QUERY_COUNT_FORM_REFRESH = 0
+
+
+@pytest.fixture(scope="module")
+def model2_items(app):
+    with app.app_context():
+        count, items = Model2ChartView.datamodel.query()
+        assert count == BENCH_SIZE
+        yield items
+
+
+@pytest.mark.parametrize("process_class", ["GroupByProcessData", "Columnar"])
+def test_chart_aggregation(benchmark, appbuilder, model2_items, process_class):
+    view = appbuilder.find_view(Model2ChartView)
+    definition = view.definitions[0]
+    group = view.get_group_by_class(definition)
+    if process_class == "Columnar":
+        group = ColumnarGroupByProcessData(
+            group.group_bys_cols, group.aggr_by_cols, group.formatter_by_cols
+        )
+    result = benchmark(group.apply, model2_items, sort=False)
+    assert sum(row[1] for row in result) == BENCH_SIZE
+
+
+def test_form_construction(benchmark, appbuilder):
+    view = appbuilder.find_view(Model2View)
+    conv = GeneralModelConverter(view.datamodel)
+    form = benchmark(
+        conv.create_form,
+        view.label_columns,
+        view.add_columns,
+        view.description_columns,
+        view.validators_columns,
+        view.add_form_extra_fields,
+        view.add_form_query_rel_fields,
+    )
+    assert isinstance(form.group.kwargs["widget"], Select2Widget)
+
+
+def test_form_refresh(benchmark, app, appbuilder):
+    view = appbuilder.find_view(Model2View)
+    with user_request_context(app, USERNAME_ADMIN):
+        assert count_queries(view.add_form.refresh) <= QUERY_COUNT_FORM_REFRESH
+        form = benchmark(view.add_form.refresh)
+    assert form.group
@@ -0,0 +1,106 @@
+"""
+    Fixtures for the benchmark suite, needs pytest-benchmark, run it with:
+
+        $ pytest flask_appbuilder/tests/benchmarks/bench_*.py
+
+    Data size is set by FAB_BENCH_SIZE env var (default 1000). The database
+    is a SQLite file on a temporary dir, unless FAB_BENCH_DATABASE_URI is set.
+"""
+import os
+
+from flask import Flask
+from flask_appbuilder import AppBuilder, SQLA
+import pytest
+
+from .base import (
+    BENCH_SIZE,
+    insert_bench_data,
+    Model1Api,
+    Model2Api,
+    Model2ChartView,
+    Model2View,
+    ModelMMParentApi,
+    PASSWORD_DB_ROLE,
+    USERNAME_DB_ROLE,
+)
+from ..const import PASSWORD_ADMIN, PASSWORD_READONLY, USERNAME_ADMIN, USERNAME_READONLY
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    app = Flask(__name__)
+    app.config.from_object("flask_appbuilder.tests.config_api")
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+        "FAB_BENCH_DATABASE_URI"
+    ) or "sqlite:///" + str(tmp_path_factory.mktemp("bench") / "bench.db")
+    app.config["FAB_QUERY_METRICS"] = True
+    app.config["FAB_QUERY_METRICS_HEADER"] = True
+    app.config["FAB_CACHE_CLASS"] = None
+    db = SQLA(app)
+    appbuilder = AppBuilder(app, db.session)
+    appbuilder.add_api(Model1Api)
+    appbuilder.add_api(Model2Api)
+    appbuilder.add_api(ModelMMParentApi)
+    appbuilder.add_view(Model2View, "Model2", category="Bench")
+    appbuilder.add_view(Model2ChartView, "Model2Chart", category="Bench")
+
+    sm = appbuilder.sm
+    sm.add_user(
+        USERNAME_ADMIN,
+        "admin",
+        "user",
+        "admin@fab.org",
+        sm.find_role("Admin"),
+        PASSWORD_ADMIN,
+    )
+    sm.add_user(
+        USERNAME_READONLY,
+        "readonly",
+        "user",
+        "readonly@fab.org",
+        sm.find_role("ReadOnly"),
+        PASSWORD_READONLY,
+    )
+    db_role = sm.add_role("BenchDBRole")
+    for view_menu_name in ("Model1Api", "Model2Api", "ModelMMParentApi"):
+        for permission_name in ("can_get", "can_info"):
+            sm.add_permission_role(
+                db_role, sm.find_permission_view_menu(permission_name, view_menu_name)
+            )
+    sm.add_user(
+        USERNAME_DB_ROLE, "dbrole", "user", "dbrole@fab.org", db_role, PASSWORD_DB_ROLE
+    )
+    insert_bench_data(db.session, BENCH_SIZE)
+    yield app
+    db.session.remove()
+
+
+@pytest.fixture(scope="session")
+def appbuilder(app):
+    return app.appbuilder
+
+
+@pytest.fixture(scope="session")
+def admin_token(app):
+    rv = app.test_client().post(
+        "/api/v1/security/login",
+        json={"username": USERNAME_ADMIN, "password": PASSWORD_ADMIN, "provider": "db"},
+    )
+    return rv.json["access_token"]
+
+
+@pytest.fixture
+def api_get(app, admin_token):
+    """
+        Returns a function that GETs an uri with the admin JWT
+        and checks for a 200 response
+    """
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    def _get(uri):
+        rv = client.get(uri, headers=headers)
+        assert rv.status_code == 200, rv.data
+        return rv
+
+    return _get
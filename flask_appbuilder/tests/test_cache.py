@@ -0,0 +1,185 @@
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from flask_appbuilder.cache import FileSystemCache, RedisCache, SimpleCache
+from flask_appbuilder.charts.views import GroupByChartView
+from flask_appbuilder.models.group import aggregate_count
+from flask_appbuilder.models.sqla.filters import FilterEqualFunction
+from flask_appbuilder.models.sqla.interface import SQLAInterface
+
+from .base import FABTestCase
+from .const import PASSWORD_ADMIN, USERNAME_ADMIN
+from .sqla.models import Model1, Model2
+
+log = logging.getLogger(__name__)
+
+
+class FakeRedis(object):
+    """
+        Minimal in memory stand-in for a redis client
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match=None):
+        prefix = match.rstrip("*")
+        return [key for key in self.data if key.startswith(prefix)]
+
+
+class CacheBackendsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def get_caches(self):
+        return [
+            SimpleCache(),
+            FileSystemCache(cache_dir=self.cache_dir),
+            RedisCache(client=FakeRedis()),
+        ]
+
+    def test_get_set_delete(self):
+        for cache in self.get_caches():
+            self.assertIsNone(cache.get("key"))
+            cache.set("key", {"rows": [1, 2]})
+            self.assertEqual(cache.get("key"), {"rows": [1, 2]})
+            cache.delete("key")
+            self.assertIsNone(cache.get("key"))
+            cache.set("key", 1)
+            cache.clear()
+            self.assertIsNone(cache.get("key"))
+
+    def test_expire(self):
+        for cache in self.get_caches()[:2]:
+            cache.set("key", 1, timeout=10)
+            with mock.patch("flask_appbuilder.cache.time.time") as mock_time:
+                mock_time.return_value = 10 ** 11
+                self.assertIsNone(cache.get("key"))
+
+    def test_invalidate(self):
+        for cache in self.get_caches():
+            version = cache.get_version("Model2")
+            self.assertEqual(version, cache.get_version("Model2"))
+            cache.invalidate("Model2")
+            self.assertNotEqual(version, cache.get_version("Model2"))
+
+    def test_simple_cache_lru(self):
+        cache = SimpleCache(threshold=2)
+        cache.set("key1", 1)
+        cache.set("key2", 2)
+        cache.get("key1")
+        cache.set("key3", 3)
+        self.assertEqual(cache.get("key1"), 1)
+        self.assertIsNone(cache.get("key2"))
+
+    def test_filesystem_cache_threshold(self):
+        cache = FileSystemCache(cache_dir=self.cache_dir, threshold=2)
+        for i in range(5):
+            cache.set("key{}".format(i), i)
+        self.assertLessEqual(len(os.listdir(self.cache_dir)), 3)
+
+
+class ChartCacheTestCase(FABTestCase):
+    def setUp(self):
+        from flask import Flask
+        from flask_appbuilder import AppBuilder, SQLA
+
+        self.app = Flask(__name__)
+        self.app.config.from_object("flask_appbuilder.tests.config_api")
+        self.db = SQLA(self.app)
+        self.appbuilder = AppBuilder(self.app, self.db.session)
+
+        class Model2CachedChartView(GroupByChartView):
+            datamodel = SQLAInterface(Model2)
+            chart_title = "Test Model2 Cached Chart"
+            chart_cache_timeout = 60
+            definitions = [
+                {"group": "field_string", "series": [(aggregate_count, "id")]}
+            ]
+
+        self.view = self.appbuilder.add_view(Model2CachedChartView, "Model2 Cached")
+
+    def test_chart_cache(self):
+        """
+            Chart: Test chart data is cached and invalidated
+        """
+        client = self.app.test_client()
+        self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        datamodel = self.view.datamodel
+        with mock.patch.object(datamodel, "query", wraps=datamodel.query) as query:
+            rv = client.get("/model2cachedchartview/chart/")
+            self.assertEqual(rv.status_code, 200)
+            self.assertEqual(query.call_count, 1)
+            rv = client.get("/model2cachedchartview/chart/")
+            self.assertEqual(rv.status_code, 200)
+            self.assertEqual(query.call_count, 1)
+            # Different filters are cached on a different key
+            rv = client.get("/model2cachedchartview/chart/?_flt_0_field_string=test1")
+            self.assertEqual(rv.status_code, 200)
+            self.assertEqual(query.call_count, 2)
+            with self.app.app_context():
+                datamodel.invalidate_cache()
+            rv = client.get("/model2cachedchartview/chart/")
+            self.assertEqual(rv.status_code, 200)
+            self.assertEqual(query.call_count, 3)
+
+    def test_invalidate_cache_error(self):
+        """
+            Cache: Test cache backend errors don't fail committed changes
+        """
+        datamodel = SQLAInterface(Model1, self.appbuilder.get_session)
+        with self.app.app_context(), mock.patch.object(
+            self.appbuilder.cache, "invalidate", side_effect=ConnectionError
+        ):
+            item = Model1(field_string="invalidate_error")
+            self.assertTrue(datamodel.add(item))
+            self.assertTrue(datamodel.delete(item))
+            self.assertEqual(
+                datamodel.session.query(Model1)
+                .filter_by(field_string="invalidate_error")
+                .count(),
+                0,
+            )
+
+    def test_chart_cache_key(self):
+        """
+            Chart: Test chart cache keys identify filter models by pk
+        """
+
+        def get_key(group):
+            filters = self.view.datamodel.get_filters().add_filter(
+                "group", FilterEqualFunction, lambda: group
+            )
+            return self.view.get_chart_cache_key(filters, "definition")
+
+        # Same repr, different pk
+        group1 = Model1(id=1, field_string="same")
+        group2 = Model1(id=2, field_string="same")
+        with self.app.test_request_context():
+            self.assertEqual(get_key(group1), get_key(group1))
+            self.assertNotEqual(get_key(group1), get_key(group2))
+            # Views registered on another endpoint don't share keys
+            key = get_key(group1)
+            endpoint = self.view.endpoint
+            self.view.endpoint = "Model2OtherChartView"
+            try:
+                self.assertNotEqual(get_key(group1), key)
+            finally:
+                self.view.endpoint = endpoint
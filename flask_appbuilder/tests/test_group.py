@@ -0,0 +1,88 @@
+import unittest
+
+from flask_appbuilder.models import group
+from flask_appbuilder.models.group import (
+    aggregate,
+    aggregate_avg,
+    aggregate_count,
+    aggregate_sum,
+    ColumnarGroupByProcessData,
+    GroupByProcessData,
+)
+from nose.tools import eq_
+
+
+class Item(object):
+    def __init__(self, field_string, field_integer, field_float):
+        self.field_string = field_string
+        self.field_integer = field_integer
+        self.field_float = field_float
+
+    def field_method(self):
+        return self.field_string.upper()
+
+
+@aggregate("Max of")
+def aggregate_max(items, col):
+    return max(getattr(item, col) for item in items)
+
+
+class ColumnarGroupByTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data = [
+            Item("b", 1, 1.5),
+            Item("a", 2, 2.0),
+            Item("c", 3, 0.5),
+            Item("a", 4, 1.0),
+            Item("b", 5, 3.0),
+        ]
+        self.series = [
+            (aggregate_sum, "field_integer"),
+            (aggregate_avg, "field_float"),
+            (aggregate_count, "field_integer"),
+            (aggregate_max, "field_integer"),
+        ]
+
+    def assert_same_as_group_by(self, group_by_col, **kwargs):
+        expected = GroupByProcessData([group_by_col], self.series, {}).apply(
+            self.data, **kwargs
+        )
+        process_data = ColumnarGroupByProcessData([group_by_col], self.series, {})
+        eq_(expected, process_data.apply(self.data, **kwargs))
+        process_data.use_numpy = False
+        eq_(expected, process_data.apply(self.data, **kwargs))
+
+    def test_group_by_column(self):
+        self.assert_same_as_group_by("field_string")
+
+    def test_group_by_method(self):
+        self.assert_same_as_group_by("field_method")
+
+    def test_group_by_without_numpy(self):
+        has_numpy = group._has_numpy
+        group._has_numpy = False
+        try:
+            self.assert_same_as_group_by("field_string")
+        finally:
+            group._has_numpy = has_numpy
+
+    def test_group_by_unsorted(self):
+        process_data = ColumnarGroupByProcessData(
+            ["field_string"], [(aggregate_count, "field_integer")], {}
+        )
+        eq_(
+            [["b", 2], ["a", 2], ["c", 1]],
+            process_data.apply(self.data, sort=False),
+        )
+
+    def test_group_by_formatter(self):
+        process_data = ColumnarGroupByProcessData(
+            ["field_string"],
+            [(aggregate_sum, "field_integer")],
+            {"field_string": lambda value: value * 2},
+        )
+        eq_([["aa", 6], ["bb", 6], ["cc", 3]], process_data.apply(self.data))
+
+    def test_group_by_empty(self):
+        process_data = ColumnarGroupByProcessData(["field_string"], self.series, {})
+        eq_([], process_data.apply([]))
@@ -0,0 +1,80 @@
+import subprocess
+import sys
+import unittest
+
+import flask_appbuilder
+from flask_appbuilder import views
+
+# Loaded on first use only, by the features that need them
+DEFERRED_MODULES = (
+    "apispec",
+    "flask_openid",
+    "jsonschema",
+    "ldap",
+    "marshmallow_enum",
+    "marshmallow_sqlalchemy",
+    "numpy",
+    "PIL",
+    "yaml",
+)
+# Microseconds, "import flask_appbuilder" only loads the package __init__
+LIGHT_IMPORT_BUDGET = 200000
+
+
+def get_import_times(statement):
+    """
+        Runs statement on a new interpreter with -X importtime
+
+        :return: Dict with the imported module names has keys
+            and their cumulative import time (us) has values
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stderr
+    import_times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+class ImportTestCase(unittest.TestCase):
+    @unittest.skipIf(sys.version_info < (3, 7), "Needs -X importtime and PEP 562")
+    def test_light_import(self):
+        """
+            Import: Test importing the package loads nothing else
+        """
+        import_times = get_import_times("import flask_appbuilder")
+        self.assertLess(import_times["flask_appbuilder"], LIGHT_IMPORT_BUDGET)
+        self.assertEqual(
+            [name for name in import_times if name.startswith("flask")],
+            ["flask_appbuilder"],
+        )
+
+    @unittest.skipIf(sys.version_info < (3, 7), "Needs -X importtime")
+    def test_deferred_imports(self):
+        """
+            Import: Test optional dependencies are not loaded by views and APIs
+        """
+        import_times = get_import_times(
+            "from flask_appbuilder import AppBuilder, ModelRestApi, ModelView;"
+            "import flask_appbuilder.cli, flask_appbuilder.filemanager"
+        )
+        self.assertIn("flask_appbuilder.api", import_times)
+        for module_name in DEFERRED_MODULES:
+            self.assertNotIn(module_name, import_times)
+
+    def test_lazy_attributes(self):
+        """
+            Import: Test package attributes are imported on first access
+        """
+        self.assertIs(flask_appbuilder.ModelView, views.ModelView)
+        self.assertIn("AppBuilder", dir(flask_appbuilder))
+        with self.assertRaises(AttributeError):
+            flask_appbuilder.NotAView
@@ -120,3 +120,65 @@ class FlaskTestCase(FABTestCase):
         role = self.appbuilder.sm.find_role("Public")
         role.permissions = []
         self.appbuilder.get_session.commit()
+
+    def test_menu_api_cache_invalidation(self):
+        """
+            REST Api: Test cached menu data changes with role permissions
+        """
+        self.app.config["FAB_MENU_CACHE_TIMEOUT"] = 300
+        limited_user = "user1"
+        limited_password = "user1"
+        limited_role = "Limited"
+
+        role = self.appbuilder.sm.add_role(limited_role)
+        pvm = self.appbuilder.sm.find_permission_view_menu("can_get", "MenuApi")
+        self.appbuilder.sm.add_permission_role(role, pvm)
+        self.appbuilder.sm.add_user(
+            limited_user, "user1", "user1", "user1@fab.org", role, limited_password
+        )
+
+        uri = "/api/v1/menu/"
+        client = self.app.test_client()
+        token = self.login(client, limited_user, limited_password)
+        rv = self.auth_client_get(client, token, uri)
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotIn("Model1", rv.data.decode("utf-8"))
+
+        role = self.appbuilder.sm.find_role(limited_role)
+        pvm = self.appbuilder.sm.find_permission_view_menu("menu_access", "Model1")
+        self.appbuilder.sm.add_permission_role(role, pvm)
+        rv = self.auth_client_get(client, token, uri)
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn("Model1", rv.data.decode("utf-8"))
+
+        # Revert test data
+        self.appbuilder.get_session.delete(
+            self.appbuilder.sm.find_user(username=limited_user)
+        )
+        self.appbuilder.get_session.delete(self.appbuilder.sm.find_role(limited_role))
+        self.appbuilder.get_session.commit()
+
+    def test_menu_flat_name_list(self):
+        """
+            Menu: Test flat name list and find by name
+        """
+        from flask_appbuilder.menu import Menu
+
+        menu = Menu()
+        menu.add_link("Link1", category="Category1")
+        menu.add_separator("Category1")
+        menu.add_link("Link2", category="Category1")
+        menu.add_link("Link3", category="Category2")
+        menu.add_link("Link4")
+        self.assertEqual(
+            menu.get_flat_name_list(),
+            ["Category1", "Link1", "-", "Link2", "Category2", "Link3", "Link4"],
+        )
+        self.assertEqual(
+            menu.flat_names,
+            ["Category1", "Link1", "Link2", "Category2", "Link3", "Link4"],
+        )
+        self.assertEqual(menu.find("Link3").name, "Link3")
+        menu.add_link("Link5", category="Category2")
+        self.assertEqual(menu.find("Link5").name, "Link5")
+        self.assertIsNone(menu.find("Link6"))
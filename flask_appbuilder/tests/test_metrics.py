@@ -0,0 +1,90 @@
+import logging
+import os
+
+from flask_appbuilder import SQLA
+from flask_appbuilder.exceptions import QueryBudgetExceededFABException
+from flask_appbuilder.models.sqla.interface import SQLAInterface
+
+from .base import FABTestCase
+from .const import PASSWORD_ADMIN, USERNAME_ADMIN
+from .sqla.models import Model1
+
+log = logging.getLogger(__name__)
+
+
+class QueryMetricsTestCase(FABTestCase):
+    def setUp(self):
+        from flask import Flask
+        from flask_appbuilder import AppBuilder
+        from flask_appbuilder.views import ModelView
+
+        self.app = Flask(__name__)
+        self.basedir = os.path.abspath(os.path.dirname(__file__))
+        self.app.config.from_object("flask_appbuilder.tests.config_api")
+        self.app.config["FAB_QUERY_METRICS"] = True
+        self.app.config["FAB_QUERY_METRICS_HEADER"] = True
+
+        self.db = SQLA(self.app)
+        self.appbuilder = AppBuilder(self.app, self.db.session)
+
+        class Model1View(ModelView):
+            datamodel = SQLAInterface(Model1)
+
+        self.appbuilder.add_view(Model1View, "Model1")
+
+    def tearDown(self):
+        self.appbuilder = None
+        self.app = None
+        self.db = None
+
+    def test_query_metrics_header(self):
+        """
+            Query metrics: Test response headers with query count
+        """
+        client = self.app.test_client()
+        self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        rv = client.get("/model1view/list/")
+        self.assertEqual(rv.status_code, 200)
+        self.assertGreater(int(rv.headers["X-FAB-Query-Count"]), 0)
+        self.assertIn("X-FAB-Query-Time", rv.headers)
+        self.assertEqual(rv.headers["X-FAB-Query-Rows-Affected"], "0")
+        rv = client.post("/model1view/add", data={"field_string": "metrics"})
+        self.assertEqual(rv.status_code, 302)
+        self.assertEqual(rv.headers["X-FAB-Query-Rows-Affected"], "1")
+
+        # Revert data changes
+        session = self.appbuilder.get_session
+        session.query(Model1).filter_by(field_string="metrics").delete()
+        session.commit()
+
+    def test_query_metrics_api(self):
+        """
+            Query metrics: Test metrics per endpoint API
+        """
+        client = self.app.test_client()
+        rv = client.get("/fab/metrics")
+        self.assertEqual(rv.status_code, 401)
+
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        self.auth_client_get(client, token, "/api/v1/menu/")
+        rv = self.auth_client_get(client, token, "/fab/metrics")
+        self.assertEqual(rv.status_code, 200)
+        metrics = rv.json["result"]["MenuApi.get_menu_data"]
+        self.assertEqual(metrics["requests"], 1)
+        self.assertGreater(metrics["queries"], 0)
+        self.assertEqual(metrics["max_queries"], metrics["queries"])
+
+    def test_query_budget(self):
+        """
+            Query metrics: Test query budget warning and exception
+        """
+        client = self.app.test_client()
+        self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        self.app.config["FAB_QUERY_BUDGET"] = 1
+        with self.assertLogs("flask_appbuilder.metrics", level="WARNING"):
+            client.get("/model1view/list/")
+
+        self.app.config["FAB_QUERY_BUDGET_RAISE"] = True
+        self.app.config["PROPAGATE_EXCEPTIONS"] = True
+        with self.assertRaises(QueryBudgetExceededFABException):
+            client.get("/model1view/list/")
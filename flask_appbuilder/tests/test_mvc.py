@@ -1,11 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
 import datetime
+import hashlib
+import io
 import json
 import logging
+import os
+import shutil
+import tempfile
+import threading
 from typing import Set
+import unittest
+import unittest.mock
+import uuid
 
-from flask import Flask, redirect, request, session
+from flask import Flask, g, redirect, request, session
 from flask_appbuilder import AppBuilder, SQLA
 from flask_appbuilder.actions import action
+from flask_appbuilder.api import ModelRestApi
 from flask_appbuilder.charts.views import (
     ChartView,
     DirectByChartView,
@@ -13,15 +24,44 @@ from flask_appbuilder.charts.views import (
     GroupByChartView,
     TimeChartView,
 )
+from flask_appbuilder.cli import compile_templates
+from flask_appbuilder.filemanager import FileManager, ImageManager, thumbgen_filename
+from flask_appbuilder.forms import DynamicForm
+from flask_appbuilder.metrics import get_query_stats, QueryStats
 from flask_appbuilder.models.generic import PSModel
 from flask_appbuilder.models.generic import PSSession
 from flask_appbuilder.models.generic.interface import GenericInterface
 from flask_appbuilder.models.group import aggregate_avg, aggregate_count, aggregate_sum
-from flask_appbuilder.models.sqla.filters import FilterEqual, FilterStartsWith
+from flask_appbuilder.models.mixins import FileColumn
+from flask_appbuilder.models.sqla.filters import (
+    FilterEqual,
+    FilterEqualFunction,
+    FilterStartsWith,
+)
 from flask_appbuilder.models.sqla.interface import SQLAInterface
-from flask_appbuilder.views import CompactCRUDMixin, MasterDetailView, ModelView
+from flask_appbuilder.storage import LocalStorage, S3Storage
+from flask_appbuilder.urltools import (
+    get_order_args,
+    get_page_args,
+    get_page_size_args,
+    get_url_args,
+)
+from flask_appbuilder.utils.base import json_stream
+from flask_appbuilder.views import (
+    CompactCRUDMixin,
+    MasterDetailView,
+    ModelView,
+    MultipleView,
+)
+from flask_appbuilder.widgets import CachedWidget
+from flask_babel import Babel
 from flask_wtf import CSRFProtect
 import jinja2
+import sqlalchemy as sa
+from sqlalchemy.ext.declarative import declarative_base
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import NotFound
+from wtforms import ValidationError
 
 from .base import FABTestCase
 from .const import (
@@ -39,11 +79,31 @@ from .sqla.models import (
     Model1,
     Model2,
     Model3,
+    Model4,
+    ModelMMChild,
+    ModelMMParent,
+    ModelOMChild,
+    ModelOMParent,
     ModelWithEnums,
     TmpEnum,
 )
 
 
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import boto3
+
+    try:
+        from moto import mock_aws
+    except ImportError:
+        from moto import mock_s3 as mock_aws
+except ImportError:
+    mock_aws = None
+
 logging.basicConfig(format="%(asctime)s:%(levelname)s:%(name)s:%(message)s")
 logging.getLogger().setLevel(logging.DEBUG)
 
@@ -104,6 +164,1210 @@ class MVCBabelTestCase(FABTestCase):
         self.assertEqual(rv.status_code, 302)
 
 
+class MVCBulkPermissionsTestCase(FABTestCase):
+    def test_bulk_update_perms(self):
+        """
+            MVC: Test permissions bulk sync on first request
+        """
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        # Own database, the sync creates permissions for every view
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        app.config["FAB_UPDATE_PERMS_BULK"] = True
+        db = SQLA(app)
+        appbuilder = AppBuilder(app, db.session)
+        self.create_admin_user(appbuilder, USERNAME_ADMIN, PASSWORD_ADMIN)
+
+        class Model1BulkView(ModelView):
+            datamodel = SQLAInterface(Model1)
+
+        appbuilder.add_view(Model1BulkView, "Model1Bulk", category="Bulk")
+        sm = appbuilder.sm
+        self.assertIsNone(sm.find_permission_view_menu("can_list", "Model1BulkView"))
+
+        client = app.test_client()
+        self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        role_admin = sm.find_role(sm.auth_role_admin)
+        expected = [("can_list", "Model1BulkView"), ("can_add", "Model1BulkView")]
+        expected += [("menu_access", "Model1Bulk"), ("menu_access", "Bulk")]
+        for permission_name, view_menu_name in expected:
+            pvm = sm.find_permission_view_menu(permission_name, view_menu_name)
+            self.assertIsNotNone(pvm)
+            self.assertIn(pvm, role_admin.permissions)
+        rv = client.get("/model1bulkview/list/")
+        self.assertEqual(rv.status_code, 200)
+        appbuilder.get_session.remove()
+
+
+class MVCSecurityConvergeTestCase(FABTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object("flask_appbuilder.tests.config_api")
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        self.db = SQLA(self.app)
+        self.appbuilder = AppBuilder(self.app, self.db.session)
+
+    def tearDown(self):
+        self.appbuilder.get_session.remove()
+
+    def get_role_permissions(self, role_name: str) -> Set:
+        role = self.appbuilder.sm.find_role(role_name)
+        return {(pvm.view_menu.name, pvm.permission.name) for pvm in role.permissions}
+
+    def test_security_converge_and_cleanup(self):
+        """
+            MVC: Test security converge and cleanup on roles
+        """
+        sm = self.appbuilder.sm
+
+        class Model1ConvergeView(ModelView):
+            datamodel = SQLAInterface(Model1)
+
+        old_view = self.appbuilder.add_view_no_menu(Model1ConvergeView)
+        role = sm.add_role("Converge")
+        for permission_name in ("can_list", "can_show", "can_add"):
+            sm.add_permission_role(
+                role,
+                sm.find_permission_view_menu(permission_name, "Model1ConvergeView"),
+            )
+        sm.add_permission_role(role, sm.add_permission_view_menu("can_x", "Orphan"))
+
+        class Model1ConvergedView(ModelView):
+            datamodel = SQLAInterface(Model1)
+            class_permission_name = "Model1Converged"
+            previous_class_permission_name = "Model1ConvergeView"
+            method_permission_name = {
+                "list": "read",
+                "show": "read",
+                "add": "write",
+                "edit": "write",
+                "delete": "write",
+                "download": "read",
+                "api_readvalues": "read",
+                "api_column_edit": "write",
+                "api_column_add": "write",
+                "api_delete": "write",
+                "api_update": "write",
+                "api_create": "write",
+                "api_get": "read",
+                "api_read": "read",
+                "api": "read",
+            }
+
+        self.appbuilder.baseviews.remove(old_view)
+        self.appbuilder.add_view_no_menu(Model1ConvergedView)
+        self.appbuilder.security_converge()
+        self.assertEqual(
+            self.get_role_permissions("Converge"),
+            {
+                ("Model1Converged", "can_read"),
+                ("Model1Converged", "can_write"),
+                ("Orphan", "can_x"),
+            },
+        )
+        self.assertIsNone(sm.find_view_menu("Model1ConvergeView"))
+
+        self.appbuilder.security_cleanup()
+        self.assertEqual(
+            self.get_role_permissions("Converge"),
+            {("Model1Converged", "can_read"), ("Model1Converged", "can_write")},
+        )
+        self.assertIsNone(sm.find_view_menu("Orphan"))
+        self.assertIsNone(sm.find_permission_view_menu("can_x", "Orphan"))
+
+
+class MVCRequestLocalFiltersTestCase(FABTestCase):
+    def test_request_local_filters(self):
+        """
+            MVC: Test each request gets its own filters
+        """
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        db = SQLA(app)
+        appbuilder = AppBuilder(app, db.session)
+
+        class Model1FiltersView(ModelView):
+            datamodel = SQLAInterface(Model1)
+
+        class Model1FiltersApi(ModelRestApi):
+            datamodel = SQLAInterface(Model1)
+
+        view = appbuilder.add_view(Model1FiltersView, "Model1Filters")
+        api = appbuilder.add_api(Model1FiltersApi)
+        for baseview in (view, api):
+            template = baseview._filters
+            with app.test_request_context("/?_flt_0_field_string=a"):
+                filters = baseview._filters
+                self.assertIsNot(filters, template)
+                self.assertIs(baseview._filters, filters)
+                self.assertIs(
+                    filters.get_search_filters(), template.get_search_filters()
+                )
+                filters.add_filter_index("field_string", 0, "a")
+                # Another request, flask pushes a new app context for each one
+                with app.app_context(), app.test_request_context("/"):
+                    self.assertEqual(baseview._filters.filters, [])
+                self.assertEqual(len(baseview._filters.filters), 1)
+            self.assertEqual(template.filters, [])
+
+        client = app.test_client()
+        self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        rv = client.get("/model1filtersview/list/?_flt_0_field_string=test1")
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(view._filters.filters, [])
+
+
+class MVCUrlArgsTestCase(FABTestCase):
+    def test_url_args(self):
+        """
+            MVC: Test page, page size, order and filter arguments parsing
+        """
+        app = Flask(__name__)
+        query_string = (
+            "page_Model1View=2&psize_Model1View=25&page_Model2View=x"
+            "&_oc_Model1View=field_string&_od_Model1View=desc"
+            "&_oc_Model2View=field_string&_od_Model2View=up"
+            "&_flt_0_field_string=a&_flt_12_field_integer=1&other=1"
+        )
+        with app.test_request_context(f"/?{query_string}"):
+            self.assertEqual(get_page_args(), {"Model1View": 2})
+            self.assertEqual(get_page_size_args(), {"Model1View": 25})
+            self.assertEqual(
+                get_order_args(), {"Model1View": ("field_string", "desc")}
+            )
+            self.assertIs(get_url_args(), get_url_args())
+            self.assertEqual(
+                get_url_args().filters,
+                [("field_string", 0, "a"), ("field_integer", 12, "1")],
+            )
+            with app.test_request_context("/?page_Model1View=3"):
+                self.assertEqual(get_page_args(), {"Model1View": 3})
+
+
+class MVCJsonStreamTestCase(FABTestCase):
+    def test_json_stream(self):
+        """
+            MVC: Test streamed JSON uses the app encoder and fails early
+        """
+        app = Flask(__name__)
+        value = uuid.uuid4()
+        with app.app_context():
+            ret = json_stream("result", iter([{"id": value}, {"id": 2}]), count=2)
+            self.assertEqual(
+                json.loads("".join(ret)),
+                {"count": 2, "result": [{"id": str(value)}, {"id": 2}]},
+            )
+            self.assertEqual(
+                json.loads("".join(json_stream("result", []))), {"result": []}
+            )
+            with self.assertRaises(TypeError):
+                json_stream("result", iter([{"id": object()}]))
+
+
+class MVCConcurrentViewsTestCase(FABTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object("flask_appbuilder.tests.config_api")
+        self.app.config["FAB_RELATED_VIEWS_WORKERS"] = 4
+        self.app.config["FAB_QUERY_METRICS"] = True
+        self.db = SQLA(self.app)
+        self.appbuilder = AppBuilder(self.app, self.db.session)
+
+    def test_map_concurrently(self):
+        """
+            MVC: Test map concurrently copies request context and flask.g
+        """
+        session = self.appbuilder.get_session
+
+        def get_context():
+            value = g.value
+            g.value = 2
+            session.query(Model1).count()
+            return threading.get_ident(), value, request.path
+
+        with self.app.test_request_context("/concurrent"):
+            g.value = 1
+            g._fab_query_stats = QueryStats()
+            results = self.appbuilder.map_concurrently([get_context, get_context])
+            self.assertEqual(g.value, 1)
+            self.assertEqual(get_query_stats().count, 2)
+        for thread_ident, value, path in results:
+            self.assertNotEqual(thread_ident, threading.get_ident())
+            self.assertEqual((value, path), (1, "/concurrent"))
+
+    def test_concurrent_related_views(self):
+        """
+            MVC: Test related views and multiple views fetched concurrently
+        """
+
+        class Model2ConcurrentView(ModelView):
+            datamodel = SQLAInterface(Model2)
+            list_columns = ["field_string", "group"]
+
+        class Model2ConcurrentOtherView(ModelView):
+            datamodel = SQLAInterface(Model2)
+            list_columns = ["field_integer"]
+
+        class Model1ConcurrentView(ModelView):
+            datamodel = SQLAInterface(Model1)
+            related_views = [Model2ConcurrentView, Model2ConcurrentOtherView]
+
+        class ConcurrentMultipleView(MultipleView):
+            views = [Model2ConcurrentView, Model1ConcurrentView]
+
+        self.appbuilder.add_view(Model2ConcurrentView, "Model2Concurrent")
+        self.appbuilder.add_view(Model2ConcurrentOtherView, "Model2ConcurrentOther")
+        self.appbuilder.add_view(Model1ConcurrentView, "Model1Concurrent")
+        self.appbuilder.add_view(ConcurrentMultipleView, "ConcurrentMultiple")
+
+        session = self.appbuilder.get_session
+        model1 = Model1(field_string="concurrent1")
+        session.add(model1)
+        session.add_all(
+            Model2(field_string=f"concurrent{i}", field_integer=i, group=model1)
+            for i in range(2)
+        )
+        session.commit()
+        pk = model1.id
+
+        client = self.app.test_client()
+        self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        rv = client.get(f"/model1concurrentview/show/{pk}")
+        self.assertEqual(rv.status_code, 200)
+        data = rv.data.decode("utf-8")
+        self.assertIn("concurrent0", data)
+        self.assertIn("Model2ConcurrentOtherView", data)
+        rv = client.get("/concurrentmultipleview/list/")
+        self.assertEqual(rv.status_code, 200)
+
+        # Revert test data
+        model1 = session.query(Model1).get(pk)
+        for model2 in session.query(Model2).filter_by(group=model1):
+            session.delete(model2)
+        session.delete(model1)
+        session.commit()
+
+
+class MVCListEagerLoadTestCase(FABTestCase):
+    def test_list_eager_load(self):
+        """
+            MVC: Test list relations are loaded with the list query
+        """
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db = SQLA(app)
+        appbuilder = AppBuilder(app, db.session)
+        db.create_all()
+
+        class Model4ListView(ModelView):
+            datamodel = SQLAInterface(Model4)
+            list_columns = ["field_string", "model1_1", "model1_2.field_string"]
+
+        class ModelMMParentListView(ModelView):
+            datamodel = SQLAInterface(ModelMMParent)
+            list_columns = ["field_string", "children"]
+
+        model4_view = appbuilder.add_view(Model4ListView, "Model4List")
+        parent_view = appbuilder.add_view(ModelMMParentListView, "ParentList")
+
+        session = db.session
+        children = [ModelMMChild(field_string=f"child{i}") for i in range(2)]
+        for i in range(10):
+            session.add(
+                Model4(
+                    field_string=f"model4_{i}",
+                    model1_1=Model1(field_string=f"model1_1_{i}"),
+                    model1_2=Model1(field_string=f"model1_2_{i}"),
+                )
+            )
+            session.add(ModelMMParent(field_string=f"parent{i}", children=children))
+        session.commit()
+        session.remove()
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa.event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            with app.test_request_context():
+                for view, query_count in ((model4_view, 2), (parent_view, 3)):
+                    statements.clear()
+                    widgets = view._get_list_widget(filters=view._filters)
+                    self.assertEqual(len(statements), query_count)
+                    self.assertEqual(widgets["list"].template_args["count"], 10)
+                    session.remove()
+            value_columns = widgets["list"].template_args["value_columns"]
+            self.assertEqual(len(value_columns[0]["children"]), 2)
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+    def test_list_eager_load_dotted(self):
+        """
+            MVC: Test every relation on a dotted column path is loaded
+        """
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db = SQLA(app)
+        db.create_all()
+        session = db.session
+        for i in range(5):
+            parent = ModelOMParent(field_string=f"parent{i}")
+            parent.children = [
+                ModelOMChild(field_string=f"child{i}_{j}") for j in range(2)
+            ]
+            session.add(parent)
+        session.commit()
+        session.remove()
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa.event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            datamodel = SQLAInterface(ModelOMChild, session)
+            count, children = datamodel.query(
+                load_columns=["field_string", "parent.children"]
+            )
+            for child in children:
+                self.assertEqual(len(child.parent.children), 2)
+            self.assertEqual(count, 10)
+            # count, children joined with their parent, the parents' children
+            self.assertEqual(len(statements), 3)
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+            session.remove()
+
+    def test_list_custom_interface(self):
+        """
+            MVC: Test list load_columns are only passed to interfaces that support it
+        """
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db = SQLA(app)
+        appbuilder = AppBuilder(app, db.session)
+        db.create_all()
+
+        class CustomInterface(SQLAInterface):
+            supports_load_columns = False
+
+            def query(
+                self,
+                filters=None,
+                order_column="",
+                order_direction="",
+                page=None,
+                page_size=None,
+            ):
+                return super(CustomInterface, self).query(
+                    filters, order_column, order_direction, page, page_size
+                )
+
+        class Model1CustomListView(ModelView):
+            datamodel = CustomInterface(Model1)
+            list_columns = ["field_string"]
+
+        view = appbuilder.add_view(Model1CustomListView, "Model1CustomList")
+        db.session.add(Model1(field_string="custom"))
+        db.session.commit()
+        with app.test_request_context():
+            widgets = view._get_list_widget(filters=view._filters)
+        self.assertEqual(widgets["list"].template_args["count"], 1)
+
+
+class MVCRelatedChoicesTestCase(FABTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object("flask_appbuilder.tests.config_api")
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        self.app.config["FAB_RELATED_CHOICES_CACHE_TIMEOUT"] = 60
+        self.db = SQLA(self.app)
+        self.appbuilder = AppBuilder(self.app, self.db.session)
+        self.db.create_all()
+
+        class Model2ChoicesView(ModelView):
+            datamodel = SQLAInterface(Model2)
+
+        self.view = self.appbuilder.add_view(Model2ChoicesView, "Model2Choices")
+        session = self.db.session
+        session.add_all(Model1(field_string=f"choice{i}") for i in range(5))
+        session.commit()
+
+    def tearDown(self):
+        self.db.session.remove()
+
+    def test_related_choices_cache(self):
+        """
+            MVC: Test related field options are cached until the model changes
+        """
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa.event.listen(self.db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            with self.app.test_request_context():
+                self.assertIn("choice4", self.view.add_form().group())
+                statements.clear()
+                self.assertIn("choice4", self.view.add_form().group())
+                self.assertEqual(statements, [])
+                datamodel = self.view.datamodel.get_related_interface("group")
+                datamodel.add(Model1(field_string="choice5"))
+                self.assertIn("choice5", self.view.add_form().group())
+        finally:
+            sa.event.remove(
+                self.db.engine, "before_cursor_execute", before_cursor_execute
+            )
+
+    def test_search_form_cache(self):
+        """
+            MVC: Test rendered search form fields are cached until related data changes
+        """
+        self.app.config["FAB_SEARCH_FORM_CACHE_TIMEOUT"] = 60
+        search_form = self.view.search_form
+        with unittest.mock.patch.object(
+            search_form, "refresh", wraps=search_form.refresh
+        ) as refresh:
+            with self.app.test_request_context():
+                label_columns, form_fields = self.view._get_search_form_fields()
+                self.assertEqual(label_columns["group"], "Group")
+                self.assertIn("choice4", form_fields["group"])
+                self.assertEqual(
+                    self.view._get_search_form_fields(), (label_columns, form_fields)
+                )
+                self.assertEqual(refresh.call_count, 1)
+
+                datamodel = self.view.datamodel.get_related_interface("group")
+                datamodel.add(Model1(field_string="choice5"))
+                _, form_fields = self.view._get_search_form_fields()
+                self.assertIn("choice5", form_fields["group"])
+                self.assertEqual(refresh.call_count, 2)
+
+    def test_widget_cache(self):
+        """
+            MVC: Test rendered list widgets are cached until the model changes
+        """
+        self.view.widget_cache_timeout = 60
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa.event.listen(self.db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            with self.app.test_request_context("/model2choicesview/list/"):
+                widget = self.view._get_list_widget(filters=self.view._filters)["list"]
+                self.assertIsInstance(widget, CachedWidget)
+                html = widget()
+                self.assertIn("<strong>Record Count:</strong> 0", html)
+                statements.clear()
+                widget = self.view._get_list_widget(filters=self.view._filters)["list"]
+                self.assertEqual(widget(), html)
+                self.assertEqual(statements, [])
+                self.view.datamodel.add(
+                    Model2(
+                        field_string="cached",
+                        group=self.db.session.query(Model1).first(),
+                    )
+                )
+                widget = self.view._get_list_widget(filters=self.view._filters)["list"]
+                self.assertIn("<strong>Record Count:</strong> 1", widget())
+            with self.app.test_request_context(
+                "/model2choicesview/list/?psize_Model2ChoicesView=1"
+            ):
+                widget = self.view._get_list_widget(filters=self.view._filters)["list"]
+                self.assertNotEqual(widget(), html)
+        finally:
+            sa.event.remove(
+                self.db.engine, "before_cursor_execute", before_cursor_execute
+            )
+            self.view.widget_cache_timeout = None
+
+    def test_widget_cache_key(self):
+        """
+            MVC: Test widget cache keys identify filter models by pk and the user
+        """
+        cache = self.appbuilder.cache
+        sm = self.appbuilder.sm
+
+        def get_key(group, user_id, page=None):
+            filters = self.view.datamodel.get_filters().add_filter(
+                "group", FilterEqualFunction, lambda: group
+            )
+            user = unittest.mock.Mock(roles=[])
+            user.get_id.return_value = user_id
+            with unittest.mock.patch.object(
+                type(sm), "current_user", new_callable=unittest.mock.PropertyMock
+            ) as current_user:
+                current_user.return_value = user
+                return self.view._get_widget_cache_key(
+                    cache, "list", self.view.list_columns, filters, (page,)
+                )
+
+        # Same repr, different pk
+        group1 = Model1(id=1, field_string="same")
+        group2 = Model1(id=2, field_string="same")
+        with self.app.test_request_context("/model2choicesview/list/"):
+            self.assertEqual(get_key(group1, "1"), get_key(group1, "1"))
+            self.assertNotEqual(get_key(group1, "1"), get_key(group2, "1"))
+            self.assertNotEqual(get_key(group1, "1"), get_key(group1, "2"))
+            self.assertNotEqual(get_key(group1, "1"), get_key(group1, "1", page=1))
+
+    def test_cached_widget_csrf_token(self):
+        """
+            MVC: Test cached widgets render the current CSRF token
+        """
+        cache = self.appbuilder.cache
+        factory = unittest.mock.Mock(
+            return_value=lambda: '<input name="csrf_token" value="token1"/>'
+        )
+        with self.app.test_request_context():
+            with unittest.mock.patch.dict(
+                self.app.jinja_env.globals, {"csrf_token": lambda: "token1"}
+            ):
+                html = CachedWidget(factory, cache, "csrf", 60)()
+                self.assertIn('value="token1"', html)
+            with unittest.mock.patch.dict(
+                self.app.jinja_env.globals, {"csrf_token": lambda: "token2"}
+            ):
+                html = CachedWidget(factory, cache, "csrf", 60)()
+                self.assertIn('value="token2"', html)
+                self.assertEqual(factory.call_count, 1)
+
+    def test_related_choices_validation(self):
+        """
+            MVC: Test submitted related values are validated by pk
+        """
+
+        class ModelMMParentChoicesView(ModelView):
+            datamodel = SQLAInterface(ModelMMParent)
+
+        view = self.appbuilder.add_view(ModelMMParentChoicesView, "ParentChoices")
+        session = self.db.session
+        session.add_all(ModelMMChild(field_string=f"child{i}") for i in range(3))
+        session.commit()
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        data = {"field_string": "a", "field_integer": 1, "group": "3"}
+        with self.app.test_request_context(method="POST", data=data):
+            form = self.view.add_form.refresh()
+            sa.event.listen(
+                self.db.engine, "before_cursor_execute", before_cursor_execute
+            )
+            try:
+                self.assertTrue(form.validate())
+            finally:
+                sa.event.remove(
+                    self.db.engine, "before_cursor_execute", before_cursor_execute
+                )
+            self.assertEqual(form.group.data.field_string, "choice2")
+            self.assertIsNone(form.group._object_list)
+            # The other statements are field_string's unique validation
+            statements = [st for st in statements if "FROM model1" in st]
+            self.assertEqual(len(statements), 1)
+            self.assertIn(" IN ", statements[0])
+        for value in ("99", "x"):
+            data["group"] = value
+            with self.app.test_request_context(method="POST", data=data):
+                form = self.view.add_form.refresh()
+                self.assertFalse(form.validate())
+                self.assertIn("group", form.errors)
+
+        data = {"field_string": "a", "children": ["3", "1", "3"]}
+        with self.app.test_request_context(method="POST", data=data):
+            form = view.add_form.refresh()
+            self.assertTrue(form.validate())
+            self.assertEqual(
+                [child.field_string for child in form.children.data],
+                ["child2", "child0"],
+            )
+            self.assertIsNone(form.children._object_list)
+        for values in (["1", "99"], ["1", "x"]):
+            data["children"] = values
+            with self.app.test_request_context(method="POST", data=data):
+                form = view.add_form.refresh()
+                self.assertFalse(form.validate())
+                self.assertIn("children", form.errors)
+
+    def test_related_choices_ajax(self):
+        """
+            MVC: Test related fields switch to server side paging
+        """
+        self.app.config["FAB_RELATED_AJAX_THRESHOLD"] = 3
+        self.create_admin_user(self.appbuilder, USERNAME_ADMIN, PASSWORD_ADMIN)
+        client = self.app.test_client()
+        self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+
+        rv = client.get("/model2choicesview/add")
+        data = rv.data.decode("utf-8")
+        self.assertIn("my_select2_ajax_paged", data)
+        self.assertNotIn("choice4", data)
+
+        rv = client.get("/model2choicesview/related/add/group?page=0&psize=2")
+        self.assertEqual(
+            json.loads(rv.data.decode("utf-8")),
+            {
+                "results": [
+                    {"id": "1", "text": "choice0"},
+                    {"id": "2", "text": "choice1"},
+                ],
+                "more": True,
+            },
+        )
+        rv = client.get("/model2choicesview/related/edit/group?q=ice4")
+        self.assertEqual(
+            json.loads(rv.data.decode("utf-8")),
+            {"results": [{"id": "5", "text": "choice4"}], "more": False},
+        )
+        rv = client.get("/model2choicesview/related/add/field_string")
+        self.assertEqual(rv.status_code, 404)
+
+        rv = client.post(
+            "/model2choicesview/add",
+            data={"field_string": "ajax", "field_integer": 1, "group": "5"},
+        )
+        self.assertEqual(rv.status_code, 302)
+        model2 = self.db.session.query(Model2).filter_by(field_string="ajax").one()
+        self.assertEqual(model2.group.field_string, "choice4")
+        rv = client.get(f"/model2choicesview/edit/{model2.id}")
+        self.assertIn("choice4", rv.data.decode("utf-8"))
+
+        self.browser_logout(client)
+        rv = client.get("/model2choicesview/related/add/group")
+        self.assertEqual(rv.status_code, 401)
+
+
+class MVCFileManagerTestCase(FABTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        Babel(self.app)
+        self.upload_folder = tempfile.mkdtemp()
+        self.app.config["UPLOAD_FOLDER"] = self.upload_folder
+
+    def tearDown(self):
+        shutil.rmtree(self.upload_folder)
+
+    @staticmethod
+    def file_storage(content, filename="file.txt"):
+        return FileStorage(stream=io.BytesIO(content), filename=filename)
+
+    def test_save_file(self):
+        """
+            MVC: Test uploads are copied in chunks and size checked
+        """
+        with self.app.app_context():
+            fm = FileManager(buffer_size=4, max_file_size=10)
+            self.assertEqual(fm.save_file(self.file_storage(b"0123456789"), "a"), "a")
+            with open(os.path.join(self.upload_folder, "a"), "rb") as f:
+                self.assertEqual(f.read(), b"0123456789")
+
+            data = self.file_storage(b"0123456789X")
+            self.assertFalse(fm.is_file_size_allowed(data))
+            with self.assertRaises(ValidationError):
+                fm.save_file(data, "b")
+            self.assertEqual(os.listdir(self.upload_folder), ["a"])
+
+    def test_save_file_content_addressed(self):
+        """
+            MVC: Test content addressed uploads are saved once
+        """
+        self.app.config["FILE_CONTENT_ADDRESSED"] = True
+        with self.app.app_context():
+            fm = FileManager()
+            filename = fm.save_file(self.file_storage(b"content"), "a")
+            self.assertEqual(
+                filename, hashlib.sha256(b"content").hexdigest() + "_sep_file.txt"
+            )
+            self.assertEqual(fm.save_file(self.file_storage(b"content"), "b"), filename)
+            fm.delete_file(filename)
+            self.assertEqual(os.listdir(self.upload_folder), [filename])
+
+    def test_delete_file_content_addressed(self):
+        """
+            MVC: Test content addressed files are deleted with their last row
+        """
+        Base = declarative_base()
+
+        class Document(Base):
+            __tablename__ = "document"
+            id = sa.Column(sa.Integer, primary_key=True)
+            file = sa.Column(FileColumn)
+
+        engine = sa.create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session = sa.orm.sessionmaker(bind=engine)()
+        self.app.config["FILE_CONTENT_ADDRESSED"] = True
+        with self.app.test_request_context():
+            filename = FileManager().save_file(self.file_storage(b"content"), "a")
+            documents = [Document(file=filename) for i in range(2)]
+            session.add_all(documents)
+            session.commit()
+            datamodel = SQLAInterface(Document, session)
+            self.assertTrue(datamodel.delete(documents[0]))
+            self.assertEqual(os.listdir(self.upload_folder), [filename])
+            self.assertTrue(datamodel.delete(documents[1]))
+            self.assertEqual(os.listdir(self.upload_folder), [])
+        session.close()
+
+    @staticmethod
+    def image_storage(size=(400, 300)):
+        stream = io.BytesIO()
+        Image.new("RGB", size, (255, 0, 0)).save(stream, "JPEG")
+        stream.seek(0)
+        return FileStorage(stream=stream, filename="image.jpg")
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_save_image(self):
+        """
+            MVC: Test images are resized with their thumbnail
+        """
+        self.app.config["IMG_UPLOAD_FOLDER"] = self.upload_folder
+        self.app.config["IMG_UPLOAD_URL"] = "/static/uploads/"
+        with self.app.app_context():
+            im = ImageManager()
+            filename = im.save_file(
+                self.image_storage(), "image.jpg", (100, 100, False), (20, 20, True)
+            )
+            with Image.open(im.get_path(filename)) as image:
+                self.assertEqual(image.size, (100, 75))
+            with Image.open(im.get_path(thumbgen_filename(filename))) as image:
+                self.assertEqual(image.size, (20, 20))
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_save_image_background(self):
+        """
+            MVC: Test images are resized off request
+        """
+        self.app.config["IMG_UPLOAD_FOLDER"] = self.upload_folder
+        self.app.config["IMG_UPLOAD_URL"] = "/static/uploads/"
+        self.app.config["IMG_BACKGROUND_PROCESSING"] = True
+        self.app.config["IMG_PLACEHOLDER_URL"] = "/static/placeholder.png"
+        executor = ThreadPoolExecutor(max_workers=1)
+        lock = threading.Lock()
+        with self.app.app_context():
+            im = ImageManager(executor=executor)
+            with lock:
+                executor.submit(lock.acquire)
+                filename = im.save_file(
+                    self.image_storage(), "image.jpg", (100, 100, True), (20, 20, True)
+                )
+                with unittest.mock.patch.object(
+                    im.storage, "exists", side_effect=AssertionError
+                ):
+                    self.assertEqual(im.get_url(filename), "/static/placeholder.png")
+                    self.assertEqual(
+                        im.get_url_thumbnail(filename), "/static/placeholder.png"
+                    )
+            executor.shutdown(wait=True)
+            self.assertEqual(im.get_url(filename), "/static/uploads/" + filename)
+            self.assertEqual(
+                im.get_url_thumbnail(filename),
+                "/static/uploads/" + thumbgen_filename(filename),
+            )
+            with Image.open(im.get_path(filename)) as image:
+                self.assertEqual(image.size, (100, 100))
+            with Image.open(im.get_path(thumbgen_filename(filename))) as image:
+                self.assertEqual(image.size, (20, 20))
+            self.assertEqual(
+                sorted(os.listdir(self.upload_folder)),
+                sorted([filename, thumbgen_filename(filename)]),
+            )
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_save_image_background_error(self):
+        """
+            MVC: Test truncated images are kept when processing fails
+        """
+        self.app.config["IMG_UPLOAD_FOLDER"] = self.upload_folder
+        self.app.config["IMG_UPLOAD_URL"] = "/static/uploads/"
+        self.app.config["IMG_BACKGROUND_PROCESSING"] = True
+        data = self.image_storage().stream.getvalue()
+        data = data[: len(data) // 2]
+        upload = FileStorage(stream=io.BytesIO(data), filename="image.jpg")
+        executor = ThreadPoolExecutor(max_workers=1)
+        with self.app.app_context():
+            im = ImageManager(executor=executor)
+            filename = im.save_file(upload, "image.jpg", (100, 100, True))
+            executor.shutdown(wait=True)
+            self.assertEqual(os.listdir(self.upload_folder), [filename])
+            with open(im.get_path(filename), "rb") as f:
+                self.assertEqual(f.read(), data)
+
+    def test_send_file(self):
+        """
+            MVC: Test uploads are sent with range and conditional requests
+        """
+        with open(os.path.join(self.upload_folder, "a"), "wb") as f:
+            f.write(b"0123456789")
+        with self.app.test_request_context(headers={"Range": "bytes=2-5"}):
+            response = FileManager().send_file("a")
+            response.direct_passthrough = False
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response.get_data(), b"2345")
+            self.assertEqual(response.headers["Content-Range"], "bytes 2-5/10")
+            etag = response.headers["ETag"]
+            self.assertIsNotNone(response.last_modified)
+            response.close()
+        with self.app.test_request_context(headers={"If-None-Match": etag}):
+            self.assertEqual(FileManager().send_file("a").status_code, 304)
+        with self.app.test_request_context(
+            headers={"Range": "bytes=2-5", "If-Range": '"stale"'}
+        ):
+            response = FileManager().send_file("a")
+            response.direct_passthrough = False
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_data(), b"0123456789")
+            response.close()
+        with self.app.test_request_context():
+            with self.assertRaises(NotFound):
+                FileManager().send_file("../a")
+
+    def test_send_file_accel_redirect(self):
+        """
+            MVC: Test uploads are offloaded to the proxy with X-Accel-Redirect
+        """
+        self.app.config["FILE_ACCEL_REDIRECT_URL"] = "/protected/"
+        with open(os.path.join(self.upload_folder, "a b.txt"), "wb") as f:
+            f.write(b"0123456789")
+        with self.app.test_request_context():
+            response = FileManager().send_file(
+                "a b.txt", as_attachment=True, attachment_filename="b.txt"
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers["X-Accel-Redirect"], "/protected/a%20b.txt")
+            self.assertEqual(
+                response.headers["Content-Disposition"], "attachment; filename=b.txt"
+            )
+            self.assertEqual(response.mimetype, "text/plain")
+            self.assertEqual(response.get_data(), b"")
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_image_upload_view(self):
+        """
+            MVC: Test images are served with range requests by IMG_UPLOAD_VIEW
+        """
+        self.app.config.from_object("flask_appbuilder.tests.config_api")
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        self.app.config["IMG_UPLOAD_FOLDER"] = self.upload_folder
+        self.app.config["IMG_UPLOAD_URL"] = "/uploads/img/"
+        self.app.config["IMG_UPLOAD_VIEW"] = True
+        db = SQLA(self.app)
+        AppBuilder(self.app, db.session)
+        with open(os.path.join(self.upload_folder, "image.jpg"), "wb") as f:
+            f.write(b"0123456789")
+        client = self.app.test_client()
+        rv = client.get("/uploads/img/image.jpg", headers={"Range": "bytes=0-3"})
+        self.assertEqual(rv.status_code, 206)
+        self.assertEqual(rv.data, b"0123")
+        self.assertEqual(rv.mimetype, "image/jpeg")
+        rv = client.get("/uploads/img/missing.jpg")
+        self.assertEqual(rv.status_code, 404)
+
+    def test_delete_files(self):
+        """
+            MVC: Test files are deleted in one batch, off request with async delete
+        """
+
+        class BatchStorage(LocalStorage):
+            batches = []
+
+            def delete_many(self, names):
+                self.batches.append(list(names))
+                super(BatchStorage, self).delete_many(names)
+
+        storage = BatchStorage(self.upload_folder)
+        executor = ThreadPoolExecutor(max_workers=1)
+        with self.app.app_context():
+            fm = FileManager(
+                storage=storage, async_delete=True, delete_executor=executor
+            )
+            for name in ("a", "b"):
+                fm.save_file(self.file_storage(b"content"), name)
+            fm.delete_files(["a", "b"])
+            executor.shutdown(wait=True)
+        self.assertEqual(storage.batches, [["a", "b"]])
+        self.assertEqual(os.listdir(self.upload_folder), [])
+
+    def test_delete_files_error(self):
+        """
+            MVC: Test storage errors deleting files are logged, not raised
+        """
+        storage = LocalStorage(self.upload_folder)
+        with self.app.app_context():
+            fm = FileManager(storage=storage, content_addressed=False)
+            with unittest.mock.patch.object(
+                storage, "delete_many", side_effect=OSError
+            ), self.assertLogs("flask_appbuilder.filemanager", "ERROR"):
+                fm.delete_files(["a"])
+
+    @unittest.skipIf(mock_aws is None, "boto3 or moto are not installed")
+    def test_s3_storage(self):
+        """
+            MVC: Test uploads on an S3 storage are downloaded from presigned URLs
+        """
+        with mock_aws():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket="uploads")
+            storage = S3Storage("uploads", prefix="files/", client=client)
+            self.app.config["FILE_STORAGE"] = storage
+            self.app.config["FILE_CONTENT_ADDRESSED"] = True
+            with self.app.test_request_context():
+                fm = FileManager()
+                filename = fm.save_file(self.file_storage(b"content"), "a")
+                self.assertEqual(
+                    fm.save_file(self.file_storage(b"content"), "b"), filename
+                )
+                keys = [
+                    obj["Key"]
+                    for obj in client.list_objects(Bucket="uploads")["Contents"]
+                ]
+                self.assertEqual(keys, ["files/" + filename])
+                with storage.open(filename) as f:
+                    self.assertEqual(f.read(), b"content")
+
+                response = fm.send_file(
+                    filename, as_attachment=True, attachment_filename="file.txt"
+                )
+                self.assertEqual(response.status_code, 302)
+                self.assertIn("files/" + filename, response.location)
+                self.assertIn("response-content-disposition", response.location)
+
+                storage.delete_batch_size = 1
+                FileManager(content_addressed=False).delete_files([filename, "x"])
+                self.assertFalse(storage.exists(filename))
+
+
+class MVCTemplatesTestCase(FABTestCase):
+    def setUp(self):
+        self.bytecode_cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.bytecode_cache_dir)
+
+    def create_app(self):
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        app.config["FAB_TEMPLATE_BYTECODE_CACHE"] = self.bytecode_cache_dir
+        db = SQLA(app)
+        AppBuilder(app, db.session)
+        return app
+
+    def test_compile_templates(self):
+        """
+            MVC: Test templates are compiled once into the bytecode cache
+        """
+        app = self.create_app()
+        result = app.test_cli_runner().invoke(compile_templates)
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn(
+            f"Compiled {len(os.listdir(self.bytecode_cache_dir))} templates",
+            result.output,
+        )
+
+        app = self.create_app()
+        with unittest.mock.patch.object(
+            app.jinja_env, "compile", wraps=app.jinja_env.compile
+        ) as compile:
+            names = app.appbuilder.compile_templates()
+            self.assertIn("appbuilder/general/model/list.html", names)
+            compile.assert_not_called()
+
+
+class MVCViewRegistryTestCase(FABTestCase):
+    def test_view_registry(self):
+        """
+            MVC: Test views index and inner views resolution
+        """
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        db = SQLA(app)
+        appbuilder = AppBuilder(app, db.session)
+
+        class Model1RegistryView(ModelView):
+            datamodel = SQLAInterface(Model1)
+
+        class Model1RegistrySubView(Model1RegistryView):
+            pass
+
+        class Model2RegistryView(ModelView):
+            datamodel = SQLAInterface(Model2)
+            related_views = [Model1RegistryView]
+
+        class RegistryMultipleView(MultipleView):
+            views = [Model2RegistryView, Model1RegistryView]
+
+        appbuilder.add_view(Model1RegistrySubView, "Model1Sub")
+        model2_view = appbuilder.add_view(Model2RegistryView, "Model2")
+        multiple_view = appbuilder.add_view(RegistryMultipleView, "Multiple")
+        model1_view = appbuilder.add_view(Model1RegistryView, "Model1")
+        appbuilder.add_view(Model1RegistryView, "Model1Again")
+
+        self.assertIs(appbuilder.find_view(Model1RegistryView), model1_view)
+        self.assertIs(appbuilder.find_view("Model2RegistryView"), model2_view)
+        self.assertIsNone(appbuilder.find_view("Model3RegistryView"))
+        self.assertEqual(
+            [view.__class__ for view in model2_view.get_init_inner_views()],
+            [Model1RegistrySubView, Model1RegistryView],
+        )
+        self.assertEqual(
+            [view.__class__ for view in multiple_view.get_init_inner_views()],
+            [Model2RegistryView, Model1RegistrySubView, Model1RegistryView],
+        )
+        self.assertEqual(
+            len([view for view in appbuilder.baseviews if view is model1_view]), 1
+        )
+
+
+class MVCLazyViewsTestCase(FABTestCase):
+    def test_lazy_views(self):
+        """
+            MVC: Test forms and schemas are built on first use with FAB_LAZY_VIEWS
+        """
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        app.config["FAB_LAZY_VIEWS"] = True
+        db = SQLA(app)
+        appbuilder = AppBuilder(app, db.session)
+
+        class Model1LazyView(ModelView):
+            datamodel = SQLAInterface(Model1)
+
+        class Model1LazyApi(ModelRestApi):
+            datamodel = SQLAInterface(Model1)
+
+        view = appbuilder.add_view(Model1LazyView, "Model1Lazy")
+        api = appbuilder.add_api(Model1LazyApi)
+        for attr_name in ("search_form", "add_form", "edit_form"):
+            self.assertNotIn(attr_name, view.__dict__)
+        for attr_name in ("list_model_schema", "show_model_schema"):
+            self.assertNotIn(attr_name, api.__dict__)
+
+        client = app.test_client()
+        self.browser_login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        rv = client.get("/model1lazyview/add")
+        self.assertEqual(rv.status_code, 200)
+        self.assertTrue(hasattr(view.add_form, "field_string"))
+        self.assertIn("add_form", view.__dict__)
+
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        rv = self.auth_client_get(client, token, "/api/v1/model1lazyapi/")
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn("list_model_schema", api.__dict__)
+
+    def test_lazy_views_overridden(self):
+        """
+            MVC: Test views overriding all lazy forms still init them with FAB_LAZY_VIEWS
+        """
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        app.config["FAB_LAZY_VIEWS"] = True
+        db = SQLA(app)
+        appbuilder = AppBuilder(app, db.session)
+
+        class Model1OverriddenForm(DynamicForm):
+            pass
+
+        class Model1OverriddenView(ModelView):
+            datamodel = SQLAInterface(Model1)
+            search_form = Model1OverriddenForm
+            add_form = Model1OverriddenForm
+            edit_form = Model1OverriddenForm
+            forms_ready = False
+
+            def _init_forms(self):
+                super(Model1OverriddenView, self)._init_forms()
+                self.forms_ready = True
+
+        view = appbuilder.add_view(Model1OverriddenView, "Model1Overridden")
+        self.assertTrue(view.forms_ready)
+        self.assertIs(view.add_form, Model1OverriddenForm)
+
+    def test_eager_views(self):
+        """
+            MVC: Test forms and schemas are built at registration by default
+        """
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        db = SQLA(app)
+        appbuilder = AppBuilder(app, db.session)
+
+        class Model1EagerView(ModelView):
+            datamodel = SQLAInterface(Model1)
+
+        class Model1EagerApi(ModelRestApi):
+            datamodel = SQLAInterface(Model1)
+
+        view = appbuilder.add_view(Model1EagerView, "Model1Eager")
+        api = appbuilder.add_api(Model1EagerApi)
+        for attr_name in ("search_form", "add_form", "edit_form"):
+            self.assertIsNotNone(view.__dict__[attr_name])
+        for attr_name in (
+            "list_model_schema",
+            "add_model_schema",
+            "edit_model_schema",
+            "show_model_schema",
+        ):
+            self.assertIsNotNone(api.__dict__[attr_name])
+
+    def test_warmup(self):
+        """
+            MVC: Test warmup builds lazy forms, schemas and OpenAPI specs
+        """
+        app = Flask(__name__)
+        app.config.from_object("flask_appbuilder.tests.config_api")
+        app.config["FAB_LAZY_VIEWS"] = True
+        app.config["FAB_API_SWAGGER_UI"] = True
+        app.config["FAB_PREFORK_WARMUP"] = True
+        db = SQLA(app)
+        with unittest.mock.patch(
+            "os.register_at_fork", create=True
+        ) as register_at_fork:
+            appbuilder = AppBuilder(app, db.session)
+        register_at_fork.assert_called_once()
+        prefork_warmup = register_at_fork.call_args[1]["before"]
+
+        class Model1WarmupView(ModelView):
+            datamodel = SQLAInterface(Model1)
+
+        class Model1WarmupApi(ModelRestApi):
+            datamodel = SQLAInterface(Model1)
+
+        view = appbuilder.add_view(Model1WarmupView, "Model1Warmup")
+        api = appbuilder.add_api(Model1WarmupApi)
+        with unittest.mock.patch("gc.freeze", create=True) as freeze:
+            # Not on other processes, like a worker forking
+            with unittest.mock.patch("os.getpid", return_value=-1):
+                prefork_warmup()
+            freeze.assert_not_called()
+            prefork_warmup()
+            prefork_warmup()
+        freeze.assert_called_once_with()
+        for attr_name in ("search_form", "add_form", "edit_form"):
+            self.assertIsNotNone(view.__dict__[attr_name])
+        self.assertIsNotNone(api.__dict__["list_model_schema"])
+        openapi = appbuilder.find_view("OpenApi")
+        with app.test_request_context():
+            api_spec = openapi.get_api_spec("v1")
+        self.assertIn("/model1warmupapi/", api_spec["paths"])
+        self.assertIn(api_spec, openapi._api_specs.values())
+
+        client = app.test_client()
+        token = self.login(client, USERNAME_ADMIN, PASSWORD_ADMIN)
+        rv = self.auth_client_get(client, token, "/api/v1/_openapi")
+        self.assertEqual(json.loads(rv.data), api_spec)
+
+
 class BaseMVCTestCase(FABTestCase):
     def setUp(self):
         self.app = Flask(__name__)
@@ -289,6 +1553,8 @@ class MVCSwitchRouteMethodsTestCase(BaseMVCTestCase):
             "Model2ExcludeView.delete",
             "Model2ExcludeView.add",
             "Model2ExcludeView.action_post",
+            "Model2ExcludeView.add_related_options",
+            "Model2ExcludeView.edit_related_options",
         }
         self.assertEqual(
             expected_endpoints, self.get_registered_view_endpoints("Model2ExcludeView")
@@ -332,6 +1598,8 @@ class MVCSwitchRouteMethodsTestCase(BaseMVCTestCase):
             "Model2DisableMVCApiView.action",
             "Model2DisableMVCApiView.download",
             "Model2DisableMVCApiView.action_post",
+            "Model2DisableMVCApiView.add_related_options",
+            "Model2DisableMVCApiView.edit_related_options",
         }
         self.assertEqual(
             expected_endpoints,
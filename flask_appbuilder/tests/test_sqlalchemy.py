@@ -1,9 +1,12 @@
+import datetime
 import unittest
 
-from flask_appbuilder.models.sqla.interface import _is_sqla_type
+from flask_appbuilder.models.sqla.interface import _is_sqla_type, SQLAInterface
 from nose.tools import eq_
 import sqlalchemy as sa
 
+from .sqla.models import Model1, Model2, ModelWithEnums, TmpEnum
+
 
 class CustomSqlaType(sa.types.TypeDecorator):
     impl = sa.types.DateTime(timezone=True)
@@ -22,3 +25,38 @@ class FlaskTestCase(unittest.TestCase):
         eq_(True, _is_sqla_type(t1, sa.types.DateTime))
         eq_(True, _is_sqla_type(t2, sa.types.DateTime))
         eq_(False, _is_sqla_type(t3, sa.types.DateTime))
+
+    def test_get_values(self):
+        datamodel = SQLAInterface(Model2)
+        model1 = Model1(field_string="test1", field_integer=1)
+        item = Model2(
+            field_string="test2",
+            field_integer=2,
+            field_date=datetime.date(2020, 1, 1),
+            group=model1,
+        )
+        list_columns = [
+            "field_string",
+            "field_method",
+            "group",
+            "group.field_integer",
+            "group.full_concat",
+            "not_a_column",
+        ]
+        expected = {
+            col: datamodel._get_attr_value(item, col) for col in list_columns
+        }
+        eq_([expected], list(datamodel.get_values([item], list_columns)))
+        eq_(list(expected.values()), datamodel.get_values_item(item, list_columns))
+        eq_(
+            [{"field_string": "test2", "field_date": "2020-01-01"}],
+            datamodel.get_values_json([item], ["field_string", "field_date"]),
+        )
+
+    def test_get_values_enum(self):
+        datamodel = SQLAInterface(ModelWithEnums)
+        item = ModelWithEnums(enum1="e1", enum2=TmpEnum.e2)
+        eq_(
+            [{"enum1": "e1", "enum2": TmpEnum.e2.value}],
+            datamodel._get_values([item], ["enum1", "enum2"]),
+        )
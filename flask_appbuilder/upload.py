@@ -157,6 +157,12 @@ class FileUploadField(fields.TextField):
             and not self.filemanager.is_file_allowed(self.data.filename)
         ):
             raise ValidationError(gettext("Invalid file extension"))
+        if (
+            self.data
+            and isinstance(self.data, FileStorage)
+            and not self.filemanager.is_file_size_allowed(self.data)
+        ):
+            raise ValidationError(gettext("File is too large"))
 
     def process(self, formdata, data=unset_value):
         if formdata:
@@ -210,6 +216,12 @@ class ImageUploadField(fields.StringField):
             and not self.imagemanager.is_file_allowed(self.data.filename)
         ):
             raise ValidationError(gettext("Invalid file extension"))
+        if (
+            self.data
+            and isinstance(self.data, FileStorage)
+            and not self.imagemanager.is_file_size_allowed(self.data)
+        ):
+            raise ValidationError(gettext("File is too large"))
 
     def process(self, formdata, data=unset_value):
         if formdata:
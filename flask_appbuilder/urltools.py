@@ -1,6 +1,6 @@
 import re
 
-from flask import request
+from flask import g, request
 
 
 class Stack(object):
@@ -41,6 +41,67 @@ def get_group_by_args():
     return group_by
 
 
+URL_ARG_RE = re.compile(r"(page|psize|_oc|_od)_(.*)|_flt_(\d+)_(.*)")
+""" Matches page_, psize_, _oc_, _od_ and _flt_<INDEX>_ arguments """
+
+
+class UrlArgs(object):
+    """
+        Page, page size, order and filter arguments for all views
+        on the request, parsed in a single pass over the arguments
+    """
+
+    __slots__ = ("pages", "page_sizes", "orders", "filters")
+
+    def __init__(self, args):
+        self.pages = {}
+        self.page_sizes = {}
+        self.orders = {}
+        self.filters = []
+        order_directions = {}
+        order_columns = {}
+        for arg in args:
+            re_match = URL_ARG_RE.match(arg)
+            if not re_match:
+                continue
+            prefix, view_name, filter_index, column_name = re_match.groups()
+            value = args.get(arg)
+            if prefix == "page":
+                self._set_int(self.pages, view_name, value)
+            elif prefix == "psize":
+                self._set_int(self.page_sizes, view_name, value)
+            elif prefix == "_oc":
+                order_columns[view_name] = value
+            elif prefix == "_od":
+                order_directions[view_name] = value
+            else:
+                self.filters.append((column_name, int(filter_index), value))
+        for view_name, order_column in order_columns.items():
+            order_direction = order_directions.get(view_name)
+            if order_direction in ("asc", "desc"):
+                self.orders[view_name] = (order_column, order_direction)
+
+    @staticmethod
+    def _set_int(values, view_name, value):
+        try:
+            values[view_name] = int(value)
+        except ValueError:
+            pass
+
+
+def get_url_args():
+    """
+        Returns the UrlArgs for the current request,
+        they are parsed once per request
+    """
+    url_args = g.get("_fab_url_args")
+    current_request = request._get_current_object()
+    if url_args is None or url_args[0] is not current_request:
+        url_args = (current_request, UrlArgs(request.args))
+        g._fab_url_args = url_args
+    return url_args[1]
+
+
 def get_page_args():
     """
         Get page arguments, returns a dictionary
@@ -49,12 +110,7 @@ def get_page_args():
         Arguments are passed: page_<VIEW_NAME>=<PAGE_NUMBER>
 
     """
-    pages = {}
-    for arg in request.args:
-        re_match = re.findall("page_(.*)", arg)
-        if re_match:
-            pages[re_match[0]] = int(request.args.get(arg))
-    return pages
+    return dict(get_url_args().pages)
 
 
 def get_page_size_args():
@@ -65,12 +121,7 @@ def get_page_size_args():
         Arguments are passed: psize_<VIEW_NAME>=<PAGE_SIZE>
 
     """
-    page_sizes = {}
-    for arg in request.args:
-        re_match = re.findall("psize_(.*)", arg)
-        if re_match:
-            page_sizes[re_match[0]] = int(request.args.get(arg))
-    return page_sizes
+    return dict(get_url_args().page_sizes)
 
 
 def get_order_args():
@@ -81,21 +132,16 @@ def get_order_args():
         Arguments are passed like: _oc_<VIEW_NAME>=<COL_NAME>&_od_<VIEW_NAME>='asc'|'desc'
 
     """
-    orders = {}
-    for arg in request.args:
-        re_match = re.findall("_oc_(.*)", arg)
-        if re_match:
-            order_direction = request.args.get("_od_" + re_match[0])
-            if order_direction in ("asc", "desc"):
-                orders[re_match[0]] = (request.args.get(arg), order_direction)
-    return orders
+    return dict(get_url_args().orders)
 
 
 def get_filter_args(filters):
+    """
+        Clears filters and adds the filters on the request
+
+        Arguments are passed like: _flt_<FILTER_INDEX>_<COL_NAME>=<VALUE>
+
+    """
     filters.clear_filters()
-    for arg in request.args:
-        re_match = re.findall("_flt_(\d)_(.*)", arg)
-        if re_match:
-            filters.add_filter_index(
-                re_match[0][1], int(re_match[0][0]), request.args.get(arg)
-            )
+    for column_name, filter_index, value in get_url_args().filters:
+        filters.add_filter_index(column_name, filter_index, value)
@@ -1,3 +1,11 @@
+import functools
+import itertools
+import threading
+from typing import Any, FrozenSet, Iterable, Iterator, List, Optional
+
+from flask import g, has_request_context, json
+
+
 def get_column_root_relation(column: str) -> str:
     if "." in column:
         return column.split(".")[0]
@@ -12,3 +20,164 @@ def get_column_leaf(column: str) -> str:
 
 def is_column_dotted(column: str) -> bool:
     return "." in column
+
+
+def json_stream(rows_key: str, rows: Iterable, **kwargs) -> Iterator[str]:
+    """
+        Returns a JSON object in chunks, use it with flask's
+        stream_with_context to stream large results.
+        kwargs are serialized first, then rows_key holds the list of rows,
+        each row is serialized when it's consumed from rows. Values are
+        serialized with the app's JSON encoder, kwargs and the first row
+        are serialized on call so their errors are raised before the
+        response starts.
+
+    :param rows_key: The key for the list of rows
+    :param rows: An iterable of JSON serializable rows
+    :param kwargs: Other JSON serializable keys and values
+    """
+    head = ["{"]
+    for key, value in kwargs.items():
+        head.append("{}: {}, ".format(json.dumps(key), json.dumps(value)))
+    head.append(json.dumps(rows_key) + ": [")
+    rows = iter(rows)
+    for row in rows:
+        head.append(json.dumps(row))
+        return itertools.chain(head, _json_stream_rows(rows))
+    head.append("]}")
+    return iter(head)
+
+
+def _json_stream_rows(rows: Iterator) -> Iterator[str]:
+    for row in rows:
+        yield ", " + json.dumps(row)
+    yield "]}"
+
+
+class LazyViewAttribute(object):
+    """
+        A view attribute that is built on first access by calling the
+        view's init_method, the result is kept on the instance so later
+        reads don't go through the descriptor. Overriding the attribute
+        on a subclass disables the lazy build for it.
+
+        Reads made while init_method is running return None, so init
+        methods can keep checking ``if not self.<attr>``.
+
+    :param init_method: The view method name that sets the attribute
+    """
+
+    _lock = threading.RLock()
+
+    def __init__(self, init_method: str) -> None:
+        self.init_method = init_method
+        self.name: Optional[str] = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return None
+        with self._lock:
+            # Another thread may have built it while we waited
+            if self.name not in obj.__dict__:
+                running = obj.__dict__.setdefault("_lazy_init_running", set())
+                if self.init_method in running:
+                    return None
+                running.add(self.init_method)
+                try:
+                    getattr(obj, self.init_method)()
+                finally:
+                    running.discard(self.init_method)
+                obj.__dict__.setdefault(self.name, None)
+            return obj.__dict__[self.name]
+
+
+class RequestLocalAttribute(object):
+    """
+        A view attribute that holds a template object, reads made on a
+        request context return a copy of it local to the request, made
+        by the template's clone method. Use it for view state that is
+        changed while handling a request, so concurrent requests on
+        threaded or greenlet workers don't share it.
+        Outside a request context reads return the template.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        obj.__dict__[self.name] = value
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return None
+        template = obj.__dict__.get(self.name)
+        if template is None or not has_request_context():
+            return template
+        request_locals = g.get("_fab_request_locals")
+        if request_locals is None:
+            request_locals = g._fab_request_locals = {}
+        key = (id(obj), self.name)
+        value = request_locals.get(key)
+        if value is None:
+            value = request_locals[key] = template.clone()
+        return value
+
+
+@functools.lru_cache(maxsize=None)
+def get_lazy_attribute_names(cls: type) -> FrozenSet[str]:
+    return frozenset(
+        name
+        for klass in cls.__mro__
+        for name, value in vars(klass).items()
+        if isinstance(value, LazyViewAttribute)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_overridden_init_methods(cls: type) -> FrozenSet[str]:
+    """
+        Init methods of lazy attributes that are all overridden on cls,
+        no attribute read calls them so they must run with the view
+    """
+    init_methods = set()
+    lazy_init_methods = set()
+    for name in get_lazy_attribute_names(cls):
+        # Definitions of name from cls to its bases
+        values = [vars(klass)[name] for klass in cls.__mro__ if name in vars(klass)]
+        init_methods.update(
+            value.init_method
+            for value in values
+            if isinstance(value, LazyViewAttribute)
+        )
+        if isinstance(values[0], LazyViewAttribute):
+            lazy_init_methods.add(values[0].init_method)
+    return frozenset(init_methods - lazy_init_methods)
+
+
+def get_view_attribute_names(obj: Any) -> List[str]:
+    """
+        Same as dir(obj) without the lazy attributes, use it when
+        looping over the view attributes to look for exposed methods
+    """
+    lazy_attributes = get_lazy_attribute_names(type(obj))
+    return [name for name in dir(obj) if name not in lazy_attributes]
+
+
+def init_lazy_attributes(obj: Any) -> None:
+    """
+        Builds all lazy attributes of a view now
+    """
+    for name in get_lazy_attribute_names(type(obj)):
+        getattr(obj, name)
+
+
+def init_overridden_attributes(obj: Any) -> None:
+    """
+        Calls the init methods of a view whose lazy attributes
+        are all overridden, they may set other state too
+    """
+    for init_method in sorted(get_overridden_init_methods(type(obj))):
+        getattr(obj, init_method)()
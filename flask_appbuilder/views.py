@@ -1,6 +1,6 @@
+from functools import partial
 import json
 import logging
-import os.path as op
 from typing import Set
 
 from flask import (
@@ -10,18 +10,24 @@ from flask import (
     make_response,
     redirect,
     request,
-    send_file,
+    Response,
     session,
+    stream_with_context,
     url_for,
 )
 
 from ._compat import as_unicode, string_types
 from .baseviews import BaseCRUDView, BaseFormView, BaseView, expose, expose_api
-from .const import FLAMSG_ERR_SEC_ACCESS_DENIED, PERMISSION_PREFIX
-from .filemanager import uuid_originalname
+from .const import (
+    FLAMSG_ERR_SEC_ACCESS_DENIED,
+    LOGMSG_ERR_SEC_ACCESS_DENIED,
+    PERMISSION_PREFIX,
+)
+from .filemanager import FileManager, ImageManager, uuid_originalname
 from .security.decorators import has_access, has_access_api, permission_name
 from .urltools import get_filter_args, get_order_args, get_page_args, get_page_size_args
-from .widgets import GroupFormListWidget, ListMasterWidget
+from .utils.base import json_stream
+from .widgets import GroupFormListWidget, ListMasterWidget, render_widget
 
 log = logging.getLogger(__name__)
 
@@ -55,6 +61,21 @@ class UtilView(BaseView):
         return redirect(self.get_redirect())
 
 
+class ImageUploadView(BaseView):
+    """
+        Serves IMG_UPLOAD_FOLDER with range and conditional requests,
+        registered when IMG_UPLOAD_VIEW is set. Set IMG_UPLOAD_URL
+        to /uploads/img/ so ImageManager.get_url points here
+    """
+
+    route_base = "/uploads/img"
+    default_view = "img"
+
+    @expose("/<string:filename>")
+    def img(self, filename):
+        return ImageManager().send_file(filename)
+
+
 class SimpleFormView(BaseFormView):
     """
         View for presenting your own forms
@@ -218,12 +239,10 @@ class RestCRUDView(BaseCRUDView):
         can_delete = self.appbuilder.sm.has_access("can_delete", view_name)
         #
         # Prepares the form with the search fields make it JSON serializable
-        form_fields = {}
+        _, form_fields = self._get_search_form_fields()
         search_filters = {}
         dict_filters = self._filters.get_search_filters()
-        form = self.search_form.refresh()
         for col in self.search_columns:
-            form_fields[col] = form[col]()
             search_filters[col] = [as_unicode(flt.name) for flt in dict_filters[col]]
 
         ret_json = jsonify(
@@ -270,9 +289,11 @@ class RestCRUDView(BaseCRUDView):
             page=page,
             page_size=page_size,
         )
-        result = self.datamodel.get_values_json(lst, self.list_columns)
+        result = self.datamodel.iter_values_json(lst, self.list_columns)
         pks = self.datamodel.get_keys(lst)
-        ret_json = jsonify(
+        ret_json = json_stream(
+            "result",
+            result,
             label_columns=self._label_columns_json(),
             list_columns=self.list_columns,
             order_columns=self.order_columns,
@@ -281,11 +302,8 @@ class RestCRUDView(BaseCRUDView):
             count=count,
             modelview_name=self.__class__.__name__,
             pks=pks,
-            result=result,
         )
-        response = make_response(ret_json, 200)
-        response.headers["Content-Type"] = "application/json"
-        return response
+        return Response(stream_with_context(ret_json), mimetype="application/json")
 
     def show_item_dict(self, item):
         """Returns a json-able dict for show"""
@@ -436,6 +454,100 @@ class RestCRUDView(BaseCRUDView):
         ret_json = json.dumps(ret_list)
         return ret_json
 
+    def _get_related_column_page(self, col_name, filters):
+        """
+            Returns one page of related options for Select2AJAXPagedWidget,
+            the q argument searches the first string column
+            of the related model
+        """
+        rel_datamodel = self.datamodel.get_related_interface(col_name)
+        _filters = rel_datamodel.get_filters(rel_datamodel.get_search_columns_list())
+        if filters:
+            filters = _filters.add_filter_list(filters)
+        else:
+            filters = _filters
+        page = request.args.get("page", 0, type=int)
+        page_size = request.args.get("psize", self.page_size, type=int)
+        page_size = max(1, min(page_size, self.page_size * 10))
+        term = request.args.get("q")
+        if term:
+            for col_name, col_filters in filters.get_search_filters().items():
+                if not rel_datamodel.is_string(col_name):
+                    continue
+                for flt in col_filters:
+                    if flt.arg_name == "ct":
+                        filters.add_filter(col_name, flt.__class__, term)
+                        break
+                break
+        count, result = rel_datamodel.query(filters, page=page, page_size=page_size)
+        ret_list = list()
+        for item in result:
+            pk = rel_datamodel.get_pk_value(item)
+            ret_list.append({"id": str(pk), "text": str(item)})
+        return json.dumps(
+            {"results": ret_list, "more": (page + 1) * page_size < count}
+        )
+
+    def _get_related_options(self, form_name, col_name, query_rel_fields):
+        """
+            Checks the permission of the form_name method (add or edit),
+            and returns one page of options for its related column col_name
+        """
+        if not self._get_exposed_endpoint(form_name):
+            abort(404)
+        if not self.datamodel.is_relation(col_name):
+            abort(404)
+        permission_str = PERMISSION_PREFIX + self.get_method_permission(form_name)
+        if permission_str not in self.base_permissions or not (
+            self.appbuilder.sm.has_access(permission_str, self.class_permission_name)
+        ):
+            log.warning(
+                LOGMSG_ERR_SEC_ACCESS_DENIED.format(
+                    permission_str, self.__class__.__name__
+                )
+            )
+            return make_response(
+                jsonify(
+                    {"message": str(FLAMSG_ERR_SEC_ACCESS_DENIED), "severity": "danger"}
+                ),
+                401,
+            )
+        filter_rel_fields = None
+        if query_rel_fields:
+            filter_rel_fields = query_rel_fields.get(col_name)
+        ret_json = self._get_related_column_page(col_name, filter_rel_fields)
+        response = make_response(ret_json, 200)
+        response.headers["Content-Type"] = "application/json"
+        return response
+
+    @expose("/related/add/<col_name>", methods=["GET"])
+    def add_related_options(self, col_name):
+        """
+            Returns one page of options for the related column col_name
+            of the add form, filtered with add_form_query_rel_fields.
+            Accepts page, psize and q (search) arguments, needs the
+            add permission
+        :param col_name: The related column name
+        :return: JSON response
+        """
+        return self._get_related_options(
+            "add", col_name, self.add_form_query_rel_fields
+        )
+
+    @expose("/related/edit/<col_name>", methods=["GET"])
+    def edit_related_options(self, col_name):
+        """
+            Returns one page of options for the related column col_name
+            of the edit form, filtered with edit_form_query_rel_fields.
+            Accepts page, psize and q (search) arguments, needs the
+            edit permission
+        :param col_name: The related column name
+        :return: JSON response
+        """
+        return self._get_related_options(
+            "edit", col_name, self.edit_form_query_rel_fields
+        )
+
     @expose_api(name="column_add", url="/api/column/add/<col_name>", methods=["GET"])
     @has_access_api
     @permission_name("add")
@@ -632,10 +744,10 @@ class ModelView(RestCRUDView):
     @expose("/download/<string:filename>")
     @has_access
     def download(self, filename):
-        return send_file(
-            op.join(self.appbuilder.app.config["UPLOAD_FOLDER"], filename),
-            attachment_filename=uuid_originalname(filename),
+        return FileManager().send_file(
+            filename,
             as_attachment=True,
+            attachment_filename=uuid_originalname(filename),
         )
 
     def get_action_permission_name(self, name: str) -> str:
@@ -727,7 +839,12 @@ class MasterDetailView(BaseCRUDView):
         if pk:
             item = self.datamodel.get(pk)
             widgets = self._get_related_views_widgets(
-                item, orders=orders, pages=pages, page_sizes=page_sizes, widgets=widgets
+                item,
+                orders=orders,
+                pages=pages,
+                page_sizes=page_sizes,
+                widgets=widgets,
+                widget_args={"pk": pk},
             )
             related_views = self._related_views
         else:
@@ -737,6 +854,7 @@ class MasterDetailView(BaseCRUDView):
             self.list_template,
             title=self.list_title,
             widgets=widgets,
+            pk=pk,
             related_views=related_views,
             master_div_width=self.master_div_width,
         )
@@ -778,7 +896,7 @@ class MultipleView(BaseView):
         pages = get_page_args()
         page_sizes = get_page_size_args()
         orders = get_order_args()
-        views_widgets = list()
+        views_widgets_funcs = list()
         for view in self._views:
             if orders.get(view.__class__.__name__):
                 order_column, order_direction = orders.get(view.__class__.__name__)
@@ -786,15 +904,16 @@ class MultipleView(BaseView):
                 order_column, order_direction = "", ""
             page = pages.get(view.__class__.__name__)
             page_size = page_sizes.get(view.__class__.__name__)
-            views_widgets.append(
-                view._get_view_widget(
-                    filters=view._base_filters,
-                    order_column=order_column,
-                    order_direction=order_direction,
-                    page=page,
-                    page_size=page_size,
-                )
+            get_widget = partial(
+                view._get_view_widget,
+                filters=view._base_filters,
+                order_column=order_column,
+                order_direction=order_direction,
+                page=page,
+                page_size=page_size,
             )
+            views_widgets_funcs.append(partial(render_widget, get_widget))
+        views_widgets = self.appbuilder.map_concurrently(views_widgets_funcs)
         self.update_redirect()
         return self.render_template(
             self.list_template, views=self._views, views_widgets=views_widgets
@@ -7,12 +7,16 @@ Created on Oct 12, 2013
 import logging
 
 from flask.globals import _request_ctx_stack
+from markupsafe import Markup
 
 from ._compat import as_unicode
+from .cache import make_cache_key
 
 
 log = logging.getLogger(__name__)
 
+CSRF_TOKEN_PLACEHOLDER = "__fab_csrf_token__"
+
 
 class RenderTemplateWidget(object):
     """
@@ -37,6 +41,74 @@ class RenderTemplateWidget(object):
         return template.render(args)
 
 
+class CachedWidget(object):
+    """
+        Wraps a widget factory, the widget's HTML is kept on cache
+        with key for timeout seconds and the factory, that normally
+        queries the data, only runs on cache misses.
+
+        CSRF tokens are cached as a placeholder and replaced
+        with the current session's token on every render
+    """
+
+    def __init__(self, factory, cache, key, timeout):
+        self.factory = factory
+        self.cache = cache
+        self.key = key
+        self.timeout = timeout
+
+    def __call__(self, **kwargs):
+        key = self.key
+        if kwargs:
+            key = make_cache_key(key, sorted(kwargs.items()))
+        csrf_token = _request_ctx_stack.top.app.jinja_env.globals.get("csrf_token")
+        html = self.cache.get(key)
+        if html is None:
+            html = as_unicode(self.factory()(**kwargs))
+            # The token is the same for the whole request
+            if csrf_token and "csrf_token" in html:
+                html = html.replace(csrf_token(), CSRF_TOKEN_PLACEHOLDER)
+            self.cache.set(key, html, timeout=self.timeout)
+        if csrf_token and CSRF_TOKEN_PLACEHOLDER in html:
+            html = html.replace(CSRF_TOKEN_PLACEHOLDER, csrf_token())
+        return Markup(html)
+
+
+class RenderedWidget(object):
+    """
+        A widget already rendered with kwargs, so its HTML is built
+        while the data it shows is still loaded, by a thread's session
+        for example. Calls with other kwargs render the widget again
+    """
+
+    def __init__(self, widget, **kwargs):
+        self.widget = widget
+        self.kwargs = kwargs
+        self.html = widget(**kwargs)
+
+    @property
+    def template_args(self):
+        return getattr(self.widget, "template_args", None)
+
+    def __call__(self, **kwargs):
+        if kwargs == self.kwargs:
+            return self.html
+        return self.widget(**kwargs)
+
+
+def render_widget(get_widget, **kwargs):
+    """
+        Calls get_widget and renders the widget it returns with kwargs
+
+        :param get_widget: Callable without arguments returning a widget
+        :return: A RenderedWidget, or None if there is no widget
+    """
+    widget = get_widget()
+    if widget is None:
+        return None
+    return RenderedWidget(widget, **kwargs)
+
+
 class FormWidget(RenderTemplateWidget):
     """
         FormWidget
@@ -101,18 +173,35 @@ class SearchWidget(FormWidget):
         self.filters = kwargs.get("filters")
         return super(SearchWidget, self).__init__(**kwargs)
 
+    @staticmethod
+    def render_form(form, include_cols):
+        """
+            Returns the labels and the rendered HTML of
+            the form fields, by column name
+        """
+        label_columns = {}
+        form_fields = {}
+        for col in include_cols:
+            label_columns[col] = as_unicode(form[col].label.text)
+            form_fields[col] = as_unicode(form[col]())
+        return label_columns, form_fields
+
     def __call__(self, **kwargs):
         """ create dict labels based on form """
         """ create dict of form widgets """
         """ create dict of possible filters """
         """ create list of active filters """
-        label_columns = {}
-        form_fields = {}
+        include_cols = self.template_args["include_cols"]
+        if self.template_args.get("form_fields") is not None:
+            label_columns = self.template_args["label_columns"]
+            form_fields = self.template_args["form_fields"]
+        else:
+            label_columns, form_fields = self.render_form(
+                self.template_args["form"], include_cols
+            )
         search_filters = {}
         dict_filters = self.filters.get_search_filters()
-        for col in self.template_args["include_cols"]:
-            label_columns[col] = as_unicode(self.template_args["form"][col].label.text)
-            form_fields[col] = self.template_args["form"][col]()
+        for col in include_cols:
             search_filters[col] = [as_unicode(flt.name) for flt in dict_filters[col]]
 
         kwargs["label_columns"] = label_columns